@@ -5,16 +5,69 @@ from pydantic import BaseModel
 class Settings(BaseModel):
     # IB Client Portal Gateway URL
     ib_gateway_url: str = os.getenv("IB_GATEWAY_URL", "https://localhost:5000/v1/api")
+    ib_gateway_ws_url: str = os.getenv(
+        "IB_GATEWAY_WS_URL",
+        ib_gateway_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1).rstrip("/") + "/ws",
+    )
+
+    # Size of the shared gateway connection pool
+    gateway_max_connections: int = int(os.getenv("GATEWAY_MAX_CONNECTIONS", "100"))
+
+    # /health/ready reports 503 (drain me) above these rolling upstream p95 latency (ms),
+    # upstream error ratio and event-loop lag (ms) limits; the p95 and error ratio limits
+    # only apply once the latency window holds HEALTH_MIN_CALLS upstream calls
+    health_max_p95_ms: float = float(os.getenv("HEALTH_MAX_P95_MS", "3000"))
+    health_max_error_ratio: float = float(os.getenv("HEALTH_MAX_ERROR_RATIO", "0.5"))
+    health_max_loop_lag_ms: float = float(os.getenv("HEALTH_MAX_LOOP_LAG_MS", "500"))
+    health_min_calls: int = int(os.getenv("HEALTH_MIN_CALLS", "20"))
+
+    # Seconds between /tickle keepalives of the gateway session (0 disables the keepalive)
+    gateway_tickle_interval: float = float(os.getenv("GATEWAY_TICKLE_INTERVAL", "60"))
+
+    # Consume the gateway websocket `spl` (PnL) topic in the background (the PnL routes
+    # answer 503 while it is disabled)
+    pnl_stream_enabled: bool = os.getenv("PNL_STREAM_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # Responses of at least this many bytes are compressed (brotli when installed, else gzip)
+    compression_minimum_size: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
 
     # CORS
     allowed_origins: str = os.getenv("ALLOWED_ORIGINS", "*")
 
+    # Number of positions pages requested concurrently when reading a whole account
+    positions_page_concurrency: int = int(os.getenv("POSITIONS_PAGE_CONCURRENCY", "4"))
+
+    # Multi-account fan-out: accounts fetched in parallel and per-account timeout (seconds)
+    portfolio_fanout_concurrency: int = int(os.getenv("PORTFOLIO_FANOUT_CONCURRENCY", "8"))
+    portfolio_fanout_timeout: float = float(os.getenv("PORTFOLIO_FANOUT_TIMEOUT", "15"))
+
+    # Portfolio read-through cache: per-endpoint TTLs (seconds, 0 disables), how long an
+    # account stays "hot" after a read, and how often hot accounts are refreshed
+    portfolio_cache_ttls: str = os.getenv(
+        "PORTFOLIO_CACHE_TTLS", "summary=30,ledger=30,allocation=60,positions=15,meta=600"
+    )
+    portfolio_cache_hot_seconds: float = float(os.getenv("PORTFOLIO_CACHE_HOT_SECONDS", "300"))
+    portfolio_cache_refresh_interval: float = float(os.getenv("PORTFOLIO_CACHE_REFRESH_INTERVAL", "5"))
+
+    # Cross-account exposure index: seconds between full refreshes
+    exposure_refresh_interval: float = float(os.getenv("EXPOSURE_REFRESH_INTERVAL", "60"))
+
     # General
     timezone: str = os.getenv("TIMEZONE", "UTC")
 
     # API authentication
     api_username: str = os.getenv("API_USERNAME", "admin")
     api_password: str = os.getenv("API_PASSWORD", "changeme")
+    # Comma-separated path prefixes whose GET requests also require a Bearer token
+    auth_protected_get_prefixes: str = os.getenv("AUTH_PROTECTED_GET_PREFIXES", "")
+    # Token backend: "memory" (single process), "sqlite" (file shared by workers/hosts)
+    # or "hmac" (stateless signed tokens; every instance needs the same secret)
+    auth_token_backend: str = os.getenv("AUTH_TOKEN_BACKEND", "memory")
+    auth_token_ttl: int = int(os.getenv("AUTH_TOKEN_TTL", str(60 * 60)))
+    auth_token_db_path: str = os.getenv("AUTH_TOKEN_DB_PATH", "./tokens.db")
+    auth_token_secret: str = os.getenv("AUTH_TOKEN_SECRET", "")
+    # Seconds between background purges of expired tokens (0 disables)
+    auth_token_purge_interval: float = float(os.getenv("AUTH_TOKEN_PURGE_INTERVAL", "300"))
 
     # Database
     database_url: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./ares.db")
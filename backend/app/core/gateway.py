@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from ..config import settings
+
+
+class LatencyTracker:
+    """
+    Rolling record of upstream calls: (finished at, seconds, ok, in flight at start).
+    Keeps the last `size` calls; statistics only look at the last `window` seconds.
+    """
+
+    def __init__(self, size: int = 2048, window: float = 300.0) -> None:
+        self.window = window
+        self._samples: Deque[Tuple[float, float, bool, int]] = deque(maxlen=size)
+        self.total = 0
+        self.errors = 0
+
+    def record(self, seconds: float, ok: bool, inflight: int) -> None:
+        self._samples.append((time.monotonic(), seconds, ok, inflight))
+        self.total += 1
+        if not ok:
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        since = time.monotonic() - self.window
+        # copy first: record() may append from another thread while this iterates
+        recent = [s for s in list(self._samples) if s[0] >= since]
+        latencies = sorted(s[1] for s in recent)
+
+        def pct(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000.0, 1)
+
+        failed = sum(1 for s in recent if not s[2])
+        return {
+            "windowSeconds": self.window,
+            "calls": len(recent),
+            "errorRatio": round(failed / len(recent), 3) if recent else None,
+            "p50Ms": pct(0.50),
+            "p95Ms": pct(0.95),
+            "p99Ms": pct(0.99),
+            "maxMs": round(latencies[-1] * 1000.0, 1) if latencies else None,
+            "peakInflight": max((s[3] for s in recent), default=0),
+        }
+
+
+class TimedTransport(httpx.AsyncBaseTransport):
+    """Wraps the pooled transport to time every gateway call and count calls in flight."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, tracker: LatencyTracker) -> None:
+        self._transport = transport
+        self.tracker = tracker
+        self.inflight = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.inflight += 1
+        inflight = self.inflight
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = await self._transport.handle_async_request(request)
+            ok = response.status_code < 500
+            return response
+        finally:
+            self.inflight -= 1
+            self.tracker.record(time.perf_counter() - started, ok, inflight)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+gateway_latency = LatencyTracker()
+
+_client: Optional[httpx.AsyncClient] = None
+_transport: Optional[TimedTransport] = None
+
+
+def get_gateway_client() -> httpx.AsyncClient:
+    """Process-wide pooled client for gateway calls; every call is timed into `gateway_latency`."""
+    global _client, _transport
+    if _client is None:
+        limits = httpx.Limits(
+            max_connections=settings.gateway_max_connections,
+            max_keepalive_connections=settings.gateway_max_connections,
+        )
+        _transport = TimedTransport(httpx.AsyncHTTPTransport(verify=False, limits=limits), gateway_latency)
+        _client = httpx.AsyncClient(transport=_transport, timeout=httpx.Timeout(30.0))
+    return _client
+
+
+@contextlib.asynccontextmanager
+async def gateway_client() -> AsyncIterator[httpx.AsyncClient]:
+    """`async with gateway_client() as client:` without closing the shared client afterwards."""
+    yield get_gateway_client()
+
+
+async def close_gateway_client() -> None:
+    global _client, _transport
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _transport = None
+
+
+def pool_stats() -> Dict[str, Any]:
+    limit = settings.gateway_max_connections
+    inflight = _transport.inflight if _transport is not None else 0
+    return {
+        "maxConnections": limit,
+        "inflight": inflight,
+        "saturation": round(inflight / limit, 3) if limit else None,
+    }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task (the time other work held it)."""
+
+    def __init__(self, interval: float = 0.5, size: int = 120) -> None:
+        self.interval = interval
+        self._lags: Deque[float] = deque(maxlen=size)
+
+    async def run(self) -> None:
+        """Sample forever. Cancel to stop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self._lags.append(max(0.0, loop.time() - started - self.interval))
+
+    def stats(self) -> Dict[str, Any]:
+        lags = list(self._lags)
+        return {
+            "samples": len(lags),
+            "lastMs": round(lags[-1] * 1000.0, 1) if lags else None,
+            "maxMs": round(max(lags) * 1000.0, 1) if lags else None,
+        }
+
+
+loop_lag = LoopLagMonitor()
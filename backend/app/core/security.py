@@ -1,52 +1,282 @@
 from __future__ import annotations
 
+import abc
+import asyncio
+import base64
+import hashlib
+import heapq
+import hmac
+import logging
 import secrets
+import sqlite3
+import threading
 import time
-from threading import Lock
-from typing import Dict
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
 
+from starlette.concurrency import run_in_threadpool
 
-class TokenStore:
+from ..config import Settings, settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class TokenStore(abc.ABC):
+    """
+    Bearer token backend: `issue` a token valid for `ttl` seconds, check it with
+    `is_valid`, end it early with `revoke`. Selected by AUTH_TOKEN_BACKEND.
+
+    Code on the event loop uses the `*_async` variants: they call straight through
+    for in-process backends and go through the thread pool for backends whose
+    calls block (`blocking = True`).
+    """
+
+    # True when issue/is_valid/revoke do blocking I/O
+    blocking = False
+
+    def __init__(self, ttl_seconds: int = 60 * 60) -> None:
+        self.ttl = ttl_seconds
+
+    @abc.abstractmethod
+    def issue(self) -> str:
+        """New token valid for `ttl` seconds."""
+
+    @abc.abstractmethod
+    def is_valid(self, token: str) -> bool:
+        """Whether `token` was issued here (or with the same secret), unexpired and not revoked."""
+
+    @abc.abstractmethod
+    def revoke(self, token: str) -> None:
+        """End `token` before its expiry."""
+
+    async def _call(self, fn: Callable[..., T], *args) -> T:
+        return await run_in_threadpool(fn, *args) if self.blocking else fn(*args)
+
+    async def issue_async(self) -> str:
+        return await self._call(self.issue)
+
+    async def is_valid_async(self, token: str) -> bool:
+        return await self._call(self.is_valid, token)
+
+    async def revoke_async(self, token: str) -> None:
+        await self._call(self.revoke, token)
+
+    def purge_expired(self) -> int:
+        """Drop state kept for expired tokens. Returns the entries removed."""
+        return 0
+
+    async def run_purger(self, interval: Optional[float] = None) -> None:
+        """Background task calling purge_expired every `interval` seconds. Cancel to stop."""
+        interval = interval or settings.auth_token_purge_interval
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await run_in_threadpool(self.purge_expired)
+            except Exception as exc:
+                logger.warning("Token purge failed: %s", exc)
+
+
+class MemoryTokenStore(TokenStore):
     """
     Simple in-memory bearer token store with expiration.
     Intended for lightweight scenarios (single process).
+
+    Validation is a plain dict lookup plus an expiry check and takes no lock.
+    Expired tokens are dropped from a min-heap ordered by expiry: `issue` sweeps
+    the due entries, so cleanup costs O(log n) per token instead of a full scan.
     """
 
+    # upper bound of expired entries removed by one issue() call
+    SWEEP_BATCH = 256
+
     def __init__(self, ttl_seconds: int = 60 * 60) -> None:
-        self.ttl = ttl_seconds
+        super().__init__(ttl_seconds)
         self._tokens: Dict[str, float] = {}
-        self._lock = Lock()
+        self._expiries: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
 
-    def _cleanup(self) -> None:
-        now = time.time()
-        expired = [token for token, expiry in self._tokens.items() if expiry <= now]
-        for token in expired:
-            self._tokens.pop(token, None)
+    def _sweep(self, now: float, limit: int) -> int:
+        # caller holds the lock; heap entries of revoked tokens are skipped lazily
+        removed = 0
+        heap = self._expiries
+        while heap and heap[0][0] <= now and removed < limit:
+            expiry, token = heapq.heappop(heap)
+            if self._tokens.get(token) == expiry:
+                del self._tokens[token]
+            removed += 1
+        return removed
+
+    def purge_expired(self) -> int:
+        """Remove every expired token now (run_purger). Returns heap entries removed."""
+        with self._lock:
+            return self._sweep(time.monotonic(), len(self._expiries))
 
     def issue(self) -> str:
         token = secrets.token_urlsafe(32)
-        expires_at = time.time() + self.ttl
+        now = time.monotonic()
+        expires_at = now + self.ttl
         with self._lock:
-            self._cleanup()
+            self._sweep(now, self.SWEEP_BATCH)
             self._tokens[token] = expires_at
+            heapq.heappush(self._expiries, (expires_at, token))
         return token
 
     def is_valid(self, token: str) -> bool:
-        with self._lock:
-            self._cleanup()
-            expiry = self._tokens.get(token)
-            if expiry is None:
-                return False
-            if expiry <= time.time():
-                self._tokens.pop(token, None)
-                return False
-            return True
+        expiry = self._tokens.get(token)
+        if expiry is None:
+            return False
+        if expiry <= time.monotonic():
+            self._tokens.pop(token, None)
+            return False
+        return True
 
     def revoke(self, token: str) -> None:
-        with self._lock:
-            self._tokens.pop(token, None)
+        self._tokens.pop(token, None)
 
+    def __len__(self) -> int:
+        return len(self._tokens)
 
-# Default singleton used by the app
-token_store = TokenStore()
 
+class SQLiteTokenStore(TokenStore):
+    """
+    Tokens in a shared SQLite file, so every worker process (or host on a shared
+    volume) sees logins and logouts of the others. Only a SHA-256 digest of each
+    token is stored. Lookups are a primary-key read on a per-thread connection in
+    WAL mode; expired rows are deleted at most every `sweep_interval` seconds.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, ttl_seconds: int = 60 * 60, sweep_interval: float = 60.0) -> None:
+        super().__init__(ttl_seconds)
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self._local = threading.local()
+        self._next_sweep = 0.0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS auth_tokens ("
+                "digest BLOB PRIMARY KEY, expires_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_auth_tokens_expires_at ON auth_tokens (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def issue(self) -> str:
+        token = secrets.token_urlsafe(32)
+        now = time.time()
+        conn = self._connect()
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval
+            conn.execute("DELETE FROM auth_tokens WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "INSERT INTO auth_tokens (digest, expires_at) VALUES (?, ?)",
+            (self._digest(token), now + self.ttl),
+        )
+        return token
+
+    def is_valid(self, token: str) -> bool:
+        row = self._connect().execute(
+            "SELECT expires_at FROM auth_tokens WHERE digest = ?", (self._digest(token),)
+        ).fetchone()
+        return row is not None and row[0] > time.time()
+
+    def revoke(self, token: str) -> None:
+        self._connect().execute("DELETE FROM auth_tokens WHERE digest = ?", (self._digest(token),))
+
+    def purge_expired(self) -> int:
+        return self._connect().execute("DELETE FROM auth_tokens WHERE expires_at <= ?", (time.time(),)).rowcount
+
+
+class HMACTokenStore(TokenStore):
+    """
+    Stateless signed tokens (`<expiry>.<nonce>.<signature>`): any process holding
+    the same secret validates them without shared storage.
+
+    Revocation cannot be shared without state, so `revoke` only denies the token
+    in this process until it expires; use the SQLite backend where logout must
+    take effect everywhere.
+    """
+
+    def __init__(self, secret: str, ttl_seconds: int = 60 * 60) -> None:
+        if not secret:
+            raise ValueError("HMACTokenStore requires a non-empty secret (AUTH_TOKEN_SECRET)")
+        super().__init__(ttl_seconds)
+        self._key = secret.encode()
+        self._revoked: Dict[str, int] = {}
+        # revoke() runs on the event loop, purge_expired() in the thread pool
+        self._revoked_lock = threading.Lock()
+
+    def _mac(self, payload: bytes) -> bytes:
+        mac = hmac.new(self._key, payload, hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(mac).rstrip(b"=")
+
+    def _sign(self, payload: str) -> str:
+        return self._mac(payload.encode()).decode()
+
+    def issue(self) -> str:
+        payload = f"{int(time.time()) + self.ttl}.{secrets.token_urlsafe(12)}"
+        return f"{payload}.{self._sign(payload)}"
+
+    def _expiry(self, token: str) -> int | None:
+        payload, _, signature = token.rpartition(".")
+        expiry, _, nonce = payload.partition(".")
+        if not nonce or not (expiry.isascii() and expiry.isdigit()):
+            return None
+        try:
+            # bytes: compare_digest rejects non-ASCII str (headers arrive latin-1 decoded)
+            signed = hmac.compare_digest(signature.encode(), self._mac(payload.encode()))
+        except UnicodeError:
+            return None
+        return int(expiry) if signed else None
+
+    def is_valid(self, token: str) -> bool:
+        expiry = self._expiry(token)
+        if expiry is None or expiry <= time.time():
+            return False
+        with self._revoked_lock:
+            return token not in self._revoked
+
+    def revoke(self, token: str) -> None:
+        expiry = self._expiry(token)
+        if expiry is None:
+            return
+        self.purge_expired()
+        with self._revoked_lock:
+            self._revoked[token] = expiry
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._revoked_lock:
+            expired = [t for t, e in self._revoked.items() if e <= now]
+            for token in expired:
+                del self._revoked[token]
+        return len(expired)
+
+
+def create_token_store(config: Settings = settings) -> TokenStore:
+    """Token backend named by `config.auth_token_backend` (memory, sqlite or hmac)."""
+    backend = config.auth_token_backend.lower()
+    if backend == "memory":
+        return MemoryTokenStore(config.auth_token_ttl)
+    if backend == "sqlite":
+        return SQLiteTokenStore(config.auth_token_db_path, config.auth_token_ttl)
+    if backend == "hmac":
+        return HMACTokenStore(config.auth_token_secret, config.auth_token_ttl)
+    raise ValueError(f"Unknown AUTH_TOKEN_BACKEND {config.auth_token_backend!r} (memory, sqlite, hmac)")
+
+
+# Default singleton used by the app
+token_store = create_token_store()
@@ -1,3 +1,6 @@
+import asyncio
+import contextlib
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
@@ -7,8 +10,16 @@ from .routers.market import router as market_router
 from .routers.portfolio import router as portfolio_router
 from .routers.contract import router as contract_router
 from .routers.auth import router as auth_router
+from .routers.health import router as health_router
 from .middleware.bearer import BearerAuthMiddleware
+from .middleware.compression import CompressionMiddleware, ETagMiddleware
 from .core.database import init_db, close_db
+from .core.gateway import close_gateway_client, loop_lag
+from .core.security import token_store
+from .services.exposure import exposure_index
+from .services.pnl_stream import pnl_consumer
+from .services.portfolio_cache import portfolio_cache
+from .services.session import gateway_session
 
 
 # Load environment variables from .env if present
@@ -16,22 +27,45 @@ load_dotenv()
 
 app = FastAPI(title="BSD IBKR Gateway", version="0.1.0")
 
+_background_tasks: list[asyncio.Task] = []
+
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on application startup."""
+    """Initialize database and background workers on application startup."""
     await init_db()
+    _background_tasks.append(asyncio.create_task(loop_lag.run()))
+    _background_tasks.append(asyncio.create_task(portfolio_cache.run_refresher()))
+    _background_tasks.append(asyncio.create_task(exposure_index.run_refresher()))
+    if settings.pnl_stream_enabled:
+        _background_tasks.append(asyncio.create_task(pnl_consumer.run()))
+    if settings.gateway_tickle_interval > 0:
+        _background_tasks.append(asyncio.create_task(gateway_session.run()))
+    if settings.auth_token_purge_interval > 0:
+        _background_tasks.append(asyncio.create_task(token_store.run_purger()))
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Close database connections on application shutdown."""
+    """Stop background workers and close database connections on application shutdown."""
+    for task in _background_tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    _background_tasks.clear()
+    await gateway_session.aclose()
+    await close_gateway_client()
     await close_db()
 
-# Auth middleware (POST endpoints require Bearer tokens except login)
+# Strong ETags / 304 for buffered GET responses, compression around them
+app.add_middleware(ETagMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+# Auth middleware (POST endpoints, and GETs under the protected prefixes, require
+# Bearer tokens except login)
 app.add_middleware(
     BearerAuthMiddleware,
     excluded_paths={"/auth/login"},
+    protected_get_prefixes=[p.strip() for p in settings.auth_protected_get_prefixes.split(",")],
 )
 # CORS
 origins = [o.strip() for o in settings.allowed_origins.split(",") if o.strip()]
@@ -44,17 +78,10 @@ app.add_middleware(
 )
 
 
-@app.get("/health")
-def health():
-    return {
-        "status": "ok",
-        "gateway_url": settings.ib_gateway_url,
-    }
-
-
 app.include_router(market_router)
 app.include_router(portfolio_router)
 app.include_router(contract_router)
 app.include_router(auth_router)
+app.include_router(health_router)
 
 
@@ -1,31 +1,58 @@
+from typing import Iterable
+
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from ..core.security import token_store
 
 
-class BearerAuthMiddleware(BaseHTTPMiddleware):
-    """Ensure POST requests include a valid Bearer token."""
+class BearerAuthMiddleware:
+    """
+    Ensure POST requests (and GETs under `protected_get_prefixes`) include a valid
+    Bearer token.
+
+    Plain ASGI middleware: authorised requests are passed straight to the app, so
+    streaming responses and background tasks are not wrapped the way
+    BaseHTTPMiddleware wraps them.
+    """
 
-    def __init__(self, app, excluded_paths: set[str] | None = None) -> None:
-        super().__init__(app)
+    def __init__(
+        self,
+        app: ASGIApp,
+        excluded_paths: set[str] | None = None,
+        protected_get_prefixes: Iterable[str] = (),
+    ) -> None:
+        self.app = app
         self.excluded_paths = excluded_paths or set()
+        self.protected_get_prefixes = tuple(p for p in protected_get_prefixes if p)
+
+    def _requires_token(self, method: str, path: str) -> bool:
+        if path in self.excluded_paths:
+            return False
+        if method == "POST":
+            return True
+        return method == "GET" and bool(self.protected_get_prefixes) and path.startswith(self.protected_get_prefixes)
 
-    async def dispatch(self, request: Request, call_next):
-        if request.method.upper() == "POST":
-            if request.url.path not in self.excluded_paths:
-                auth_header = request.headers.get("Authorization")
-                if not auth_header or not auth_header.startswith("Bearer "):
-                    return JSONResponse(
-                        status_code=401,
-                        content={"detail": "Missing or invalid Authorization header"},
-                    )
-                token = auth_header.split(" ", 1)[1].strip()
-                if not token_store.is_valid(token):
-                    return JSONResponse(
-                        status_code=401,
-                        content={"detail": "Invalid or expired token"},
-                    )
-        return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requires_token(scope["method"].upper(), scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
+        auth_header = next(
+            (value.decode("latin-1") for name, value in scope["headers"] if name == b"authorization"),
+            None,
+        )
+        if not auth_header or not auth_header.startswith("Bearer "):
+            response = JSONResponse(
+                status_code=401,
+                content={"detail": "Missing or invalid Authorization header"},
+            )
+        elif not await token_store.is_valid_async(auth_header.split(" ", 1)[1].strip()):
+            response = JSONResponse(
+                status_code=401,
+                content={"detail": "Invalid or expired token"},
+            )
+        else:
+            await self.app(scope, receive, send)
+            return
+        await response(scope, receive, send)
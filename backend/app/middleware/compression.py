@@ -0,0 +1,237 @@
+"""
+Response compression and conditional GET for both FastAPI apps (app.main and
+app_db.main).
+
+ETagMiddleware gives buffered 200 responses to GET a strong ETag (SHA-256 of the
+body) and answers a matching If-None-Match with 304 and no body. Streaming
+responses (no Content-Length) are left alone.
+
+CompressionMiddleware encodes bodies of at least `minimum_size` bytes with
+brotli (optional `brotli` package) or gzip, whichever the client prefers. Streamed
+bodies are compressed chunk by chunk with a flush after each one, so NDJSON
+streams stay incremental. The ETag of an encoded body gets a `-br` / `-gzip`
+suffix, since it is a different representation; ETagMiddleware ignores the
+suffix when comparing.
+
+Order: add ETagMiddleware first so compression wraps it.
+"""
+import hashlib
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli disabled, gzip only
+    brotli = None
+
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+
+def _strip_encoding(etag: str) -> str:
+    etag = etag.strip()
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    for suffix in ENCODING_SUFFIXES:
+        if etag.endswith(f'{suffix}"'):
+            return etag[: -len(suffix) - 1] + '"'
+    return etag
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return any(_strip_encoding(candidate) == etag for candidate in if_none_match.split(","))
+
+
+class ETagMiddleware:
+    def __init__(self, app: ASGIApp, max_size: int = 16 * 1024 * 1024) -> None:
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        buffering = False
+
+        async def send_with_etag(message: Message) -> None:
+            nonlocal start, buffering
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                length = headers.get("content-length")
+                buffering = (
+                    message["status"] == 200
+                    and length is not None
+                    and int(length) <= self.max_size
+                    and "etag" not in headers
+                    and "content-encoding" not in headers
+                    and "no-store" not in headers.get("cache-control", "")
+                )
+                if buffering:
+                    start = message
+                else:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or not buffering:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            headers = MutableHeaders(raw=start["headers"])
+            headers["ETag"] = etag
+            if if_none_match and etag_matches(if_none_match, etag):
+                del headers["content-length"]
+                del headers["content-type"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_etag)
+
+
+def _compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    if content_type.startswith("text/event-stream"):
+        return False  # SSE: leave every event on the wire as it is produced
+    return content_type.startswith("text/") or any(
+        marker in content_type for marker in ("json", "xml", "csv", "javascript")
+    )
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """'br' or 'gzip' by the client's q-values (br wins ties when available); None for identity."""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip()] = q
+    wildcard = weights.get("*", 0.0)
+    candidates = [("br", weights.get("br", wildcard))] if brotli is not None else []
+    candidates.append(("gzip", weights.get("gzip", wildcard)))
+    name, q = max(candidates, key=lambda item: item[1])
+    return name if q > 0 else None
+
+
+class _Encoder:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._gzip.compress(data)
+        return out + self._gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        def encoded_start(headers: MutableHeaders, encoded: bool = True) -> Message:
+            if encoded:
+                headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and etag.endswith('"'):
+                headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+            return start
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                if message["status"] == 304 and f'-{encoding}"' in request_headers.get("if-none-match", ""):
+                    # revalidated an encoded 200: answer with the validator the client holds
+                    start = message
+                    passthrough = True
+                    await send(encoded_start(MutableHeaders(raw=message["headers"]), encoded=False))
+                    return
+                headers = Headers(raw=message["headers"])
+                length = headers.get("content-length")
+                passthrough = (
+                    message["status"] == 304
+                    or "content-encoding" in headers
+                    or not _compressible(headers.get("content-type", ""))
+                    or (length is not None and int(length) < self.minimum_size)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                if not more_body and len(body) < self.minimum_size:
+                    # small body of unknown length: send as is
+                    await send(start)
+                    await send(message)
+                    passthrough = True
+                    return
+                encoder = _Encoder(encoding, self.gzip_level, self.brotli_quality)
+                headers = MutableHeaders(raw=start["headers"])
+                if more_body:
+                    del headers["content-length"]
+                    await send(encoded_start(headers))
+                else:
+                    data = encoder.chunk(body, final=True)
+                    headers["Content-Length"] = str(len(data))
+                    await send(encoded_start(headers))
+                    await send({"type": "http.response.body", "body": data})
+                    return
+            await send({
+                "type": "http.response.body",
+                "body": encoder.chunk(body, final=not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, send_compressed)
@@ -9,6 +9,11 @@ from .portfolio import (
     PnLRecord,
     AccountSummaryRecord,
     AccountLedgerRecord,
+    AccountPortfolioBundle,
+    PortfolioOverviewResponse,
+    AccountHolding,
+    ConidExposure,
+    ExposureRequest,
 )
 from .contract import (
     TradingSession,
@@ -32,6 +37,11 @@ __all__ = [
     "PnLRecord",
     "AccountSummaryRecord",
     "AccountLedgerRecord",
+    "AccountPortfolioBundle",
+    "PortfolioOverviewResponse",
+    "AccountHolding",
+    "ConidExposure",
+    "ExposureRequest",
     "TradingSession",
     "TradingTimes",
     "TradingScheduleItem",
@@ -54,9 +54,48 @@ class PositionRecord(BaseModel):
 
 class PnLRecord(BaseModel):
     account: str
+    partition: Optional[str] = None  # model/segment suffix of the spl key, e.g. "Core"
     UnrealizedPnL: Optional[float] = None
     RealizedPnL: Optional[float] = None
     NetLiquidation: Optional[float] = None
+    DailyPnL: Optional[float] = None
+    ExcessLiquidity: Optional[float] = None
+    MarketValue: Optional[float] = None
+    updated: Optional[int] = None  # epoch ms of the last update
+
+
+class AccountPortfolioBundle(BaseModel):
+    accountId: str
+    summary: Optional[Dict[str, Any]] = None
+    ledger: Optional[Dict[str, Any]] = None
+    positions: Optional[List[Dict[str, Any]]] = None
+    errors: Dict[str, str] = Field(default_factory=dict)
+
+
+class PortfolioOverviewResponse(BaseModel):
+    accounts: List[AccountPortfolioBundle] = Field(default_factory=list)
+    partial: bool = False
+
+
+class AccountHolding(BaseModel):
+    accountId: str
+    quantity: float
+    mktValue: Optional[float] = None
+    avgCost: Optional[float] = None
+
+
+class ConidExposure(BaseModel):
+    conid: int
+    symbol: Optional[str] = None
+    currency: Optional[str] = None
+    totalQuantity: float
+    totalMarketValue: Optional[float] = None
+    avgCost: Optional[float] = None  # quantity-weighted across accounts
+    accounts: List[AccountHolding] = Field(default_factory=list)
+
+
+class ExposureRequest(BaseModel):
+    conids: List[int] = Field(default_factory=list, description="Contract ids; empty for every held conid")
 
 
 class AccountSummaryRecord(BaseModel):
@@ -26,7 +26,7 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 async def login(payload: LoginRequest):
     if payload.username != settings.api_username or payload.password != settings.api_password:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    token = token_store.issue()
+    token = await token_store.issue_async()
     return LoginResponse(access_token=token)
 
 
@@ -35,6 +35,6 @@ async def logout(authorization: str = Header(..., alias="Authorization")):
     if not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Authorization header")
     token = authorization.split(" ", 1)[1].strip()
-    token_store.revoke(token)
+    await token_store.revoke_async(token)
     return LogoutResponse(detail="Logged out")
 
@@ -1,9 +1,9 @@
 from typing import Any, Dict, List, Optional
 
-import httpx
 from fastapi import APIRouter, Body, Query
 
 from ..config import settings
+from ..core.gateway import gateway_client
 from ..models.contract import (
     ContractRulesRequest,
     SecdefRecord,
@@ -53,7 +53,7 @@ async def get_trading_schedule(
     if exchangeFilter is not None:
         params["exchangeFilter"] = exchangeFilter
 
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(
             f"{settings.ib_gateway_url}/trsrv/secdef/schedule",
             params=params,
@@ -67,7 +67,7 @@ async def get_security_definitions(request: SecdefRequest = Body(...)):
     """Fetch security definitions for specific contract identifiers."""
 
     payload = {"conids": request.conids}
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.post(
             f"{settings.ib_gateway_url}/trsrv/secdef",
             json=payload,
@@ -81,7 +81,7 @@ async def get_futures_contracts(symbols: str = Query(..., description="Comma sep
     """Retrieve non-expired futures contracts for the provided symbols."""
 
     params = {"symbols": symbols}
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(
             f"{settings.ib_gateway_url}/trsrv/futures",
             params=params,
@@ -95,7 +95,7 @@ async def get_futures_contracts(symbols: str = Query(..., description="Comma sep
 async def get_contract_info(conid: str):
     """Retrieve contract details for a specific conid."""
 
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(
             f"{settings.ib_gateway_url}/iserver/contract/{conid}/info"
         )
@@ -107,7 +107,7 @@ async def get_contract_info(conid: str):
 async def search_secdef(body: SecdefSearchRequest = Body(...)):
     """Search for securities by symbol or company name."""
 
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.post(
             f"{settings.ib_gateway_url}/iserver/secdef/search",
             json=body.model_dump(by_alias=True, exclude_none=True),
@@ -127,7 +127,7 @@ async def get_secdef_strikes(
     if exchange:
         params["exchange"] = exchange
 
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(
             f"{settings.ib_gateway_url}/iserver/secdef/strikes",
             params=params,
@@ -155,7 +155,7 @@ async def get_secdef_info(
     if right is not None:
         params["right"] = right
 
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(
             f"{settings.ib_gateway_url}/iserver/secdef/info",
             params=params,
@@ -179,7 +179,7 @@ async def get_contract_algos(
     if addParams is not None:
         params["addParams"] = addParams
 
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(
             f"{settings.ib_gateway_url}/iserver/contract/{conid}/algos",
             params=params or None,
@@ -192,7 +192,7 @@ async def get_contract_algos(
 async def get_contract_rules(body: ContractRulesRequest = Body(...)):
     """Retrieve trading rules for a contract."""
 
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.post(
             f"{settings.ib_gateway_url}/iserver/contract/rules",
             json=body.model_dump()
@@ -207,7 +207,7 @@ async def get_contract_info_and_rules(
     isBuy: bool = Query(..., description="True for buy, false for sell"),
 ):
     params = {"isBuy": isBuy}
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(
             f"{settings.ib_gateway_url}/iserver/contract/{conid}/info-and-rules",
             params=params,
@@ -219,7 +219,7 @@ async def get_stock_contracts(symbols: str = Query(..., description="Comma separ
     """Retrieve stock contracts for the provided symbols."""
 
     params = {"symbols": symbols}
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(
             f"{settings.ib_gateway_url}/trsrv/stocks",
             params=params,
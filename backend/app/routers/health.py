@@ -0,0 +1,91 @@
+from typing import Any, Dict, List
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..config import settings
+from ..core.gateway import gateway_latency, loop_lag, pool_stats
+from ..services.exposure import exposure_index
+from ..services.pnl_stream import pnl_consumer
+from ..services.portfolio_cache import portfolio_cache
+from ..services.session import gateway_session
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+def _ratio(hits: int, misses: int) -> Dict[str, Any]:
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hitRatio": round(hits / total, 3) if total else None}
+
+
+def health_report() -> Dict[str, Any]:
+    """Everything from data the app already keeps; makes no upstream calls."""
+    return {
+        "gatewayUrl": settings.ib_gateway_url,
+        "gateway": {
+            "session": gateway_session.snapshot(),
+            "latency": gateway_latency.stats(),
+            "pool": pool_stats(),
+            "pnlStreamConnected": pnl_consumer.connected if settings.pnl_stream_enabled else None,
+        },
+        "caches": {
+            "portfolio": _ratio(portfolio_cache.hits, portfolio_cache.misses),
+            "exposureIndex": _ratio(exposure_index.hits, exposure_index.misses),
+            "gatewayAuthStatus": _ratio(gateway_session.hits, gateway_session.misses),
+        },
+        "eventLoopLag": loop_lag.stats(),
+    }
+
+
+def degraded_reasons(report: Dict[str, Any]) -> List[str]:
+    """Why this instance should be drained (empty when ready)."""
+    reasons = []
+    session = report["gateway"]["session"]
+    if settings.gateway_tickle_interval > 0:
+        age = session["checkedSecondsAgo"]
+        if session["error"]:
+            reasons.append(f"gateway tickle failing: {session['error']}")
+        elif age is None or age > settings.gateway_tickle_interval * 3:
+            reasons.append("gateway auth state unknown or stale")
+        elif not session["authenticated"]:
+            reasons.append("gateway session not authenticated")
+        elif session["competing"]:
+            reasons.append("gateway session competing")
+
+    latency = report["gateway"]["latency"]
+    # too few calls in the window and a single slow or failed call would drain the instance
+    if latency["calls"] >= settings.health_min_calls:
+        if latency["p95Ms"] is not None and latency["p95Ms"] > settings.health_max_p95_ms:
+            reasons.append(f"gateway p95 {latency['p95Ms']} ms > {settings.health_max_p95_ms:g} ms")
+        if latency["errorRatio"] is not None and latency["errorRatio"] > settings.health_max_error_ratio:
+            reasons.append(f"gateway error ratio {latency['errorRatio']} > {settings.health_max_error_ratio:g}")
+
+    lag = report["eventLoopLag"]["lastMs"]
+    if lag is not None and lag > settings.health_max_loop_lag_ms:
+        reasons.append(f"event loop lag {lag} ms > {settings.health_max_loop_lag_ms:g} ms")
+    return reasons
+
+
+@router.get("")
+async def health():
+    return {
+        "status": "ok",
+        "gateway_url": settings.ib_gateway_url,
+    }
+
+
+@router.get("/deep")
+async def deep_health():
+    """Rolling gateway latency, auth state, pool saturation, cache hit ratios and loop lag."""
+    report = health_report()
+    reasons = degraded_reasons(report)
+    return {"status": "degraded" if reasons else "ok", "reasons": reasons, **report}
+
+
+@router.get("/ready")
+async def readiness():
+    """Load balancer readiness: 200 when the gateway path is healthy, else 503 (drain)."""
+    reasons = degraded_reasons(health_report())
+    if reasons:
+        return JSONResponse(status_code=503, content={"status": "degraded", "reasons": reasons})
+    return {"status": "ok"}
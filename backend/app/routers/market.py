@@ -1,9 +1,9 @@
 from typing import List, Optional, Dict, Any
 
 from fastapi import APIRouter, Query, Body
-import httpx
 
 from ..config import settings
+from ..core.gateway import gateway_client
 from ..models.market import (
     SymbolRecord,
     QuoteRecord,
@@ -24,7 +24,7 @@ async def search_symbols(
     Search for securities/contracts by symbol.
     IB API: /iserver/secdef/search
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.post(
             f"{settings.ib_gateway_url}/iserver/secdef/search",
             json={"symbol": symbol, "secType": secType, "name": name},
@@ -41,7 +41,7 @@ async def get_contract_info(
     Get contract information/details.
     IB API: /iserver/secdef/info
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(
             f"{settings.ib_gateway_url}/iserver/secdef/info",
             params={"conid": conid},
@@ -59,7 +59,7 @@ async def get_market_data_snapshot(
     Get market data snapshot for specified contracts.
     IB API: /iserver/marketdata/snapshot
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.post(
             f"{settings.ib_gateway_url}/iserver/marketdata/snapshot",
             json={"conids": conids, "fields": fields},
@@ -77,7 +77,7 @@ async def subscribe_market_data(
     Subscribe to market data for specified contracts.
     IB API: /iserver/marketdata/subscribe
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.post(
             f"{settings.ib_gateway_url}/iserver/marketdata/subscribe",
             json={"conids": conids, "fields": fields},
@@ -94,7 +94,7 @@ async def unsubscribe_market_data(
     Unsubscribe from market data for specified contracts.
     IB API: /iserver/marketdata/unsubscribe
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.post(
             f"{settings.ib_gateway_url}/iserver/marketdata/unsubscribe",
             json={"conids": conids},
@@ -115,7 +115,7 @@ async def get_historical_data(
     Get historical market data.
     IB API: /iserver/marketdata/history
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         params = {"conid": conid, "period": period, "bar": bar, "outsideRth": outsideRth}
         if exchange:
             params["exchange"] = exchange
@@ -133,7 +133,7 @@ async def unsubscribe_all_market_data(conid: str):
     Unsubscribe from all market data for a specific contract.
     IB API: /iserver/marketdata/{conid}/unsubscribeall
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(
             f"{settings.ib_gateway_url}/iserver/marketdata/{conid}/unsubscribeall",
         )
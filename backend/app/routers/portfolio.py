@@ -1,28 +1,52 @@
+import json
 from typing import List, Optional, Dict, Any
 
-from fastapi import APIRouter, Query, Body
-import httpx
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Body, Request, Response
+from fastapi.responses import StreamingResponse
 
 from ..config import settings
+from ..core.gateway import gateway_client, get_gateway_client
 from ..models.portfolio import (
     AccountRecord,
     PositionRecord,
     PnLRecord,
     AccountSummaryRecord,
     AccountLedgerRecord,
+    ConidExposure,
+    ExposureRequest,
+    PortfolioOverviewResponse,
 )
+from ..services.accounts import fetch_accounts_overview, list_account_ids
+from ..services.exposure import exposure_index
+from ..services.pnl_stream import pnl_consumer, pnl_store, sse_events
+from ..services.portfolio_cache import portfolio_cache
+from ..services.positions import fetch_positions_page, iter_all_positions
 
 
 router = APIRouter(prefix="/portfolio", tags=["portfolio"])
 
 
+async def _gateway_get(path: str) -> Any:
+    async with gateway_client() as client:
+        response = await client.get(f"{settings.ib_gateway_url}{path}")
+        response.raise_for_status()
+        return response.json()
+
+
+async def _cached_get(response: Response, accountId: str, endpoint: str, path: str) -> Any:
+    """Serve `path` through the portfolio cache and report the entry age in the `Age` header."""
+    value, age = await portfolio_cache.get(accountId, endpoint, lambda: _gateway_get(path))
+    response.headers["Age"] = str(int(age))
+    return value
+
+
 @router.get("/accounts", response_model=List[AccountRecord])
 async def get_portfolio_accounts():
     """
     Get portfolio accounts.
     IB API: /portfolio/accounts
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(f"{settings.ib_gateway_url}/portfolio/accounts")
         response.raise_for_status()
         return response.json()
@@ -34,7 +58,7 @@ async def get_subaccounts():
     Get list of sub-accounts.
     IB API: /portfolio/subaccounts
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(f"{settings.ib_gateway_url}/portfolio/subaccounts")
         response.raise_for_status()
         return response.json()
@@ -46,34 +70,136 @@ async def get_subaccounts2():
     Get list of sub-accounts (for large accounts).
     IB API: /portfolio/subaccounts2
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(f"{settings.ib_gateway_url}/portfolio/subaccounts2")
         response.raise_for_status()
         return response.json()
 
 
+@router.get("/overview", response_model=PortfolioOverviewResponse)
+async def get_portfolio_overview(
+    accounts: Optional[str] = Query(
+        None,
+        description="Comma separated account ids. Defaults to every account from /portfolio/subaccounts2.",
+    ),
+):
+    """
+    Get summary, ledger and all positions for many accounts in one call.
+    Accounts are fetched concurrently with bounded parallelism and a per-account
+    timeout; accounts that fail are returned with `errors` and `partial` is set.
+    IB API: /portfolio/{accountId}/summary, /ledger, /positions/{pageId}
+    """
+    async with gateway_client() as client:
+        if accounts:
+            account_ids = [a.strip() for a in accounts.split(",") if a.strip()]
+        else:
+            account_ids = await list_account_ids(client)
+        bundles = await fetch_accounts_overview(client, account_ids)
+    return {
+        "accounts": bundles,
+        "partial": any(bundle["errors"] for bundle in bundles),
+    }
+
+
+async def _exposure_for(conids: Optional[List[int]]) -> List[Dict[str, Any]]:
+    async with gateway_client() as client:
+        await exposure_index.ensure_loaded(client)
+    return exposure_index.lookup(conids or None)
+
+
+async def _refresh_account_exposure(accountId: str) -> None:
+    async with gateway_client() as client:
+        await exposure_index.refresh_account(client, accountId)
+
+
+@router.get("/exposure", response_model=List[ConidExposure])
+async def get_exposure(
+    conids: Optional[str] = Query(None, description="Comma separated conids; omit for every held conid"),
+):
+    """
+    Get the total holding of conids across all accounts, with a per-account breakdown.
+    Served from the in-memory exposure index, refreshed in the background.
+    """
+    try:
+        ids = [int(c) for c in conids.split(",") if c.strip()] if conids else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="conids must be comma separated integers")
+    return await _exposure_for(ids)
+
+
+@router.post("/exposure", response_model=List[ConidExposure])
+async def post_exposure(body: ExposureRequest = Body(...)):
+    """
+    Bulk variant of GET /portfolio/exposure for large conid lists.
+    """
+    return await _exposure_for(body.conids)
+
+
+def _require_pnl_stream() -> None:
+    # without the consumer the store stays empty: an empty 200 would read as "no PnL"
+    if not pnl_consumer.running:
+        raise HTTPException(status_code=503, detail="PnL stream disabled")
+
+
+@router.get("/pnl", response_model=List[PnLRecord])
+async def get_all_pnl():
+    """
+    Get the latest PnL of every account and partition.
+    Served from memory; fed by the gateway websocket `spl` topic (503 when disabled).
+    """
+    _require_pnl_stream()
+    return pnl_store.all()
+
+
+@router.get("/pnl/stream")
+async def stream_pnl(request: Request, account: Optional[str] = Query(None, description="Only this account")):
+    """
+    Server-sent events with PnL updates (`event: pnl`, one PnLRecord per event).
+    The current records are sent first, then every change from the `spl` topic.
+    """
+    _require_pnl_stream()
+
+    async def stream():
+        async for event in sse_events(pnl_store, account):
+            if await request.is_disconnected():
+                break
+            yield event
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{accountId}/pnl", response_model=List[PnLRecord])
+async def get_account_pnl(accountId: str):
+    """
+    Get the latest PnL of an account, one record per partition.
+    Served from memory; fed by the gateway websocket `spl` topic (503 when disabled).
+    """
+    _require_pnl_stream()
+    return pnl_store.get(accountId)
+
+
 @router.get("/{accountId}/meta", response_model=Dict[str, Any])
-async def get_account_meta(accountId: str):
+async def get_account_meta(accountId: str, response: Response):
     """
-    Get account information/metadata.
+    Get account information/metadata (cached).
     IB API: /portfolio/{accountId}/meta
     """
-    async with httpx.AsyncClient(verify=False) as client:
-        response = await client.get(f"{settings.ib_gateway_url}/portfolio/{accountId}/meta")
-        response.raise_for_status()
-        return response.json()
+    return await _cached_get(response, accountId, "meta", f"/portfolio/{accountId}/meta")
 
 
 @router.get("/{accountId}/allocation", response_model=Dict[str, Any])
-async def get_account_allocation(accountId: str):
+async def get_account_allocation(accountId: str, response: Response):
     """
-    Get account allocation information.
+    Get account allocation information (cached).
     IB API: /portfolio/{accountId}/allocation
     """
-    async with httpx.AsyncClient(verify=False) as client:
-        response = await client.get(f"{settings.ib_gateway_url}/portfolio/{accountId}/allocation")
-        response.raise_for_status()
-        return response.json()
+    return await _cached_get(
+        response, accountId, "allocation", f"/portfolio/{accountId}/allocation"
+    )
 
 
 @router.post("/allocation", response_model=Dict[str, Any])
@@ -82,27 +208,47 @@ async def get_all_accounts_allocation():
     Get account allocation for all accounts.
     IB API: /portfolio/allocation
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.post(f"{settings.ib_gateway_url}/portfolio/allocation")
         response.raise_for_status()
         return response.json()
 
 
+@router.get("/{accountId}/positions/all")
+async def get_all_portfolio_positions(accountId: str):
+    """
+    Get every position of an account as NDJSON (one position per line).
+    Pages are fetched concurrently and de-duplicated by conid; rows are streamed
+    as their page arrives.
+    IB API: /portfolio/{accountId}/positions/{pageId}
+    """
+    client = get_gateway_client()
+    # Read page 0 before streaming so upstream errors still map to a status code
+    first_page = await fetch_positions_page(client, accountId, 0)
+
+    async def stream():
+        async for row in iter_all_positions(client, accountId, first_page=first_page):
+            yield json.dumps(row) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.get("/{accountId}/positions/{pageId}", response_model=List[PositionRecord])
 async def get_portfolio_positions(
     accountId: str,
     pageId: str,
+    response: Response,
 ):
     """
-    Get portfolio positions for an account (paginated).
+    Get portfolio positions for an account (paginated, cached per page).
     IB API: /portfolio/{accountId}/positions/{pageId}
     """
-    async with httpx.AsyncClient(verify=False) as client:
-        response = await client.get(
-            f"{settings.ib_gateway_url}/portfolio/{accountId}/positions/{pageId}"
-        )
-        response.raise_for_status()
-        return response.json()
+    return await _cached_get(
+        response,
+        accountId,
+        f"positions:{pageId}",
+        f"/portfolio/{accountId}/positions/{pageId}",
+    )
 
 
 @router.get("/{accountId}/position/{conid}", response_model=PositionRecord)
@@ -111,7 +257,7 @@ async def get_position_by_conid(accountId: str, conid: str):
     Get position by contract ID (conid) for an account.
     IB API: /portfolio/{accountId}/position/{conid}
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(
             f"{settings.ib_gateway_url}/portfolio/{accountId}/position/{conid}"
         )
@@ -120,42 +266,39 @@ async def get_position_by_conid(accountId: str, conid: str):
 
 
 @router.post("/{accountId}/positions/invalidate")
-async def invalidate_portfolio_cache(accountId: str):
+async def invalidate_portfolio_cache(accountId: str, background_tasks: BackgroundTasks):
     """
-    Invalidate the backend cache of the Portfolio.
+    Invalidate the backend cache of the Portfolio, and the local portfolio cache of the account.
+    The account's slice of the exposure index is re-read afterwards.
     IB API: /portfolio/{accountId}/positions/invalidate
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    portfolio_cache.invalidate(accountId)
+    async with gateway_client() as client:
         response = await client.post(
             f"{settings.ib_gateway_url}/portfolio/{accountId}/positions/invalidate"
         )
         response.raise_for_status()
-        return response.json()
+    background_tasks.add_task(_refresh_account_exposure, accountId)
+    return response.json()
 
 
 @router.get("/{accountId}/summary", response_model=Dict[str, Any])
-async def get_portfolio_summary(accountId: str):
+async def get_portfolio_summary(accountId: str, response: Response):
     """
-    Get account summary for an account.
+    Get account summary for an account (cached).
     IB API: /portfolio/{accountId}/summary
     """
-    async with httpx.AsyncClient(verify=False) as client:
-        response = await client.get(f"{settings.ib_gateway_url}/portfolio/{accountId}/summary")
-        response.raise_for_status()
-        return response.json()
+    return await _cached_get(response, accountId, "summary", f"/portfolio/{accountId}/summary")
 
 
 @router.get("/{accountId}/ledger", response_model=Dict[str, AccountLedgerRecord])
-async def get_portfolio_ledger(accountId: str):
+async def get_portfolio_ledger(accountId: str, response: Response):
     """
-    Get account ledger for an account.
+    Get account ledger for an account (cached).
     Returns a dictionary keyed by currency (e.g., 'USD', 'BASE').
     IB API: /portfolio/{accountId}/ledger
     """
-    async with httpx.AsyncClient(verify=False) as client:
-        response = await client.get(f"{settings.ib_gateway_url}/portfolio/{accountId}/ledger")
-        response.raise_for_status()
-        return response.json()
+    return await _cached_get(response, accountId, "ledger", f"/portfolio/{accountId}/ledger")
 
 
 @router.get("/positions/{conid}", response_model=List[PositionRecord])
@@ -164,7 +307,7 @@ async def get_positions_by_conid(conid: str):
     Get positions by contract ID (conid) across all accounts.
     IB API: /portfolio/positions/{conid}
     """
-    async with httpx.AsyncClient(verify=False) as client:
+    async with gateway_client() as client:
         response = await client.get(f"{settings.ib_gateway_url}/portfolio/positions/{conid}")
         response.raise_for_status()
         return response.json()
@@ -0,0 +1,3 @@
+"""
+Gateway-facing services shared by the routers (position paging, caches, background consumers).
+"""
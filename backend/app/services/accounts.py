@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ..config import settings
+from .positions import get_all_positions
+
+
+async def list_account_ids(client: httpx.AsyncClient) -> List[str]:
+    """
+    Enumerate the account ids visible to the session.
+    IB API: /portfolio/subaccounts2
+    """
+    response = await client.get(f"{settings.ib_gateway_url}/portfolio/subaccounts2")
+    response.raise_for_status()
+    data = response.json()
+    # large-account payloads wrap the list as {"metadata": ..., "subaccounts": [...]}
+    if isinstance(data, dict):
+        data = data.get("subaccounts", [])
+    return [item["accountId"] for item in data if item.get("accountId")]
+
+
+async def _get_json(client: httpx.AsyncClient, path: str) -> Any:
+    response = await client.get(f"{settings.ib_gateway_url}{path}")
+    response.raise_for_status()
+    return response.json()
+
+
+async def fetch_account_bundle(client: httpx.AsyncClient, account_id: str) -> Dict[str, Any]:
+    """
+    Fetch summary, ledger and all positions of one account concurrently.
+    A failing section is reported in `errors` instead of failing the whole account.
+    """
+    sections = {
+        "summary": _get_json(client, f"/portfolio/{account_id}/summary"),
+        "ledger": _get_json(client, f"/portfolio/{account_id}/ledger"),
+        "positions": get_all_positions(client, account_id),
+    }
+    results = await asyncio.gather(*sections.values(), return_exceptions=True)
+
+    bundle: Dict[str, Any] = {"accountId": account_id, "errors": {}}
+    for name, result in zip(sections, results):
+        if isinstance(result, Exception):
+            bundle[name] = None
+            bundle["errors"][name] = str(result) or type(result).__name__
+        else:
+            bundle[name] = result
+    return bundle
+
+
+async def fetch_accounts_overview(
+    client: httpx.AsyncClient,
+    account_ids: List[str],
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fan out `fetch_account_bundle` over many accounts with bounded parallelism.
+    Each account gets its own timeout, so one slow account only loses its own data.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency or settings.portfolio_fanout_concurrency))
+    timeout = timeout or settings.portfolio_fanout_timeout
+
+    async def run(account_id: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(fetch_account_bundle(client, account_id), timeout)
+            except asyncio.TimeoutError:
+                return {
+                    "accountId": account_id,
+                    "summary": None,
+                    "ledger": None,
+                    "positions": None,
+                    "errors": {"account": f"Timed out after {timeout:g}s"},
+                }
+
+    return await asyncio.gather(*(run(account_id) for account_id in account_ids))
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from ..config import settings
+from ..core.gateway import gateway_client
+from .accounts import list_account_ids
+from .positions import get_all_positions
+
+logger = logging.getLogger(__name__)
+
+
+class ExposureIndex:
+    """
+    In-memory index of holdings across accounts: conid -> accountId -> holding.
+
+    Each account's slice is replaced as a unit when it is refreshed, so a refresh
+    only touches the conids that account holds (or used to hold).
+    """
+
+    def __init__(self) -> None:
+        self._by_conid: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self._by_account: Dict[str, set] = {}
+        self.refreshed_at: Dict[str, float] = {}
+        self.loaded_at: Optional[float] = None  # end of the last full refresh
+        self._lock = asyncio.Lock()
+        # ensure_loaded calls served from the index vs. ones that had to load it
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.refreshed_at
+
+    def update_account(self, account_id: str, positions: Iterable[Dict[str, Any]]) -> None:
+        """Replace the holdings of one account with `positions` (gateway position rows)."""
+        holdings: Dict[int, Dict[str, Any]] = {}
+        for row in positions:
+            if row.get("conid") is None or not row.get("position"):
+                continue
+            holdings[int(row["conid"])] = {
+                "quantity": float(row.get("position") or 0.0),
+                "mktValue": float(row.get("mktValue") or 0.0),
+                "avgCost": row.get("avgCost"),
+                "currency": row.get("currency"),
+                "symbol": row.get("ticker") or row.get("contractDesc"),
+            }
+
+        for conid in self._by_account.get(account_id, set()) - holdings.keys():
+            accounts = self._by_conid.get(conid)
+            if accounts is not None:
+                accounts.pop(account_id, None)
+                if not accounts:
+                    del self._by_conid[conid]
+        for conid, holding in holdings.items():
+            self._by_conid.setdefault(conid, {})[account_id] = holding
+        self._by_account[account_id] = set(holdings)
+        self.refreshed_at[account_id] = time.time()
+
+    def remove_account(self, account_id: str) -> None:
+        self.update_account(account_id, [])
+        self._by_account.pop(account_id, None)
+        self.refreshed_at.pop(account_id, None)
+
+    def exposure(self, conid: int) -> Optional[Dict[str, Any]]:
+        accounts = self._by_conid.get(conid)
+        if not accounts:
+            return None
+        total_quantity = sum(h["quantity"] for h in accounts.values())
+        cost_quantity = sum(h["quantity"] for h in accounts.values() if h["avgCost"] is not None)
+        avg_cost = None
+        if cost_quantity:
+            avg_cost = sum(
+                h["quantity"] * h["avgCost"] for h in accounts.values() if h["avgCost"] is not None
+            ) / cost_quantity
+        any_holding = next(iter(accounts.values()))
+        return {
+            "conid": conid,
+            "symbol": any_holding["symbol"],
+            "currency": any_holding["currency"],
+            "totalQuantity": total_quantity,
+            "totalMarketValue": sum(h["mktValue"] for h in accounts.values()),
+            "avgCost": avg_cost,
+            "accounts": [
+                {
+                    "accountId": account_id,
+                    "quantity": h["quantity"],
+                    "mktValue": h["mktValue"],
+                    "avgCost": h["avgCost"],
+                }
+                for account_id, h in accounts.items()
+            ],
+        }
+
+    def lookup(self, conids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """Exposure of the given conids (all indexed conids when None); unknown conids are skipped."""
+        keys = self._by_conid.keys() if conids is None else conids
+        return [item for item in (self.exposure(int(conid)) for conid in keys) if item is not None]
+
+    async def refresh_account(self, client: httpx.AsyncClient, account_id: str) -> None:
+        self.update_account(account_id, await get_all_positions(client, account_id))
+
+    async def refresh_all(self, client: httpx.AsyncClient) -> None:
+        """Re-read every account's positions with bounded parallelism; drop vanished accounts."""
+        async with self._lock:
+            await self._refresh_all(client)
+
+    async def ensure_loaded(self, client: httpx.AsyncClient) -> None:
+        """
+        Run the first full refresh if none has completed yet. Callers arriving while
+        one is running wait for it instead of starting another.
+        """
+        if self.loaded_at is not None:
+            self.hits += 1
+            return
+        self.misses += 1
+        async with self._lock:
+            if self.loaded_at is None:
+                await self._refresh_all(client)
+
+    async def _refresh_all(self, client: httpx.AsyncClient) -> None:
+        # caller holds the lock
+        account_ids = await list_account_ids(client)
+        semaphore = asyncio.Semaphore(max(1, settings.portfolio_fanout_concurrency))
+
+        async def refresh(account_id: str) -> None:
+            async with semaphore:
+                try:
+                    await self.refresh_account(client, account_id)
+                except Exception as exc:
+                    logger.warning("Exposure refresh failed for %s: %s", account_id, exc)
+
+        await asyncio.gather(*(refresh(account_id) for account_id in account_ids))
+        for account_id in set(self._by_account) - set(account_ids):
+            self.remove_account(account_id)
+        self.loaded_at = time.time()
+
+    async def run_refresher(self, interval: Optional[float] = None) -> None:
+        """Background task refreshing the whole index. Cancel to stop."""
+        interval = interval or settings.exposure_refresh_interval
+        while True:
+            try:
+                async with gateway_client() as client:
+                    await self.refresh_all(client)
+            except Exception as exc:
+                logger.warning("Exposure index refresh failed: %s", exc)
+            await asyncio.sleep(interval)
+
+
+exposure_index = ExposureIndex()
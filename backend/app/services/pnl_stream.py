@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import ssl
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import websockets
+
+from ..config import settings
+from ..models.portfolio import PnLRecord
+from .session import gateway_session
+
+logger = logging.getLogger(__name__)
+
+# spl payload keys -> PnLRecord fields
+_SPL_FIELDS = {
+    "dpl": "DailyPnL",
+    "upl": "UnrealizedPnL",
+    "rpl": "RealizedPnL",
+    "nl": "NetLiquidation",
+    "el": "ExcessLiquidity",
+    "mv": "MarketValue",
+}
+
+
+class PnLStore:
+    """
+    In-memory account PnL, keyed by account and partition (e.g. "DU1234" / "Core").
+
+    Updates from the `spl` topic are merged field by field, since the gateway only
+    resends values that changed. Reads are plain dict lookups. Subscribers get every
+    changed record through a bounded queue; slow subscribers lose the oldest updates.
+    """
+
+    def __init__(self, queue_size: int = 256) -> None:
+        self._records: Dict[str, Dict[str, PnLRecord]] = {}
+        self._subscribers: set[asyncio.Queue] = set()
+        self._queue_size = queue_size
+
+    def apply(self, args: Dict[str, Any]) -> List[PnLRecord]:
+        """Merge an `spl` message's args; returns the records that changed."""
+        changed: List[PnLRecord] = []
+        now = int(time.time() * 1000)
+        for key, values in args.items():
+            if not isinstance(values, dict):
+                continue
+            account, _, partition = key.partition(".")
+            partitions = self._records.setdefault(account, {})
+            record = partitions.get(partition) or PnLRecord(account=account, partition=partition)
+            update = {
+                field: values[source] for source, field in _SPL_FIELDS.items() if source in values
+            }
+            record = record.model_copy(update={**update, "updated": now})
+            partitions[partition] = record
+            changed.append(record)
+
+        for record in changed:
+            for queue in self._subscribers:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(record)
+        return changed
+
+    def get(self, account: str) -> List[PnLRecord]:
+        return list(self._records.get(account, {}).values())
+
+    def all(self) -> List[PnLRecord]:
+        return [record for partitions in self._records.values() for record in partitions.values()]
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    @contextlib.contextmanager
+    def subscribe(self):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+
+class PnLStreamConsumer:
+    """
+    Background consumer of the gateway websocket `spl` topic feeding a PnLStore.
+    Reconnects with exponential backoff and sends the `ech+hb` heartbeat the
+    gateway expects at least once a minute.
+    """
+
+    def __init__(
+        self,
+        store: PnLStore,
+        ws_url: str,
+        heartbeat_seconds: float = 55.0,
+        max_backoff: float = 60.0,
+    ) -> None:
+        self.store = store
+        self.ws_url = ws_url
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_backoff = max_backoff
+        self.connected = False
+        # True while run() is active (connected or reconnecting)
+        self.running = False
+
+    async def _session_id(self) -> Optional[str]:
+        # a fresh tickle through the shared session manager (also updates its cached auth state)
+        await gateway_session.refresh()
+        return gateway_session.session_id
+
+    async def _heartbeat(self, ws) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            await ws.send("ech+hb")
+
+    async def _consume(self) -> None:
+        options = {}
+        if self.ws_url.startswith("wss://"):
+            # the gateway serves a self-signed certificate
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+            options["ssl"] = ssl_context
+
+        session_id = await self._session_id()
+        async with websockets.connect(self.ws_url, **options) as ws:
+            if session_id:
+                await ws.send(json.dumps({"session": session_id}))
+            await ws.send("spl+{}")
+            self.connected = True
+            heartbeat = asyncio.create_task(self._heartbeat(ws))
+            try:
+                async for raw in ws:
+                    try:
+                        message = json.loads(raw)
+                    except (TypeError, ValueError):
+                        continue
+                    if isinstance(message, dict) and message.get("topic") == "spl":
+                        self.store.apply(message.get("args") or {})
+            finally:
+                self.connected = False
+                heartbeat.cancel()
+
+    async def run(self) -> None:
+        """Consume forever. Cancel to stop."""
+        backoff = 1.0
+        self.running = True
+        try:
+            while True:
+                try:
+                    await self._consume()
+                    backoff = 1.0
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    logger.warning("PnL stream disconnected: %s (retrying in %.0fs)", exc, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+        finally:
+            self.running = False
+
+
+async def sse_events(store: PnLStore, account: Optional[str] = None, keepalive: float = 15.0) -> AsyncIterator[str]:
+    """Server-sent events: the current records first, then every update."""
+    with store.subscribe() as queue:
+        for record in store.get(account) if account else store.all():
+            yield f"event: pnl\ndata: {record.model_dump_json()}\n\n"
+        while True:
+            try:
+                record = await asyncio.wait_for(queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if account is None or record.account == account:
+                yield f"event: pnl\ndata: {record.model_dump_json()}\n\n"
+
+
+pnl_store = PnLStore()
+pnl_consumer = PnLStreamConsumer(pnl_store, settings.ib_gateway_ws_url)
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+Fetcher = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float
+    fetch: Fetcher
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.stored_at)
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse "summary=30,ledger=30" into {"summary": 30.0, "ledger": 30.0}."""
+    ttls: Dict[str, float] = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip():
+            ttls[name.strip()] = float(value)
+    return ttls
+
+
+class PortfolioCache:
+    """
+    Per-account read-through cache for portfolio endpoints.
+
+    Entries are keyed by (accountId, endpoint) and expire after the endpoint's TTL
+    (a TTL of 0 or a missing endpoint disables caching). Concurrent misses on the
+    same key share one upstream request. Accounts read within `hot_seconds` are
+    kept warm by `run_refresher`, which re-fetches entries shortly before expiry.
+    """
+
+    def __init__(
+        self,
+        ttls: Dict[str, float],
+        hot_seconds: float = 300.0,
+        refresh_interval: float = 5.0,
+    ) -> None:
+        self.ttls = ttls
+        self.hot_seconds = hot_seconds
+        self.refresh_interval = refresh_interval
+        self._entries: Dict[Tuple[str, str], CacheEntry] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._last_read: Dict[str, float] = {}
+        # bumped by invalidate(); a fetch started under an older generation is not stored
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def ttl_for(self, endpoint: str) -> float:
+        # "positions:0" shares the "positions" TTL
+        return self.ttls.get(endpoint, self.ttls.get(endpoint.split(":", 1)[0], 0.0))
+
+    async def get(self, account_id: str, endpoint: str, fetch: Fetcher) -> Tuple[Any, float]:
+        """Return (value, age in seconds), fetching upstream on a miss."""
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            return await fetch(), 0.0
+
+        key = (account_id, endpoint)
+        self._last_read[account_id] = time.time()
+        entry = self._entries.get(key)
+        if entry is not None and entry.age < ttl:
+            self.hits += 1
+            return entry.value, entry.age
+
+        self.misses += 1
+        entry = await self._load(key, fetch)
+        return entry.value, entry.age
+
+    async def _load(self, key: Tuple[str, str], fetch: Fetcher) -> CacheEntry:
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generations.get(key[0], 0)
+        try:
+            value = await fetch()
+            entry = CacheEntry(value=value, stored_at=time.time(), fetch=fetch)
+            if self._generations.get(key[0], 0) == generation:
+                self._entries[key] = entry
+            future.set_result(entry)
+            return entry
+        except BaseException as exc:
+            future.set_exception(exc)
+            # mark retrieved so a miss without waiters does not log "never retrieved"
+            future.exception()
+            raise
+        finally:
+            # invalidate() may already have replaced it with a newer fetch
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def invalidate(self, account_id: str) -> int:
+        """
+        Drop every cached endpoint of an account. Returns the number of entries removed.
+        Fetches already in flight still answer their waiters but are not stored, and
+        later reads start a new fetch.
+        """
+        self._generations[account_id] = self._generations.get(account_id, 0) + 1
+        for key in [key for key in self._inflight if key[0] == account_id]:
+            self._inflight.pop(key, None)
+        keys = [key for key in self._entries if key[0] == account_id]
+        for key in keys:
+            self._entries.pop(key, None)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def refresh_once(self) -> None:
+        """Re-fetch entries of hot accounts that expire before the next pass; evict cold ones."""
+        now = time.time()
+        due = []
+        for key, entry in list(self._entries.items()):
+            ttl = self.ttl_for(key[1])
+            if now - self._last_read.get(key[0], 0.0) > self.hot_seconds:
+                if entry.age >= ttl:
+                    self._entries.pop(key, None)
+                continue
+            if entry.age + self.refresh_interval * 2 >= ttl:
+                due.append((key, entry))
+
+        async def refresh(key: Tuple[str, str], entry: CacheEntry) -> None:
+            try:
+                await self._load(key, entry.fetch)
+            except Exception as exc:
+                logger.warning("Portfolio cache refresh failed for %s/%s: %s", key[0], key[1], exc)
+
+        cached_accounts = {key[0] for key in self._entries}
+        for account_id, last_read in list(self._last_read.items()):
+            if now - last_read > self.hot_seconds and account_id not in cached_accounts:
+                del self._last_read[account_id]
+                self._generations.pop(account_id, None)
+
+        if due:
+            await asyncio.gather(*(refresh(key, entry) for key, entry in due))
+
+    async def run_refresher(self) -> None:
+        """Background task keeping hot accounts warm. Cancel to stop."""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh_once()
+
+
+portfolio_cache = PortfolioCache(
+    parse_ttls(settings.portfolio_cache_ttls),
+    hot_seconds=settings.portfolio_cache_hot_seconds,
+    refresh_interval=settings.portfolio_cache_refresh_interval,
+)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import httpx
+
+from ..config import settings
+
+# The gateway returns at most this many positions per page.
+POSITIONS_PAGE_SIZE = 100
+
+
+async def fetch_positions_page(
+    client: httpx.AsyncClient, account_id: str, page: int
+) -> List[Dict[str, Any]]:
+    """Fetch a single positions page. IB API: /portfolio/{accountId}/positions/{pageId}"""
+    response = await client.get(
+        f"{settings.ib_gateway_url}/portfolio/{account_id}/positions/{page}"
+    )
+    response.raise_for_status()
+    return response.json() or []
+
+
+async def iter_position_pages(
+    client: httpx.AsyncClient,
+    account_id: str,
+    first_page: Optional[List[Dict[str, Any]]] = None,
+    concurrency: Optional[int] = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield every positions page of an account as soon as it arrives.
+
+    The gateway does not report a page count, so it is discovered by probing:
+    page 0 is read first (or taken from `first_page`), and while pages come back
+    full the next `concurrency` pages are requested together. The first short
+    page marks the end of the account.
+    """
+    concurrency = max(1, concurrency or settings.positions_page_concurrency)
+    if first_page is None:
+        first_page = await fetch_positions_page(client, account_id, 0)
+    yield first_page
+    if len(first_page) < POSITIONS_PAGE_SIZE:
+        return
+
+    next_page = 1
+    while True:
+        window = range(next_page, next_page + concurrency)
+        done = False
+        for pending in asyncio.as_completed(
+            [fetch_positions_page(client, account_id, page) for page in window]
+        ):
+            rows = await pending
+            if len(rows) < POSITIONS_PAGE_SIZE:
+                done = True
+            yield rows
+        if done:
+            return
+        next_page += concurrency
+
+
+def unique_positions(rows: List[Dict[str, Any]], seen: set) -> Iterator[Dict[str, Any]]:
+    """Rows of one page whose conid is not in `seen` (which is updated)."""
+    for row in rows:
+        conid = row.get("conid")
+        if conid is not None:
+            if conid in seen:
+                continue
+            seen.add(conid)
+        yield row
+
+
+async def iter_all_positions(
+    client: httpx.AsyncClient,
+    account_id: str,
+    first_page: Optional[List[Dict[str, Any]]] = None,
+    concurrency: Optional[int] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the positions of every page, de-duplicated by conid."""
+    seen: set = set()
+    async for rows in iter_position_pages(client, account_id, first_page, concurrency):
+        for row in unique_positions(rows, seen):
+            yield row
+
+
+async def get_all_positions(
+    client: httpx.AsyncClient, account_id: str, concurrency: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Collect all positions of an account into a list."""
+    return [row async for row in iter_all_positions(client, account_id, concurrency=concurrency)]
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from ..config import settings
+from ..core.gateway import get_gateway_client
+
+logger = logging.getLogger(__name__)
+
+
+class GatewaySession:
+    """
+    Keeps the Client Portal gateway session alive and caches its auth state.
+
+    `run` tickles the gateway every `tickle_interval` seconds (the session times out
+    after a few idle minutes) and stores the auth/competing status returned with the
+    tickle, so status reads are served from memory. Whenever the session is new,
+    e.g. after a re-login or a gateway restart, `/iserver/accounts` is requested
+    again: the gateway needs it before market-data and order calls, and doing it
+    here keeps that first call after idle from paying for it.
+
+    Calls go through `client_factory`'s client (e.g. the app's shared pool), or a
+    client of its own when none is given.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        tickle_interval: float = 60.0,
+        verify_ssl: bool = False,
+        client_factory: Optional[Callable[[], httpx.AsyncClient]] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.tickle_interval = tickle_interval
+        self.verify_ssl = verify_ssl
+        self._client_factory = client_factory
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = asyncio.Lock()
+        self.auth_status: Optional[Dict[str, Any]] = None
+        self.checked_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.session_id: Optional[str] = None
+        self.accounts_ready = False
+        # status() calls answered from the cached auth state vs. ones that tickled
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client_factory is not None:
+            return self._client_factory()
+        if self._client is None:
+            self._client = httpx.AsyncClient(verify=self.verify_ssl, timeout=10.0)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def authenticated(self) -> bool:
+        return bool(self.auth_status and self.auth_status.get("authenticated"))
+
+    @property
+    def age(self) -> Optional[float]:
+        return None if self.checked_at is None else max(0.0, time.monotonic() - self.checked_at)
+
+    async def _init_accounts(self) -> None:
+        response = await self.client.get(f"{self.base_url}/iserver/accounts")
+        response.raise_for_status()
+        self.accounts_ready = True
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Tickle the gateway now, update the cached auth state and re-init accounts if needed."""
+        async with self._lock:
+            try:
+                response = await self.client.post(f"{self.base_url}/tickle")
+                response.raise_for_status()
+                tickle = response.json() or {}
+                status = (tickle.get("iserver") or {}).get("authStatus")
+                if status is None:
+                    response = await self.client.get(f"{self.base_url}/iserver/auth/status")
+                    response.raise_for_status()
+                    status = response.json()
+
+                session_id = tickle.get("session")
+                if session_id != self.session_id or not status.get("authenticated"):
+                    self.accounts_ready = False
+                self.session_id = session_id
+                self.auth_status = status
+                self.checked_at = time.monotonic()
+                self.error = None
+
+                if status.get("authenticated") and not status.get("competing") and not self.accounts_ready:
+                    await self._init_accounts()
+            except (httpx.HTTPError, ValueError) as exc:
+                self.error = str(exc) or type(exc).__name__
+                raise
+            return self.auth_status
+
+    async def status(self) -> Dict[str, Any]:
+        """Cached auth status; fetched on first use or once it is older than two tickle intervals."""
+        age = self.age
+        if age is None or age > self.tickle_interval * 2:
+            self.misses += 1
+            return await self.refresh()
+        self.hits += 1
+        return self.auth_status
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cached state without touching the gateway (for health reporting)."""
+        status = self.auth_status or {}
+        return {
+            "authenticated": bool(status.get("authenticated")),
+            "competing": bool(status.get("competing")),
+            "connected": bool(status.get("connected")),
+            "accountsReady": self.accounts_ready,
+            "checkedSecondsAgo": None if self.age is None else round(self.age, 1),
+            "error": self.error,
+        }
+
+    async def run(self) -> None:
+        """Tickle forever. Cancel to stop."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as exc:
+                logger.warning("Gateway tickle failed: %s", exc)
+            await asyncio.sleep(self.tickle_interval)
+
+
+gateway_session = GatewaySession(
+    settings.ib_gateway_url, settings.gateway_tickle_interval, client_factory=get_gateway_client
+)
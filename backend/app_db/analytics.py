@@ -0,0 +1,346 @@
+# analytics.py
+"""
+Portfolio risk analytics computed from the cached daily closes (`daily_close_series`).
+
+All held contracts are loaded into one aligned (dates x contracts) close matrix,
+so volatility, beta, Sharpe and YTD come out of a single set of NumPy operations
+instead of a per-position loop.
+"""
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import DailyCloseSeries
+
+TRADING_DAYS = 252
+
+
+@dataclass
+class CloseMatrix:
+    dates: np.ndarray    # datetime64[D], ascending
+    conids: List[int]
+    closes: np.ndarray   # shape (len(dates), len(conids)), forward-filled, NaN before first close
+
+    def column(self, conid: int) -> Optional[int]:
+        try:
+            return self.conids.index(conid)
+        except ValueError:
+            return None
+
+
+def unpack_series(series: DailyCloseSeries) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (days as datetime64[D], closes) of a stored series."""
+    days = np.frombuffer(series.days, dtype=np.int32).astype("datetime64[D]")
+    return days, np.frombuffer(series.closes, dtype=np.float64)
+
+
+def bars_to_arrays(bars: Iterable[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert IB history bars ({"t": epoch ms, "c": close, ...}) to (days, closes)."""
+    pairs = [(bar["t"], bar["c"]) for bar in bars if bar.get("t") is not None and bar.get("c") is not None]
+    if not pairs:
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype=np.float64)
+    raw = np.array(pairs, dtype=np.float64)
+    days = (raw[:, 0] // 86_400_000).astype(np.int64).astype("datetime64[D]")
+    return days, raw[:, 1]
+
+
+def store_daily_bars(db: Session, conid: int, symbol: str, bars: Iterable[Dict]) -> int:
+    """
+    Merge IB history bars into the stored series of `conid`. Bars for days already
+    stored replace the old close. Returns the number of bars merged; the caller commits.
+    """
+    new_days, new_closes = bars_to_arrays(bars)
+    if not len(new_days):
+        return 0
+
+    series = db.get(DailyCloseSeries, conid)
+    if series is None:
+        series = DailyCloseSeries(conid=conid)
+        db.add(series)
+        days, closes = new_days, new_closes
+    else:
+        old_days, old_closes = unpack_series(series)
+        days = np.concatenate([new_days, old_days])
+        closes = np.concatenate([new_closes, old_closes])
+
+    # np.unique keeps the first occurrence, i.e. the newly fetched close
+    days, first = np.unique(days, return_index=True)
+    series.days = days.astype(np.int32).tobytes()
+    series.closes = closes[first].astype(np.float64).tobytes()
+    series.symbol = symbol
+    series.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    return len(new_days)
+
+
+def conids_for_symbols(db: Session, symbols: Iterable[str]) -> Dict[str, int]:
+    """Map symbols to the conid their cached closes are stored under."""
+    symbols = list(set(symbols))
+    if not symbols:
+        return {}
+    result = db.execute(
+        select(DailyCloseSeries.symbol, DailyCloseSeries.conid)
+        .where(DailyCloseSeries.symbol.in_(symbols))
+    )
+    return {symbol: conid for symbol, conid in result}
+
+
+def load_close_matrix(db: Session, conids: Sequence[int], start: date) -> CloseMatrix:
+    """Load closes since `start` for `conids` into an aligned, forward-filled matrix."""
+    conids = list(dict.fromkeys(conids))
+    stored = {
+        series.conid: unpack_series(series)
+        for series in db.scalars(
+            select(DailyCloseSeries).where(DailyCloseSeries.conid.in_(conids))
+        )
+    }
+    first_day = np.datetime64(start, "D")
+    stored = {
+        conid: (days[days >= first_day], closes[days >= first_day])
+        for conid, (days, closes) in stored.items()
+    }
+    if not any(len(days) for days, _ in stored.values()):
+        return CloseMatrix(np.array([], dtype="datetime64[D]"), conids, np.empty((0, len(conids))))
+
+    dates = np.unique(np.concatenate([days for days, _ in stored.values()]))
+    closes = np.full((len(dates), len(conids)), np.nan)
+    for col, conid in enumerate(conids):
+        if conid in stored:
+            days, values = stored[conid]
+            closes[np.searchsorted(dates, days), col] = values
+    return CloseMatrix(dates, conids, _forward_fill(closes))
+
+
+def _forward_fill(matrix: np.ndarray) -> np.ndarray:
+    """Carry the last known close forward down each column (holidays, missing bars)."""
+    if matrix.size == 0:
+        return matrix
+    idx = np.where(np.isnan(matrix), 0, np.arange(matrix.shape[0])[:, None])
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    filled = matrix[idx, np.arange(matrix.shape[1])]
+    return filled
+
+
+# Perf lookbacks in trading days (bars back from the latest close)
+PERF_WINDOWS = {"perf_30d": 30, "perf_60d": 60, "perf_1y": TRADING_DAYS}
+# History requested for a contract with no stored closes yet
+INITIAL_HISTORY_PERIOD = "1y"
+
+
+def history_periods(db: Session, conids: Iterable[int], today: Optional[date] = None) -> Dict[int, str]:
+    """
+    History period to request per conid so the store only downloads what it is missing:
+    the full INITIAL_HISTORY_PERIOD for unknown contracts, otherwise the days since the
+    last stored close (today's bar is re-read while the session is open).
+    """
+    today = today or date.today()
+    conids = list(dict.fromkeys(conids))
+    last_day = {
+        series.conid: unpack_series(series)[0][-1].astype(object)
+        for series in db.scalars(
+            select(DailyCloseSeries).where(DailyCloseSeries.conid.in_(conids))
+        )
+        if series.days
+    }
+    periods = {}
+    for conid in conids:
+        if conid not in last_day:
+            periods[conid] = INITIAL_HISTORY_PERIOD
+        else:
+            periods[conid] = f"{min(max((today - last_day[conid]).days, 0) + 1, 1000)}d"
+    return periods
+
+
+async def refresh_closes(
+    db: AsyncSession, client, symbols_by_conid: Dict[int, str], today: Optional[date] = None
+) -> int:
+    """
+    Bring the stored closes of `symbols_by_conid` up to date through `client`
+    (an AsyncIBClient, whose history concurrency cap applies). Returns the number
+    of bars merged; the caller commits.
+    """
+    periods = await db.run_sync(history_periods, symbols_by_conid, today)
+    bars_by_conid = await asyncio.gather(
+        *(client.get_history_daily(conid, period=period) for conid, period in periods.items())
+    )
+    return await db.run_sync(store_history, symbols_by_conid, periods, bars_by_conid)
+
+
+def store_history(
+    db: Session, symbols_by_conid: Dict[int, str], periods: Dict[int, str], bars_by_conid: Sequence[List[Dict]]
+) -> int:
+    """Merge the bars fetched for `periods` (same order) into the store. Returns bars merged."""
+    return sum(
+        store_daily_bars(db, conid, symbols_by_conid[conid], bars)
+        for conid, bars in zip(periods, bars_by_conid)
+    )
+
+
+def compute_perf(
+    db: Session,
+    conids: Sequence[int],
+    windows: Optional[Dict[str, int]] = None,
+    ytd: bool = True,
+) -> Dict[int, Dict[str, Optional[float]]]:
+    """
+    Performance of every conid over each lookback in `windows` (bars back from the
+    latest close, same convention as compute_perf_from_bars), plus "ytd".
+
+    The stored series are right-aligned into one (conids x bars) matrix so every
+    window is a single column ratio over all positions.
+    """
+    windows = windows if windows is not None else PERF_WINDOWS
+    conids = list(dict.fromkeys(conids))
+    width = max(list(windows.values()) + [TRADING_DAYS + 10]) + 1
+    closes = np.full((len(conids), width), np.nan)
+    days = np.full((len(conids), width), np.iinfo(np.int32).min, dtype=np.int64)
+
+    row_of = {conid: i for i, conid in enumerate(conids)}
+    for series in db.scalars(select(DailyCloseSeries).where(DailyCloseSeries.conid.in_(conids))):
+        series_days, series_closes = unpack_series(series)
+        tail = min(len(series_closes), width)
+        if tail:
+            closes[row_of[series.conid], width - tail:] = series_closes[-tail:]
+            days[row_of[series.conid], width - tail:] = series_days[-tail:].astype(np.int64)
+
+    result: Dict[str, np.ndarray] = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for name, lookback in windows.items():
+            result[name] = closes[:, -1] / closes[:, -1 - lookback] - 1.0
+
+        if ytd and not np.isnan(closes[:, -1]).all():
+            latest = days[:, -1].max()
+            year_start = np.datetime64(f"{np.datetime64(int(latest), 'D').astype(object).year}-01-01")
+            before = (days < year_start.astype(np.int64)) & ~np.isnan(closes)
+            # last close of the previous year, else the first close of this year
+            last_before = width - 1 - np.argmax(before[:, ::-1], axis=1)
+            first_valid = np.argmax(~np.isnan(closes), axis=1)
+            base = np.where(before.any(axis=1), last_before, first_valid)
+            result["ytd"] = closes[:, -1] / closes[np.arange(len(conids)), base] - 1.0
+        elif ytd:
+            # none of the conids has stored closes yet
+            result["ytd"] = np.full(len(conids), np.nan)
+
+    return {
+        conid: {
+            name: (None if not np.isfinite(values[i]) else float(values[i]))
+            for name, values in result.items()
+        }
+        for i, conid in enumerate(conids)
+    }
+
+
+def compute_metrics(
+    matrix: CloseMatrix,
+    weights: np.ndarray,
+    benchmark_col: Optional[int] = None,
+    risk_free_rate: float = 0.0,
+    lookback: Optional[int] = None,
+) -> Dict[str, Optional[float]]:
+    """
+    Annualised volatility, beta, Sharpe and YTD return of a weighted portfolio.
+
+    `weights` is aligned with `matrix.conids` (benchmark column weighted 0). Contracts
+    without closes contribute no return; weights are not re-normalised for them.
+    Volatility, beta and Sharpe use the last `lookback` daily returns.
+    """
+    result: Dict[str, Optional[float]] = {
+        "portfolio_volatility": None,
+        "portfolio_beta": None,
+        "sharpe_ratio": None,
+        "ytd_return": None,
+    }
+    closes = matrix.closes
+    if closes.shape[0] < 2:
+        return result
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = closes[1:] / closes[:-1] - 1.0
+    returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+    if lookback:
+        returns = returns[-lookback:]
+    portfolio = returns @ weights
+
+    volatility = float(portfolio.std(ddof=1) * np.sqrt(TRADING_DAYS))
+    result["portfolio_volatility"] = volatility
+    if volatility > 0:
+        annual_return = float(portfolio.mean() * TRADING_DAYS)
+        result["sharpe_ratio"] = (annual_return - risk_free_rate) / volatility
+
+    if benchmark_col is not None:
+        bench = returns[:, benchmark_col]
+        variance = bench.var(ddof=1)
+        if variance > 0:
+            covariance = np.cov(portfolio, bench, ddof=1)[0, 1]
+            result["portfolio_beta"] = float(covariance / variance)
+
+    # YTD: last close of the previous year (or first close of this year) to the latest close
+    year_start = np.datetime64(f"{matrix.dates[-1].astype(object).year}-01-01")
+    base_row = max(int(np.searchsorted(matrix.dates, year_start)) - 1, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ytd = closes[-1] / closes[base_row] - 1.0
+    ytd = np.nan_to_num(ytd, nan=0.0, posinf=0.0, neginf=0.0)
+    result["ytd_return"] = float(ytd @ weights)
+    return result
+
+
+def portfolio_metrics(
+    db: Session, as_of: Optional[date], holdings: Sequence[Tuple[str, Optional[float]]]
+) -> Dict[str, object]:
+    """
+    Top holding, volatility, beta, Sharpe and YTD of a snapshot given its
+    (symbol, value) holdings and the cached closes. Missing inputs give None.
+    """
+    metrics: Dict[str, object] = {
+        "top_holding_symbol": None,
+        "top_holding_value": None,
+        "portfolio_volatility": None,
+        "portfolio_beta": None,
+        "sharpe_ratio": None,
+        "ytd_return": None,
+    }
+    holdings = [(symbol, value) for symbol, value in holdings if value is not None]
+    if not holdings:
+        return metrics
+
+    metrics["top_holding_symbol"], metrics["top_holding_value"] = max(holdings, key=lambda h: h[1])
+
+    total = sum(value for _, value in holdings)
+    conid_of = conids_for_symbols(db, (symbol for symbol, _ in holdings))
+    held = [(symbol, value) for symbol, value in holdings if symbol in conid_of]
+    if not held or not total:
+        return metrics
+
+    # Calendar lookback wide enough for the requested number of trading days and for YTD
+    as_of = as_of or date.today()
+    start = min(
+        as_of - timedelta(days=int(settings.analytics_lookback_days * 366 / TRADING_DAYS) + 7),
+        date(as_of.year - 1, 12, 24),
+    )
+    matrix = load_close_matrix(
+        db, [conid_of[symbol] for symbol, _ in held] + [settings.benchmark_conid], start
+    )
+    column_of = {conid: i for i, conid in enumerate(matrix.conids)}
+    weights = np.zeros(len(matrix.conids))
+    np.add.at(
+        weights,
+        [column_of[conid_of[symbol]] for symbol, _ in held],
+        [value / total for _, value in held],
+    )
+
+    metrics.update(
+        compute_metrics(
+            matrix,
+            weights,
+            benchmark_col=matrix.column(settings.benchmark_conid),
+            risk_free_rate=settings.risk_free_rate,
+            lookback=settings.analytics_lookback_days,
+        )
+    )
+    return metrics
@@ -0,0 +1,195 @@
+# collector.py
+"""
+In-process scheduler that snapshots the configured accounts into the portfolio DB.
+
+Runs fire at the market open, every `collector_interval_minutes` during the session
+and once at the close (weekdays, market timezone). Each run writes one Portfolio
+(+ Positions) per account in a single transaction and is recorded in collector_runs.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, time as dtime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import pytz
+
+from .config import settings
+from .crud import insert_portfolios
+from .database import AsyncSessionLocal, run_write
+from .fetch_data_portfolio import AsyncIBClient, PositionRow, build_portfolio_table_async
+from .models import CollectorRun
+from .schemas import PortfolioCreate, PositionCreate
+from .utils import LedgerError, fetch_account_header
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_hhmm(value: str) -> dtime:
+    hours, minutes = value.split(":")
+    return dtime(int(hours), int(minutes))
+
+
+def next_run_after(now: datetime) -> datetime:
+    """Next scheduled run strictly after `now` (aware), as an aware datetime in market time."""
+    tz = pytz.timezone(settings.collector_market_tz)
+    local = now.astimezone(tz)
+    open_at = _parse_hhmm(settings.collector_market_open)
+    close_at = _parse_hhmm(settings.collector_market_close)
+    step = timedelta(minutes=max(1, settings.collector_interval_minutes))
+
+    for offset in range(8):
+        day = local.date() + timedelta(days=offset)
+        if day.weekday() >= 5:
+            continue
+        session_open = tz.localize(datetime.combine(day, open_at))
+        session_close = tz.localize(datetime.combine(day, close_at))
+        slot = session_open
+        while slot < session_close:
+            if slot > local:
+                return slot
+            slot += step
+        if session_close > local:
+            return session_close
+    raise RuntimeError("No collector run found in the next week")
+
+
+def _header_dates(header: Dict) -> tuple:
+    """period / generated_at from the formatted header strings (market local time)."""
+    try:
+        period = datetime.strptime(header["period"], "%m/%d/%Y").date()
+    except (KeyError, TypeError, ValueError):
+        period = None
+    try:
+        # "2025-11-13, 02:54:34 EST" -> drop the zone abbreviation
+        generated_at = datetime.strptime(header["generated"].rsplit(" ", 1)[0], "%Y-%m-%d, %H:%M:%S")
+    except (KeyError, TypeError, ValueError, AttributeError):
+        generated_at = None
+
+    if generated_at is None:
+        generated_at = datetime.now(pytz.timezone(settings.collector_market_tz)).replace(tzinfo=None)
+    return period or generated_at.date(), generated_at
+
+
+def snapshot_from(header: Dict, rows: List[PositionRow]) -> PortfolioCreate:
+    """Map an account header and its PositionRows onto the portfolio schema."""
+    period, generated_at = _header_dates(header)
+    return PortfolioCreate(
+        period=period,
+        generated_at=generated_at,
+        owner_name=header.get("name") or "",
+        account=header.get("account") or "",
+        customer_type=header.get("customerType") or "",
+        base_currency=header.get("baseCurrency") or "",
+        account_type=header.get("accountType"),
+        cash=header.get("cash") or 0.0,
+        portfolio_value=header.get("portfolio") or 0.0,
+        positions=[
+            PositionCreate(
+                symbol=row.symbol,
+                quantity=row.quantity,
+                last_price=row.last_price,
+                avg_cost=row.avg_cost,
+                value=row.market_value or 0.0,
+                weight_pct=row.weight_pct,
+                unrealized_pct=row.unrealized_pnl_pct,
+                daily_change_pct=row.daily_change_pct,
+                perf_30d_pct=row.perf_30d,
+                perf_60d_pct=row.perf_60d,
+                currency=row.currency,
+                name=row.name or row.symbol,
+                pe_ratio=row.pe_ratio,
+            )
+            for row in rows
+        ],
+    )
+
+
+class SnapshotCollector:
+    """Scheduled collector; runs never overlap (a run due while one is active is skipped)."""
+
+    def __init__(self, account_ids: List[str]) -> None:
+        self.account_ids = account_ids
+        self._running = asyncio.Lock()
+        self._tasks: set = set()
+        self.last_run: Optional[Dict] = None
+
+    @property
+    def running(self) -> bool:
+        return self._running.locked()
+
+    async def collect(self) -> Dict:
+        """Run one collection now and record it. Returns the run summary."""
+        if self._running.locked():
+            return await self._record(datetime.now(timezone.utc), 0.0, "skipped", 0, "previous run still active")
+
+        async with self._running:
+            started = datetime.now(timezone.utc)
+            t0 = time.perf_counter()
+            try:
+                written = await self._collect_all()
+                status, error = "ok", None
+            except Exception as exc:
+                logger.exception("Portfolio collector run failed")
+                written, status, error = 0, "error", str(exc)
+            return await self._record(started, time.perf_counter() - t0, status, written, error)
+
+    async def _collect_all(self) -> int:
+        async with AsyncSessionLocal() as db:
+            async with AsyncIBClient(settings.ib_gateway_url, verify_ssl=False) as client:
+                snapshots = []
+                for account_id in self.account_ids:
+                    # both finish before an error is raised, so nothing is left using db
+                    header, rows = await asyncio.gather(
+                        fetch_account_header(account_id, client),
+                        build_portfolio_table_async(client, account_id, db=db),
+                        return_exceptions=True,
+                    )
+                    if isinstance(header, LedgerError):
+                        # one account without a usable ledger does not cost the others their snapshot
+                        logger.warning("Skipping account %s: %s", account_id, header)
+                        continue
+                    for result in (header, rows):
+                        if isinstance(result, BaseException):
+                            raise result
+                    snapshots.append(snapshot_from(header, rows))
+
+        # one transaction for every account of the run
+        await run_write(insert_portfolios, snapshots)
+        return len(snapshots)
+
+    async def _record(
+        self, started: datetime, seconds: float, status: str, written: int, error: Optional[str]
+    ) -> Dict:
+        run = {
+            "started_at": started.replace(tzinfo=None),
+            "duration_ms": round(seconds * 1000.0, 1),
+            "status": status,
+            "accounts": ",".join(self.account_ids),
+            "portfolios_written": written,
+            "error": error,
+        }
+        self.last_run = run
+        logger.info("Portfolio collector run %s in %.0f ms (%d portfolios)", status, run["duration_ms"], written)
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add(CollectorRun(**run))
+                await db.commit()
+        except Exception:
+            logger.exception("Could not record collector run")
+        return run
+
+    async def run_forever(self) -> None:
+        """Sleep until each scheduled slot and collect. Cancel to stop."""
+        while True:
+            now = datetime.now(timezone.utc)
+            due = next_run_after(now)
+            await asyncio.sleep(max(0.0, (due - now).total_seconds()))
+            task = asyncio.create_task(self.collect())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+
+collector = SnapshotCollector(
+    [account.strip() for account in settings.collector_accounts.split(",") if account.strip()]
+)
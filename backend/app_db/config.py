@@ -1,11 +1,18 @@
 import os
+from dotenv import load_dotenv
 from pydantic import BaseModel
 
+# Load environment variables from .env if present (before the defaults below are read)
+load_dotenv()
+
 
 class Settings(BaseModel):
     # IB Client Portal Gateway URL
     ib_gateway_url: str = os.getenv("IB_GATEWAY_URL", "https://localhost:5000/v1/api")
 
+    # Responses of at least this many bytes are compressed (brotli when installed, else gzip)
+    compression_minimum_size: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+
     # CORS
     allowed_origins: str = os.getenv("ALLOWED_ORIGINS", "*")
 
@@ -16,9 +23,49 @@ class Settings(BaseModel):
     api_username: str = os.getenv("API_USERNAME", "admin")
     api_password: str = os.getenv("API_PASSWORD", "changeme")
 
+    # Risk analytics: benchmark for beta (SPY by default), annual risk-free rate and
+    # number of daily bars used for volatility/beta/Sharpe
+    benchmark_conid: int = int(os.getenv("BENCHMARK_CONID", "756733"))
+    risk_free_rate: float = float(os.getenv("RISK_FREE_RATE", "0.0"))
+    analytics_lookback_days: int = int(os.getenv("ANALYTICS_LOOKBACK_DAYS", "252"))
+
+    # Scheduled portfolio collector: comma separated accounts (empty disables it), run
+    # interval during the session and the session hours in the market timezone
+    collector_accounts: str = os.getenv("COLLECTOR_ACCOUNTS", "")
+    collector_interval_minutes: int = int(os.getenv("COLLECTOR_INTERVAL_MINUTES", "30"))
+    collector_market_tz: str = os.getenv("COLLECTOR_MARKET_TZ", "America/New_York")
+    collector_market_open: str = os.getenv("COLLECTOR_MARKET_OPEN", "09:30")
+    collector_market_close: str = os.getenv("COLLECTOR_MARKET_CLOSE", "16:00")
+
+    # GET /portfolios/live/{account_id}: seconds an assembled live portfolio is reused
+    # (0 disables the cache)
+    live_portfolio_ttl: float = float(os.getenv("LIVE_PORTFOLIO_TTL", "5"))
+
+    # Power BI embedding: service principal, workspace and report, the REST API and
+    # Azure AD authority (both overridable, e.g. for a local stand-in) and how many
+    # seconds before expiry the cached tokens are refreshed in the background
+    powerbi_tenant_id: str = os.getenv("TENANT_ID", "")
+    powerbi_client_id: str = os.getenv("CLIENT_ID", "")
+    powerbi_client_secret: str = os.getenv("CLIENT_SECRET", "")
+    powerbi_workspace_id: str = os.getenv("WORKSPACE_ID", "")
+    powerbi_report_id: str = os.getenv("REPORT_ID", "")
+    powerbi_api_url: str = os.getenv("POWERBI_API_URL", "https://api.powerbi.com/v1.0/myorg")
+    powerbi_authority_host: str = os.getenv("POWERBI_AUTHORITY_HOST", "https://login.microsoftonline.com")
+    powerbi_refresh_margin: float = float(os.getenv("POWERBI_REFRESH_MARGIN", "300"))
+
     # Database
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./portfolio.db")
 
+    # Also fold and drop the legacy metric columns (app_db.migrations) at startup;
+    # missing columns are always added. Off by default: `python -m app_db.migrations`
+    run_migrations: bool = os.getenv("RUN_MIGRATIONS", "false").lower() in ("1", "true", "yes")
+
+    # SQLite profile applied on every connection: page cache (KiB), memory-mapped I/O
+    # (bytes) and how long a writer waits on a lock before failing (ms)
+    sqlite_cache_size_kb: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
 
 settings = Settings()
 
@@ -0,0 +1,94 @@
+# crud.py
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .analytics import portfolio_metrics
+from .history import history_rows
+from .models import Portfolio, Position, PositionHistory
+from .rollups import refresh_rollups
+from .schemas import PortfolioCreate, PortfolioRead, PositionRead
+
+POSITION_FIELDS = [
+    "symbol",
+    "quantity",
+    "last_price",
+    "avg_cost",
+    "value",
+    "weight_pct",
+    "unrealized_pct",
+    "daily_change_pct",
+    "perf_30d_pct",
+    "perf_60d_pct",
+    "pt",
+    "upside_pct",
+    "currency",
+    "equity_risk_profile",
+    "name",
+    "pe_ratio",
+    "description",
+]
+
+
+def insert_portfolios(db: Session, portfolios_in: List[PortfolioCreate]) -> List[PortfolioRead]:
+    """
+    Insert portfolio snapshots with Core bulk statements: one multi-row INSERT ...
+    RETURNING id for the portfolios and one for all of their positions, plus the
+    matching position_history rows; the daily rollups of the touched account-days are
+    then recomputed. Computed metrics are filled in first (values supplied by the
+    caller win).
+
+    The caller commits, so a batch shares one transaction. The returned read models
+    are assembled from the input and the returned ids, without reloading rows.
+    """
+    if not portfolios_in:
+        return []
+
+    headers: List[Dict[str, Any]] = []
+    for portfolio_in in portfolios_in:
+        header = portfolio_in.model_dump(exclude={"positions"})
+        metrics = portfolio_metrics(
+            db, portfolio_in.period, [(p.symbol, p.value) for p in portfolio_in.positions]
+        )
+        for field, value in metrics.items():
+            if header.get(field) is None:
+                header[field] = value
+        headers.append(header)
+
+    portfolio_ids = db.scalars(
+        insert(Portfolio).returning(Portfolio.id, sort_by_parameter_order=True),
+        headers,
+    ).all()
+
+    position_rows = [
+        {"portfolio_id": portfolio_id, **pos_in.model_dump(include=set(POSITION_FIELDS))}
+        for portfolio_id, portfolio_in in zip(portfolio_ids, portfolios_in)
+        for pos_in in portfolio_in.positions
+    ]
+    position_ids = []
+    if position_rows:
+        position_ids = db.scalars(
+            insert(Position).returning(Position.id, sort_by_parameter_order=True),
+            position_rows,
+        ).all()
+
+    history = [
+        row
+        for portfolio_id, header, portfolio_in in zip(portfolio_ids, headers, portfolios_in)
+        for row in history_rows(portfolio_id, header, (p.model_dump() for p in portfolio_in.positions))
+    ]
+    if history:
+        db.execute(insert(PositionHistory), history)
+
+    refresh_rollups(db, [(header["account"], header["period"]) for header in headers])
+
+    results = []
+    ids = iter(position_ids)
+    for portfolio_id, header, portfolio_in in zip(portfolio_ids, headers, portfolios_in):
+        positions = [
+            PositionRead.model_construct(id=next(ids), **pos_in.model_dump())
+            for pos_in in portfolio_in.positions
+        ]
+        results.append(PortfolioRead.model_construct(id=portfolio_id, positions=positions, **header))
+    return results
@@ -1,14 +1,52 @@
-# database.py
-from sqlalchemy import create_engine
+import asyncio
+from typing import AsyncGenerator, Callable, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from .config import settings
+
+T = TypeVar("T")
+
 DATABASE_URL = "sqlite:///./portfolio.db"
 
+# async drivers for the sync URLs accepted in DATABASE_URL (asyncpg is an optional
+# requirement, see requirements.txt)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
 
 class Base(DeclarativeBase):
     pass
 
 
+def async_database_url(url: str) -> str:
+    """`url` with its driver swapped for the async one (unchanged if already async)."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False) if driver else url
+
+
+def apply_sqlite_profile(dbapi_connection, connection_record) -> None:
+    """
+    Per-connection SQLite tuning: WAL lets readers run while the collector writes,
+    synchronous=NORMAL is durable in WAL mode, plus a larger page cache, mmap'd reads
+    and a busy timeout so concurrent writers wait instead of failing.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+    cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    cursor.close()
+
+
+# Sync engine: table creation, scripts, benchmarks and the write paths (run_write)
 engine = create_engine(settings.database_url, echo=False, future=True)
 
 SessionLocal = sessionmaker(
@@ -17,6 +55,35 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+# Async engine: read handlers and the collector's reads. aiosqlite defaults to NullPool (a
+# new connection and worker thread per session); pool file databases instead.
+_async_url = make_url(async_database_url(settings.database_url))
+_async_options = {}
+if _async_url.get_backend_name() == "sqlite" and _async_url.database not in (None, "", ":memory:"):
+    _async_options["poolclass"] = AsyncAdaptedQueuePool
+
+async_engine = create_async_engine(_async_url, echo=False, **_async_options)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", apply_sqlite_profile)
+    event.listen(async_engine.sync_engine, "connect", apply_sqlite_profile)
+
+
+def ensure_indexes() -> None:
+    """
+    Create indexes declared on the models that are missing from an existing database
+    (create_all only creates indexes together with new tables).
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
 
 # Dependency for FastAPI
 def get_db():
@@ -25,3 +92,28 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Async session per request; handlers commit their own writes."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def run_write(fn: Callable[..., T], *args) -> T:
+    """
+    Run `fn(session, *args)` on the sync engine in a worker thread and commit.
+
+    Writes stay off the async engine: there every statement of a batch is a hop to
+    the connection's aiosqlite thread and back, each waiting for a turn of the event
+    loop, so under read load a batch insert crawls (see
+    benchmarks/bench_concurrent_reads.py). In a thread the whole transaction runs
+    without yielding to the readers.
+    """
+    def work() -> T:
+        with SessionLocal() as db:
+            result = fn(db, *args)
+            db.commit()
+            return result
+
+    return await asyncio.to_thread(work)
@@ -0,0 +1,223 @@
+# export.py
+"""
+Streaming exports of the stored snapshots as CSV, NDJSON or Parquet.
+
+Rows are read through a streaming result (`yield_per`) in batches of
+EXPORT_BATCH_SIZE and encoded batch by batch, so memory stays flat however
+many rows match. Parquet needs the optional `pyarrow` package; each batch
+becomes one row group.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, DateTime, Float, Integer, select
+from sqlalchemy.sql import Select
+
+from .database import AsyncSessionLocal
+from .models import Portfolio, Position, PositionHistory
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export disabled
+    pa = None
+    pq = None
+
+EXPORT_BATCH_SIZE = 5000
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+ACCEPT_ALIASES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/vnd.apache.parquet": "parquet",
+    "application/x-parquet": "parquet",
+}
+
+
+def negotiate_format(requested: Optional[str], accept: Optional[str]) -> Optional[str]:
+    """Explicit `format` wins, else the first supported type in Accept, else CSV. None if unsupported."""
+    if requested:
+        return requested if requested in MEDIA_TYPES else None
+    for part in (accept or "").split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in ACCEPT_ALIASES:
+            return ACCEPT_ALIASES[media_type]
+    return "csv"
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+# ---------- Queries ----------
+
+def _range(stmt: Select, column, account_column, account, start, end) -> Select:
+    if account:
+        stmt = stmt.where(account_column == account)
+    if start:
+        stmt = stmt.where(column >= start)
+    if end:
+        stmt = stmt.where(column <= end)
+    return stmt
+
+
+def portfolios_query(account: Optional[str], start: Optional[date], end: Optional[date]) -> Select:
+    columns = [c for c in Portfolio.__table__.columns]
+    stmt = select(*columns).order_by(Portfolio.generated_at, Portfolio.id)
+    return _range(stmt, Portfolio.period, Portfolio.account, account, start, end)
+
+
+def positions_query(account: Optional[str], start: Optional[date], end: Optional[date]) -> Select:
+    stored = [c for c in Position.__table__.columns if c.key not in ("id", "portfolio_id")]
+    stmt = (
+        select(
+            Position.portfolio_id,
+            Portfolio.account,
+            Portfolio.period,
+            Portfolio.generated_at,
+            *stored,
+        )
+        .join(Portfolio, Portfolio.id == Position.portfolio_id)
+        .order_by(Portfolio.generated_at, Position.portfolio_id, Position.id)
+    )
+    return _range(stmt, Portfolio.period, Portfolio.account, account, start, end)
+
+
+def position_history_query(account: Optional[str], start: Optional[date], end: Optional[date]) -> Select:
+    columns = [c for c in PositionHistory.__table__.columns if c.key != "id"]
+    stmt = select(*columns).order_by(PositionHistory.generated_at, PositionHistory.id)
+    return _range(stmt, PositionHistory.period, PositionHistory.account, account, start, end)
+
+
+# ---------- Row streaming ----------
+
+async def iter_batches(stmt: Select) -> AsyncIterator[List[Tuple]]:
+    """Result rows of `stmt` in batches of EXPORT_BATCH_SIZE from a streaming cursor."""
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for batch in result.partitions():
+            yield [tuple(row) for row in batch]
+
+
+def _text(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+async def csv_chunks(names: Sequence[str], batches: AsyncIterator[List[Tuple]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    yield buffer.getvalue().encode()
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([[_text(v) for v in row] for row in batch])
+        yield buffer.getvalue().encode()
+
+
+async def ndjson_chunks(names: Sequence[str], batches: AsyncIterator[List[Tuple]]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(names, (_text(v) for v in row)))) + "\n" for row in batch
+        ).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that keeps what was written since the last drain()."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def arrow_schema(columns: Sequence) -> "pa.Schema":
+    def arrow_type(column):
+        if isinstance(column.type, Float):
+            return pa.float64()
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        if isinstance(column.type, DateTime):
+            return pa.timestamp("us")
+        if isinstance(column.type, Date):
+            return pa.date32()
+        return pa.string()
+
+    return pa.schema([(column.key, arrow_type(column)) for column in columns])
+
+
+async def parquet_chunks(columns: Sequence, batches: AsyncIterator[List[Tuple]]) -> AsyncIterator[bytes]:
+    schema = arrow_schema(columns)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for batch in batches:
+            arrays = [
+                pa.array([row[i] for row in batch], type=field.type)
+                for i, field in enumerate(schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+async def _prefetched(batches: AsyncIterator[List[Tuple]]) -> AsyncIterator[List[Tuple]]:
+    """`batches` with the first one already read, so query errors raise here."""
+    first = await anext(batches, None)
+
+    async def replay() -> AsyncIterator[List[Tuple]]:
+        if first is None:
+            return
+        yield first
+        async for batch in batches:
+            yield batch
+
+    return replay()
+
+
+async def encode(fmt: str, stmt: Select) -> AsyncIterator[bytes]:
+    """
+    Byte chunks of `stmt`'s rows in `fmt` (one of MEDIA_TYPES). The query runs and
+    its first batch is fetched before this returns: a failing query raises to the
+    caller (a 500) instead of ending a 200 stream early.
+    """
+    columns = list(stmt.selected_columns)
+    names = [column.key for column in columns]
+    batches = await _prefetched(iter_batches(stmt))
+    if fmt == "parquet":
+        return parquet_chunks(columns, batches)
+    if fmt == "ndjson":
+        return ndjson_chunks(names, batches)
+    return csv_chunks(names, batches)
+
+
+EXPORTS: Dict[str, Any] = {
+    "portfolios": portfolios_query,
+    "positions": positions_query,
+    "position_history": position_history_query,
+}
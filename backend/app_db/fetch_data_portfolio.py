@@ -1,6 +1,14 @@
+import asyncio
+import httpx
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .analytics import compute_perf, history_periods, refresh_closes, store_history
+from .database import SessionLocal
 
 # ==========================
 # CONFIG
@@ -8,6 +16,9 @@ from typing import Dict, List, Optional
 
 BASE_URL = "https://localhost:5000/v1/api"   # change if needed
 VERIFY_SSL = False                           # often False for local CP gateway
+POSITIONS_PAGE_SIZE = 100                    # max positions per page returned by the gateway
+POSITIONS_PAGE_WORKERS = 4                   # pages fetched concurrently for large accounts
+HISTORY_CONCURRENCY = 5                      # IB allows at most 5 concurrent history requests
 
 # Your watchlist / subset (optional). If empty, all positions are pulled.
 WATCHLIST = {
@@ -38,6 +49,20 @@ class PositionRow:
     pe_ratio: Optional[float]
 
 
+def unique_positions(rows: List[Dict], seen: set) -> Iterator[Dict]:
+    """
+    Rows of one positions page whose conid is not in `seen` (which is updated).
+    Pages can overlap while the account changes under the page walk.
+    """
+    for row in rows:
+        conid = row.get("conid")
+        if conid is not None:
+            if conid in seen:
+                continue
+            seen.add(conid)
+        yield row
+
+
 # ==========================
 # CLIENT
 # ==========================
@@ -66,9 +91,46 @@ class IBClient:
         return accounts[0]["accountId"]
 
     # ---- Positions ----
-    def get_positions(self, account_id: str) -> List[Dict]:
-        # 0 = first page. For large accounts you might need to increment page id.
-        return self._get(f"/portfolio/{account_id}/positions/0")
+    def get_positions(self, account_id: str, page: int = 0) -> List[Dict]:
+        # a single page; use get_all_positions() for large accounts
+        return self._get(f"/portfolio/{account_id}/positions/{page}") or []
+
+    def iter_all_positions(
+        self, account_id: str, max_workers: int = POSITIONS_PAGE_WORKERS
+    ) -> Iterator[Dict]:
+        """
+        Yields every position of the account, de-duplicated by conid.
+        The page count is not reported by the gateway, so pages are probed in
+        windows of `max_workers` concurrent requests until a short page comes back.
+        Rows are yielded as soon as their page arrives.
+        """
+        seen = set()
+        first = self.get_positions(account_id, 0)
+        yield from unique_positions(first, seen)
+        if len(first) < POSITIONS_PAGE_SIZE:
+            return
+
+        next_page = 1
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while True:
+                futures = [
+                    pool.submit(self.get_positions, account_id, page)
+                    for page in range(next_page, next_page + max_workers)
+                ]
+                done = False
+                for future in as_completed(futures):
+                    rows = future.result()
+                    if len(rows) < POSITIONS_PAGE_SIZE:
+                        done = True
+                    yield from unique_positions(rows, seen)
+                if done:
+                    return
+                next_page += max_workers
+
+    def get_all_positions(
+        self, account_id: str, max_workers: int = POSITIONS_PAGE_WORKERS
+    ) -> List[Dict]:
+        return list(self.iter_all_positions(account_id, max_workers=max_workers))
 
     # ---- Snapshot market data ----
     def get_snapshot(
@@ -115,6 +177,127 @@ class IBClient:
         return data.get("data", [])
 
 
+class AsyncIBClient:
+    """
+    asyncio counterpart of IBClient over a pooled httpx client.
+    History requests are capped at `history_concurrency` in flight, IB's limit.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        verify_ssl: bool = True,
+        history_concurrency: int = HISTORY_CONCURRENCY,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.client = httpx.AsyncClient(verify=verify_ssl)
+        self._history_slots = asyncio.Semaphore(history_concurrency)
+
+    async def __aenter__(self) -> "AsyncIBClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def _get(self, path: str, **kwargs):
+        url = f"{self.base_url}{path}"
+        resp = await self.client.get(url, **kwargs)
+        resp.raise_for_status()
+        return resp.json()
+
+    # ---- Accounts ----
+    async def get_accounts(self) -> List[Dict]:
+        return await self._get("/portfolio/accounts")
+
+    async def get_primary_account_id(self) -> str:
+        accounts = await self.get_accounts()
+        if not accounts:
+            raise RuntimeError("No IBKR accounts returned from /portfolio/accounts")
+        return accounts[0]["accountId"]
+
+    async def get_meta(self, account_id: str) -> Dict:
+        return await self._get(f"/portfolio/{account_id}/meta")
+
+    async def get_ledger(self, account_id: str) -> Dict:
+        return await self._get(f"/portfolio/{account_id}/ledger")
+
+    async def get_summary(self, account_id: str) -> Dict:
+        return await self._get(f"/portfolio/{account_id}/summary")
+
+    # ---- Positions ----
+    async def get_positions(self, account_id: str, page: int = 0) -> List[Dict]:
+        return await self._get(f"/portfolio/{account_id}/positions/{page}") or []
+
+    async def iter_all_positions(
+        self, account_id: str, max_workers: int = POSITIONS_PAGE_WORKERS
+    ) -> AsyncIterator[Dict]:
+        """Async version of IBClient.iter_all_positions."""
+        seen = set()
+        first = await self.get_positions(account_id, 0)
+        for row in unique_positions(first, seen):
+            yield row
+        if len(first) < POSITIONS_PAGE_SIZE:
+            return
+
+        next_page = 1
+        while True:
+            done = False
+            for pending in asyncio.as_completed(
+                [
+                    self.get_positions(account_id, page)
+                    for page in range(next_page, next_page + max_workers)
+                ]
+            ):
+                rows = await pending
+                if len(rows) < POSITIONS_PAGE_SIZE:
+                    done = True
+                for row in unique_positions(rows, seen):
+                    yield row
+            if done:
+                return
+            next_page += max_workers
+
+    async def get_all_positions(
+        self, account_id: str, max_workers: int = POSITIONS_PAGE_WORKERS
+    ) -> List[Dict]:
+        return [row async for row in self.iter_all_positions(account_id, max_workers=max_workers)]
+
+    # ---- Snapshot market data ----
+    async def get_snapshot(
+        self, conids: List[int], fields: List[int]
+    ) -> Dict[int, Dict[str, str]]:
+        """
+        Returns dict: conid -> { field_id_str: value_str, ... }
+        """
+        if not conids:
+            return {}
+
+        params = {
+            "conids": ",".join(str(c) for c in conids),
+            "fields": ",".join(str(f) for f in fields),
+        }
+        data = await self._get("/iserver/marketdata/snapshot", params=params)
+        return {int(item["conid"]): item for item in data if item.get("conid") is not None}
+
+    # ---- History for perf ----
+    async def get_history_daily(self, conid: int, period: str = "60d") -> List[Dict]:
+        params = {
+            "conid": conid,
+            "period": period,
+            "bar": "1d",
+        }
+        async with self._history_slots:
+            try:
+                data = await self._get("/iserver/marketdata/history", params=params)
+            except httpx.HTTPStatusError as e:
+                print(f"History error for {conid}: {e}")
+                return []
+        return data.get("data", [])
+
+
 # ==========================
 # UTIL
 # ==========================
@@ -154,10 +337,22 @@ def compute_perf_from_bars(bars: List[Dict], days: int) -> Optional[float]:
 # MAIN LOGIC
 # ==========================
 
-def build_portfolio_table(client: IBClient) -> List[PositionRow]:
-    account_id = client.get_primary_account_id()
-    positions = client.get_positions(account_id)
-
+# Snapshot fields we care about:
+SNAPSHOT_FIELDS = [
+    31,    # Last Price
+    55,    # Symbol
+    73,    # Market Value
+    74,    # Avg Price
+    75,    # Unrealized PnL (money)
+    80,    # Unrealized PnL %
+    83,    # Change %
+    7051,  # Company name
+    7290,  # P/E
+    7639,  # % of Mark Value
+]
+
+
+def select_positions(positions: List[Dict]) -> List[Dict]:
     # Filter by watchlist symbols if provided:
     filtered_positions = []
     for p in positions:
@@ -166,83 +361,153 @@ def build_portfolio_table(client: IBClient) -> List[PositionRow]:
         if WATCHLIST and symbol not in WATCHLIST:
             continue
         filtered_positions.append(p)
+    return filtered_positions
+
+
+def perf_from_bars(bars: List[Dict]) -> Dict[str, Optional[float]]:
+    return {
+        "perf_30d": compute_perf_from_bars(bars, 30),
+        "perf_60d": compute_perf_from_bars(bars, 60),
+    }
+
+
+def build_position_row(p: Dict, snap: Dict[str, str], perf: Dict[str, Optional[float]]) -> PositionRow:
+    symbol = snap.get("55") or p.get("ticker") or p.get("contractDesc") or ""
+    quantity = safe_float(p.get("position")) or 0.0
+    currency = p.get("currency", "")
+
+    last_price = safe_float(snap.get("31"))
+    avg_cost = safe_float(snap.get("74"))
+    market_value = safe_float(snap.get("73"))
+
+    # 7639 is "% of Mark Value" as percentage
+    weight_pct = safe_float(snap.get("7639"))
+    if weight_pct is not None:
+        weight_pct /= 100.0  # convert "9.67" -> 0.0967
+
+    unreal_pnl_pct = safe_float(snap.get("80"))
+    if unreal_pnl_pct is not None:
+        unreal_pnl_pct /= 100.0  # convert "252.73" -> 2.5273
+
+    daily_change_pct = safe_float(snap.get("83"))
+    if daily_change_pct is not None:
+        daily_change_pct /= 100.0  # "1.25" -> 0.0125
+
+    name = snap.get("7051")
+    pe_ratio = safe_float(snap.get("7290"))
+
+    return PositionRow(
+        symbol=symbol,
+        name=name,
+        quantity=quantity,
+        last_price=last_price,
+        avg_cost=avg_cost,
+        market_value=market_value,
+        weight_pct=weight_pct,
+        unrealized_pnl_pct=unreal_pnl_pct,
+        daily_change_pct=daily_change_pct,
+        perf_30d=perf.get("perf_30d"),
+        perf_60d=perf.get("perf_60d"),
+        currency=currency,
+        pe_ratio=pe_ratio,
+    )
+
 
+async def build_portfolio_table_async(
+    client: AsyncIBClient,
+    account_id: Optional[str] = None,
+    db: Optional[AsyncSession] = None,
+) -> List[PositionRow]:
+    """
+    Same rows as build_portfolio_table, with the upstream calls overlapped with the
+    snapshot request.
+
+    Without `db`, 60 daily bars are downloaded per position (concurrently, capped by
+    the client). With `db`, the persistent close store is topped up with only the
+    bars it is missing and perf_30d/perf_60d come from one vectorised lookup.
+    """
+    account_id = account_id or await client.get_primary_account_id()
+    filtered_positions = select_positions(await client.get_all_positions(account_id))
     conids = [int(p["conid"]) for p in filtered_positions]
 
-    # Snapshot fields we care about:
-    field_ids = [
-        31,    # Last Price
-        55,    # Symbol
-        73,    # Market Value
-        74,    # Avg Price
-        75,    # Unrealized PnL (money)
-        80,    # Unrealized PnL %
-        83,    # Change %
-        7051,  # Company name
-        7290,  # P/E
-        7639,  # % of Mark Value
+    if db is None:
+        history = asyncio.gather(
+            *(client.get_history_daily(conid, period="60d") for conid in conids)
+        )
+    else:
+        symbols_by_conid = {
+            int(p["conid"]): p.get("ticker") or p.get("contractDesc") or ""
+            for p in filtered_positions
+        }
+        history = asyncio.ensure_future(refresh_closes(db, client, symbols_by_conid))
+
+    try:
+        snapshot_by_conid = await client.get_snapshot(conids, SNAPSHOT_FIELDS)
+        history_result = await history
+    except BaseException:
+        history.cancel()
+        raise
+
+    if db is None:
+        perf_by_conid = {
+            conid: perf_from_bars(bars) for conid, bars in zip(conids, history_result)
+        }
+    else:
+        await db.commit()
+        perf_by_conid = await db.run_sync(compute_perf, conids)
+
+    return [
+        build_position_row(p, snapshot_by_conid.get(conid, {}), perf_by_conid.get(conid, {}))
+        for p, conid in zip(filtered_positions, conids)
     ]
 
-    snapshot_by_conid = client.get_snapshot(conids, field_ids)
-
-    rows: List[PositionRow] = []
-
-    for p in filtered_positions:
-        conid = int(p["conid"])
-        snap = snapshot_by_conid.get(conid, {})
-
-        symbol = snap.get("55") or p.get("ticker") or p.get("contractDesc") or ""
-        quantity = safe_float(p.get("position")) or 0.0
-        currency = p.get("currency", "")
-
-        last_price = safe_float(snap.get("31"))
-        avg_cost = safe_float(snap.get("74"))
-        market_value = safe_float(snap.get("73"))
-
-        # 7639 is "% of Mark Value" as percentage
-        weight_pct = safe_float(snap.get("7639"))
-        if weight_pct is not None:
-            weight_pct /= 100.0  # convert "9.67" -> 0.0967
-
-        unreal_pnl_pct = safe_float(snap.get("80"))
-        if unreal_pnl_pct is not None:
-            unreal_pnl_pct /= 100.0  # convert "252.73" -> 2.5273
-
-        daily_change_pct = safe_float(snap.get("83"))
-        if daily_change_pct is not None:
-            daily_change_pct /= 100.0  # "1.25" -> 0.0125
-
-        name = snap.get("7051")
-        pe_ratio = safe_float(snap.get("7290"))
-
-        # ---- History for 30D / 60D perf ----
-        bars = client.get_history_daily(conid, period="60d")
-        perf_30d = compute_perf_from_bars(bars, 30)
-        perf_60d = compute_perf_from_bars(bars, 60)
-
-        row = PositionRow(
-            symbol=symbol,
-            name=name,
-            quantity=quantity,
-            last_price=last_price,
-            avg_cost=avg_cost,
-            market_value=market_value,
-            weight_pct=weight_pct,
-            unrealized_pnl_pct=unreal_pnl_pct,
-            daily_change_pct=daily_change_pct,
-            perf_30d=perf_30d,
-            perf_60d=perf_60d,
-            currency=currency,
-            pe_ratio=pe_ratio,
-        )
-        rows.append(row)
 
-    return rows
+def build_portfolio_table(
+    client: IBClient, account_id: Optional[str] = None, use_store: bool = False
+) -> List[PositionRow]:
+    """
+    Blocking counterpart of build_portfolio_table_async over `client`'s own
+    requests session (cookies and headers included); safe to call from a thread
+    of a running event loop. History requests run on a thread pool capped at
+    HISTORY_CONCURRENCY. With `use_store`, perf comes from (and tops up) the
+    persistent close store.
+    """
+    account_id = account_id or client.get_primary_account_id()
+    filtered_positions = select_positions(client.get_all_positions(account_id))
+    conids = [int(p["conid"]) for p in filtered_positions]
+    snapshot_by_conid = client.get_snapshot(conids, SNAPSHOT_FIELDS)
+
+    def history(periods: Dict[int, str]) -> List[List[Dict]]:
+        with ThreadPoolExecutor(max_workers=HISTORY_CONCURRENCY) as pool:
+            return list(pool.map(client.get_history_daily, periods.keys(), periods.values()))
+
+    if not use_store:
+        bars_by_conid = history({conid: "60d" for conid in conids})
+        perf_by_conid = {conid: perf_from_bars(bars) for conid, bars in zip(conids, bars_by_conid)}
+    else:
+        symbols_by_conid = {
+            int(p["conid"]): p.get("ticker") or p.get("contractDesc") or ""
+            for p in filtered_positions
+        }
+        with SessionLocal() as db:
+            periods = history_periods(db, symbols_by_conid)
+            store_history(db, symbols_by_conid, periods, history(periods))
+            db.commit()
+            perf_by_conid = compute_perf(db, conids)
+
+    return [
+        build_position_row(p, snapshot_by_conid.get(conid, {}), perf_by_conid.get(conid, {}))
+        for p, conid in zip(filtered_positions, conids)
+    ]
 
 
 if __name__ == "__main__":
+    # python -m app_db.fetch_data_portfolio
+    from .database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
     client = IBClient(BASE_URL, verify_ssl=VERIFY_SSL)
-    rows = build_portfolio_table(client)
+    rows = build_portfolio_table(client, use_store=True)
 
     # Pretty-print
     header = (
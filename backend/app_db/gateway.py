@@ -0,0 +1,25 @@
+# gateway.py
+"""
+Process-wide AsyncIBClient for request handlers, so every call reuses one pooled
+httpx connection set to the gateway instead of opening a client per request.
+"""
+from typing import Optional
+
+from .config import settings
+from .fetch_data_portfolio import AsyncIBClient
+
+_client: Optional[AsyncIBClient] = None
+
+
+def get_client() -> AsyncIBClient:
+    global _client
+    if _client is None:
+        _client = AsyncIBClient(settings.ib_gateway_url, verify_ssl=False)
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,140 @@
+# history.py
+"""
+Position time series backed by the `position_history` table.
+
+Rows are written alongside every snapshot (see crud.insert_portfolios) and
+downsampled in SQL: each bucket of the requested resolution keeps the values of
+its latest snapshot, picked with ROW_NUMBER() over the bucket.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from .models import Portfolio, Position, PositionHistory
+
+# SQL bucket expression per resolution; "raw" keeps every snapshot. Weeks are keyed
+# on their Monday (not strftime's %W, which splits the week spanning a new year).
+RESOLUTIONS: Dict[str, Optional[Callable]] = {
+    "raw": None,
+    "hour": lambda column: func.strftime("%Y-%m-%d %H", column),
+    "day": lambda column: func.strftime("%Y-%m-%d", column),
+    "week": lambda column: func.date(column, "weekday 0", "-6 days"),
+    "month": lambda column: func.strftime("%Y-%m", column),
+}
+
+
+def history_rows(
+    portfolio_id: int,
+    header: Dict,
+    positions: Iterable[Dict],
+) -> List[Dict]:
+    """position_history rows for one snapshot (`header`/`positions` as dicts of column values)."""
+    rows = []
+    for pos in positions:
+        avg_cost = pos.get("avg_cost")
+        rows.append({
+            "portfolio_id": portfolio_id,
+            "account": header["account"],
+            "symbol": pos["symbol"],
+            "period": header["period"],
+            "generated_at": header["generated_at"],
+            "quantity": pos["quantity"],
+            "last_price": pos.get("last_price"),
+            "value": pos["value"],
+            "weight_pct": pos.get("weight_pct"),
+            "unrealized_pct": pos.get("unrealized_pct"),
+            "unrealized_pnl": (
+                pos["value"] - pos["quantity"] * avg_cost if avg_cost is not None else None
+            ),
+        })
+    return rows
+
+
+def backfill_position_history(db: Session) -> int:
+    """
+    Fill position_history from the stored snapshots when it is empty (databases
+    created before the table existed). Runs as one INSERT ... SELECT; the caller commits.
+    """
+    if db.scalar(select(PositionHistory.id).limit(1)) is not None:
+        return 0
+    source = select(
+        Position.portfolio_id,
+        Portfolio.account,
+        Position.symbol,
+        Portfolio.period,
+        Portfolio.generated_at,
+        Position.quantity,
+        Position.last_price,
+        Position.value,
+        Position.weight_pct,
+        Position.unrealized_pct,
+        Position.value - Position.quantity * Position.avg_cost,
+    ).join(Portfolio, Portfolio.id == Position.portfolio_id)
+    result = db.execute(
+        insert(PositionHistory).from_select(
+            [
+                "portfolio_id", "account", "symbol", "period", "generated_at", "quantity",
+                "last_price", "value", "weight_pct", "unrealized_pct", "unrealized_pnl",
+            ],
+            source,
+        )
+    )
+    return result.rowcount
+
+
+def series_statement(
+    account: str,
+    symbol: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    resolution: str = "day",
+):
+    """
+    SELECT for one symbol's history, oldest first, one row per bucket of `resolution`
+    with the latest snapshot's values and the number of snapshots it covers.
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {', '.join(RESOLUTIONS)}")
+
+    conditions = [PositionHistory.account == account, PositionHistory.symbol == symbol]
+    if start:
+        conditions.append(PositionHistory.generated_at >= datetime.combine(start, time.min))
+    if end:
+        conditions.append(PositionHistory.generated_at < datetime.combine(end + timedelta(days=1), time.min))
+
+    columns: Sequence = (
+        PositionHistory.generated_at,
+        PositionHistory.period,
+        PositionHistory.quantity,
+        PositionHistory.last_price,
+        PositionHistory.value,
+        PositionHistory.weight_pct,
+        PositionHistory.unrealized_pct,
+        PositionHistory.unrealized_pnl,
+    )
+
+    bucket_of = RESOLUTIONS[resolution]
+    if bucket_of is None:
+        return (
+            select(*columns, literal(1).label("samples"))
+            .where(*conditions)
+            .order_by(PositionHistory.generated_at)
+        )
+
+    bucket = bucket_of(PositionHistory.generated_at)
+    ranked = (
+        select(
+            *columns,
+            func.row_number().over(partition_by=bucket, order_by=PositionHistory.generated_at.desc()).label("rank"),
+            func.count().over(partition_by=bucket).label("samples"),
+        )
+        .where(*conditions)
+        .subquery()
+    )
+    return (
+        select(*(ranked.c[c.key] for c in columns), ranked.c.samples)
+        .where(ranked.c.rank == 1)
+        .order_by(ranked.c.generated_at)
+    )
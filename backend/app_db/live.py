@@ -0,0 +1,154 @@
+# live.py
+"""
+Live portfolio view assembled straight from the gateway.
+
+/meta, /ledger, /summary and the position pages are requested concurrently; the
+market-data snapshot of the held conids follows the positions without waiting for
+the other calls, so one assembly costs about one round trip plus the snapshot.
+Perf and risk metrics come from the local close store (no history requests).
+"""
+import asyncio
+import contextlib
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from .analytics import compute_perf, portfolio_metrics
+from .collector import snapshot_from
+from .config import settings
+from .database import AsyncSessionLocal
+from .fetch_data_portfolio import AsyncIBClient, SNAPSHOT_FIELDS, build_position_row, select_positions
+from .models import LEGACY_METRIC_COLUMNS
+from .schemas import PortfolioBase, PortfolioLiveRead
+from .utils import fetch_account_header
+
+# Optional float metrics of the schema that /summary can fill
+SUMMARY_METRICS = {
+    name
+    for name, field in PortfolioBase.model_fields.items()
+    if field.annotation == Optional[float]
+}
+
+
+def metrics_from_summary(summary: Dict) -> Dict[str, float]:
+    """
+    Metric columns from a /portfolio/{accountId}/summary response. Keys use the
+    gateway's unspaced spelling (`buyingpower`), values are `{"amount": ...}`.
+    """
+    metrics = {}
+    for key, entry in (summary or {}).items():
+        name = LEGACY_METRIC_COLUMNS.get(key, key)
+        if name not in SUMMARY_METRICS or not isinstance(entry, dict) or entry.get("isNull"):
+            continue
+        amount = entry.get("amount")
+        if isinstance(amount, (int, float)):
+            metrics[name] = float(amount)
+    return metrics
+
+
+async def _summary_or_empty(client: AsyncIBClient, account_id: str) -> Dict:
+    # the summary only adds metrics; the view is still useful without it
+    try:
+        return await client.get_summary(account_id)
+    except httpx.HTTPError:
+        return {}
+
+
+async def build_live_portfolio(client: AsyncIBClient, account_id: str) -> PortfolioLiveRead:
+    """Assemble the current portfolio of `account_id` (same mapping as a collector snapshot)."""
+
+    async def positions_and_snapshot():
+        positions = select_positions(await client.get_all_positions(account_id))
+        conids = [int(p["conid"]) for p in positions]
+        return positions, conids, await client.get_snapshot(conids, SNAPSHOT_FIELDS)
+
+    header, summary, (positions, conids, snapshot_by_conid) = await asyncio.gather(
+        fetch_account_header(account_id, client),
+        _summary_or_empty(client, account_id),
+        positions_and_snapshot(),
+    )
+
+    async with AsyncSessionLocal() as db:
+        perf_by_conid = await db.run_sync(compute_perf, conids)
+        rows = [
+            build_position_row(p, snapshot_by_conid.get(conid, {}), perf_by_conid.get(conid, {}))
+            for p, conid in zip(positions, conids)
+        ]
+        live = snapshot_from(header, rows)
+        computed = await db.run_sync(
+            portfolio_metrics, live.period, [(p.symbol, p.value) for p in live.positions]
+        )
+
+    values = live.model_dump()
+    values.update(metrics_from_summary(summary))
+    for name, value in computed.items():
+        if values.get(name) is None:
+            values[name] = value
+    return PortfolioLiveRead.model_validate(values)
+
+
+class LivePortfolioCache:
+    """
+    Per-account TTL cache of assembled live portfolios. Concurrent misses for the
+    same account share one assembly; a ttl of 0 disables caching. Expired entries
+    are dropped on the next miss and a lock only lives while requests hold or wait
+    on it, so neither map grows with the accounts ever requested.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, PortfolioLiveRead]] = {}
+        self._locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+    def _fresh(self, account_id: str, not_before: float) -> Optional[Tuple[float, PortfolioLiveRead]]:
+        entry = self._entries.get(account_id)
+        if entry and entry[0] >= not_before and time.monotonic() - entry[0] < self.ttl:
+            return entry
+        return None
+
+    def _evict_expired(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        for account_id in [key for key, (stored, _) in self._entries.items() if stored <= cutoff]:
+            del self._entries[account_id]
+
+    @contextlib.asynccontextmanager
+    async def _account_lock(self, account_id: str) -> AsyncIterator[None]:
+        lock, users = self._locks.get(account_id) or (asyncio.Lock(), 0)
+        self._locks[account_id] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[account_id]
+            if users == 1:
+                del self._locks[account_id]
+            else:
+                self._locks[account_id] = (lock, users - 1)
+
+    async def get(
+        self,
+        account_id: str,
+        build: Callable[[], Awaitable[PortfolioLiveRead]],
+        fresh: bool = False,
+    ) -> Tuple[PortfolioLiveRead, float]:
+        """(portfolio, age in seconds). `fresh` skips entries stored before the call."""
+        requested_at = time.monotonic()
+        not_before = requested_at if fresh else float("-inf")
+        entry = self._fresh(account_id, not_before)
+        if entry is None:
+            async with self._account_lock(account_id):
+                # another request may have assembled it while this one waited
+                entry = self._fresh(account_id, not_before)
+                if entry is None:
+                    value = await build()
+                    entry = (time.monotonic(), value)
+                    if self.ttl > 0:
+                        self._evict_expired()
+                        self._entries[account_id] = entry
+                    else:
+                        return value, 0.0
+        return entry[1], time.monotonic() - entry[0]
+
+
+live_cache = LivePortfolioCache(settings.live_portfolio_ttl)
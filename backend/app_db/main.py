@@ -1,21 +1,76 @@
 # main.py
+import asyncio
+import contextlib
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import Base, engine
+from app.middleware.compression import CompressionMiddleware, ETagMiddleware
+
+from .database import Base, SessionLocal, async_engine, engine, ensure_indexes
+from .gateway import close_client
+from .history import backfill_position_history
+from .migrations import migrate
+from .powerbi import powerbi_cache
+from .rollups import backfill_rollups
+from .collector import collector
+from .config import settings
 from .models import Portfolio, Position  # noqa: F401 (ensure models are imported)
-from .routers import portfolios, powerbi
+from .routers import collector as collector_router, export, history, portfolios, powerbi, rollups
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+ensure_indexes()
+with SessionLocal() as _db:
+    backfill_position_history(_db)
+    backfill_rollups(_db)
+    _db.commit()
 
 app = FastAPI(title="Portfolio API")
+
+_background_tasks: list[asyncio.Task] = []
+
+
+@app.on_event("startup")
+async def startup_event():
+    """
+    Add missing model columns to the existing tables (and fold the legacy metric
+    columns when RUN_MIGRATIONS is set), then start the scheduled portfolio
+    collector and the Power BI embed refresher when configured.
+    """
+    migrate(engine, fold_legacy=settings.run_migrations)
+    if collector.account_ids:
+        _background_tasks.append(asyncio.create_task(collector.run_forever()))
+    if powerbi_cache.configured:
+        _background_tasks.append(asyncio.create_task(powerbi_cache.run_refresher()))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in _background_tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    _background_tasks.clear()
+    await close_client()
+    await powerbi_cache.aclose()
+    await async_engine.dispose()
+
+
+# Strong ETags / 304 for buffered GET responses, compression around them
+app.add_middleware(ETagMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 app.include_router(portfolios.router)
-app.include_router(powerbi.router)
\ No newline at end of file
+app.include_router(powerbi.router)
+app.include_router(collector_router.router)
+app.include_router(history.router)
+app.include_router(rollups.router)
+app.include_router(export.router)
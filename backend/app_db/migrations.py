@@ -0,0 +1,103 @@
+# migrations.py
+"""
+In-place schema upgrades for existing portfolio.db files, run after create_all
+(which only creates missing tables):
+
+- columns declared on the models but missing from an older table are added
+  (e.g. positions.description). Additive, so the app does it on every startup;
+- the duplicate unspaced metric columns (LEGACY_METRIC_COLUMNS) are folded into
+  their canonical column and dropped (SQLite 3.35+ for DROP COLUMN). Destructive,
+  so the app only does it with RUN_MIGRATIONS=true; otherwise run the command below.
+
+Every step checks the live schema first, so running it again is a no-op.
+
+    cd backend
+    python -m app_db.migrations [--vacuum]
+"""
+import argparse
+import logging
+from typing import List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+from .database import Base
+from .models import LEGACY_METRIC_COLUMNS, Portfolio
+
+logger = logging.getLogger(__name__)
+
+# first SQLite release with ALTER TABLE ... DROP COLUMN
+SQLITE_DROP_COLUMN_VERSION = (3, 35, 0)
+
+
+def add_missing_columns(engine: Engine) -> List[str]:
+    """ALTER TABLE ... ADD COLUMN for nullable model columns absent from existing tables."""
+    added = []
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def fold_legacy_metric_columns(engine: Engine) -> List[str]:
+    """Copy legacy metric values into the canonical columns where those are NULL, then drop them."""
+    table = Portfolio.__tablename__
+    existing = {column["name"] for column in inspect(engine).get_columns(table)}
+    legacy = [name for name in LEGACY_METRIC_COLUMNS if name in existing]
+    if not legacy:
+        return []
+
+    with engine.begin() as conn:
+        version = conn.dialect.server_version_info
+        if engine.dialect.name == "sqlite" and version < SQLITE_DROP_COLUMN_VERSION:
+            raise RuntimeError(
+                f"Dropping the legacy metric columns needs SQLite "
+                f"{'.'.join(map(str, SQLITE_DROP_COLUMN_VERSION))}+, found {'.'.join(map(str, version))}"
+            )
+        assignments = ", ".join(
+            f"{LEGACY_METRIC_COLUMNS[name]} = COALESCE({LEGACY_METRIC_COLUMNS[name]}, {name})"
+            for name in legacy
+        )
+        conn.execute(text(f"UPDATE {table} SET {assignments}"))
+        for name in legacy:
+            conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {name}"))
+    return legacy
+
+
+def migrate(engine: Engine, fold_legacy: bool = True, vacuum: bool = False) -> None:
+    added = add_missing_columns(engine)
+    folded = fold_legacy_metric_columns(engine) if fold_legacy else []
+    if added:
+        logger.info("Added columns: %s", ", ".join(added))
+    if folded:
+        logger.info("Folded %d legacy metric columns into their canonical columns", len(folded))
+    if vacuum and engine.dialect.name == "sqlite":
+        # dropped columns keep their pages until the file is rebuilt
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .database import engine
+
+    parser = argparse.ArgumentParser(prog="python -m app_db.migrations")
+    parser.add_argument("--vacuum", action="store_true", help="rebuild the SQLite file afterwards")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    Base.metadata.create_all(bind=engine)
+    migrate(engine, vacuum=args.vacuum)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 # models.py
 from typing import List, Optional
 
-from sqlalchemy import String, Float, Date, DateTime, ForeignKey
+from sqlalchemy import String, Float, Date, DateTime, ForeignKey, Index, Integer, LargeBinary, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import date, datetime
 
@@ -10,6 +10,11 @@ from .database import Base
 
 class Portfolio(Base):
     __tablename__ = "portfolios"
+    __table_args__ = (
+        # keyset pagination: newest first, optionally within one account
+        Index("ix_portfolios_generated_at_id", "generated_at", "id"),
+        Index("ix_portfolios_account_generated_at_id", "account", "generated_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
@@ -30,16 +35,15 @@ class Portfolio(Base):
     portfolio_value: Mapped[float]
 
     # ---------- Metrics ----------
+    # One column per metric; the gateway's unspaced spellings (see LEGACY_METRIC_COLUMNS)
+    # are accepted on input and were folded into these columns by migrations.py.
     account_type: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
 
     accrued_cash: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    accruedcash: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     available_funds: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    availablefunds: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     buying_power: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    buyingpower: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     currency_exposure: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
@@ -48,26 +52,17 @@ class Portfolio(Base):
 
     equities: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     equity_with_loan_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    equitywithloanvalue: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     excess_liquidity: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    excessliquidity: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     full_available_funds: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     full_excess_liquidity: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     full_init_margin_req: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     full_maint_margin_req: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
-    fullavailablefunds: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    fullexcessliquidity: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    fullinitmarginreq: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    fullmaintmarginreq: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-
     gross_position_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    grosspositionvalue: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     init_margin_req: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    initmarginreq: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     look_ahead_available_funds: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     look_ahead_excess_liquidity: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
@@ -75,17 +70,9 @@ class Portfolio(Base):
     look_ahead_maint_margin_req: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     look_ahead_next_change: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
-    lookaheadavailablefunds: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    lookaheadexcessliquidity: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    lookaheadinitmarginreq: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    lookaheadmaintmarginreq: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    lookaheadnextchange: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-
     maint_margin_req: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    maintmarginreq: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     net_liquidation: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    netliquidation: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     portfolio_beta: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     portfolio_volatility: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
@@ -98,7 +85,6 @@ class Portfolio(Base):
 
     total: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     total_cash_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    totalcashvalue: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     unrealized_pnl: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     ytd_return: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
@@ -110,11 +96,35 @@ class Portfolio(Base):
     )
 
 
+# Legacy duplicate column -> canonical column (same metric, IB summary key spelling)
+LEGACY_METRIC_COLUMNS = {
+    "accruedcash": "accrued_cash",
+    "availablefunds": "available_funds",
+    "buyingpower": "buying_power",
+    "equitywithloanvalue": "equity_with_loan_value",
+    "excessliquidity": "excess_liquidity",
+    "fullavailablefunds": "full_available_funds",
+    "fullexcessliquidity": "full_excess_liquidity",
+    "fullinitmarginreq": "full_init_margin_req",
+    "fullmaintmarginreq": "full_maint_margin_req",
+    "grosspositionvalue": "gross_position_value",
+    "initmarginreq": "init_margin_req",
+    "lookaheadavailablefunds": "look_ahead_available_funds",
+    "lookaheadexcessliquidity": "look_ahead_excess_liquidity",
+    "lookaheadinitmarginreq": "look_ahead_init_margin_req",
+    "lookaheadmaintmarginreq": "look_ahead_maint_margin_req",
+    "lookaheadnextchange": "look_ahead_next_change",
+    "maintmarginreq": "maint_margin_req",
+    "netliquidation": "net_liquidation",
+    "totalcashvalue": "total_cash_value",
+}
+
+
 class Position(Base):
     __tablename__ = "positions"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    portfolio_id: Mapped[int] = mapped_column(ForeignKey("portfolios.id"))
+    portfolio_id: Mapped[int] = mapped_column(ForeignKey("portfolios.id"), index=True)
 
     symbol: Mapped[str] = mapped_column(String(10), index=True)
     quantity: Mapped[float]
@@ -140,3 +150,113 @@ class Position(Base):
     description: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
 
     portfolio: Mapped[Portfolio] = relationship(back_populates="positions")
+
+
+class PositionHistory(Base):
+    """
+    One row per (snapshot, symbol): the position fields needed for time series,
+    denormalised with the account and snapshot time so a symbol's history is one
+    range scan of ix_position_history_account_symbol_generated_at.
+    """
+
+    __tablename__ = "position_history"
+    __table_args__ = (
+        Index("ix_position_history_account_symbol_generated_at", "account", "symbol", "generated_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    portfolio_id: Mapped[int] = mapped_column(ForeignKey("portfolios.id"), index=True)
+
+    account: Mapped[str] = mapped_column(String(32))
+    symbol: Mapped[str] = mapped_column(String(10))
+    period: Mapped[date] = mapped_column(Date)
+    generated_at: Mapped[datetime] = mapped_column(DateTime)
+
+    quantity: Mapped[float]
+    last_price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    value: Mapped[float]
+    weight_pct: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    unrealized_pct: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    unrealized_pnl: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+
+class DailyAccountTotal(Base):
+    """Daily rollup per account, from the day's latest snapshot (see rollups.py)."""
+
+    __tablename__ = "daily_account_totals"
+
+    account: Mapped[str] = mapped_column(String(32), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+
+    portfolio_id: Mapped[int] = mapped_column(Integer)
+    generated_at: Mapped[datetime] = mapped_column(DateTime)
+    base_currency: Mapped[str] = mapped_column(String(8))
+
+    portfolio_value: Mapped[float]
+    cash: Mapped[float]
+    positions_value: Mapped[float]
+    unrealized_pnl: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    position_count: Mapped[int] = mapped_column(Integer)
+
+
+class DailySymbolExposure(Base):
+    """Daily rollup per account and symbol, from the day's latest snapshot."""
+
+    __tablename__ = "daily_symbol_exposures"
+
+    account: Mapped[str] = mapped_column(String(32), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    symbol: Mapped[str] = mapped_column(String(10), primary_key=True)
+
+    currency: Mapped[str] = mapped_column(String(8))
+    quantity: Mapped[float]
+    value: Mapped[float]
+    weight_pct: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+
+class DailyCurrencyBalance(Base):
+    """
+    Daily rollup per account and currency: value of the positions quoted in that
+    currency, and the snapshot cash (held in the base currency row).
+    """
+
+    __tablename__ = "daily_currency_balances"
+
+    account: Mapped[str] = mapped_column(String(32), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    currency: Mapped[str] = mapped_column(String(8), primary_key=True)
+
+    cash: Mapped[float]
+    positions_value: Mapped[float]
+
+
+class DailyCloseSeries(Base):
+    """
+    Daily closing prices of one contract, cached from /iserver/marketdata/history.
+    Stored packed (one row per conid) so a whole portfolio loads as aligned NumPy arrays:
+    `days` holds int32 days since 1970-01-01 (ascending), `closes` the matching float64 closes.
+    """
+
+    __tablename__ = "daily_close_series"
+
+    conid: Mapped[int] = mapped_column(Integer, primary_key=True)
+    symbol: Mapped[str] = mapped_column(String(10), index=True)
+
+    days: Mapped[bytes] = mapped_column(LargeBinary)
+    closes: Mapped[bytes] = mapped_column(LargeBinary)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime)
+
+
+class CollectorRun(Base):
+    """One run of the scheduled portfolio collector, kept for monitoring."""
+
+    __tablename__ = "collector_runs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+    duration_ms: Mapped[float] = mapped_column(Float)
+    status: Mapped[str] = mapped_column(String(16))  # ok / error / skipped
+    accounts: Mapped[str] = mapped_column(String(500))
+    portfolios_written: Mapped[int] = mapped_column(Integer)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
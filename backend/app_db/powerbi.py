@@ -0,0 +1,180 @@
+# powerbi.py
+"""
+Power BI embed configuration (embed URL + embed token) for the frontend, cached
+in memory.
+
+The Azure AD token, the report's embed URL and the embed token are kept until
+POWERBI_REFRESH_MARGIN seconds (at most half their lifetime) before they expire;
+a background task refreshes them ahead of that, so page loads are answered from
+memory. The report lookup and GenerateToken only need the AAD token and are sent
+concurrently. MSAL is blocking, so the AAD token is acquired in a worker thread.
+
+The API base URL and AAD authority come from Settings, and `token_provider` /
+`transport` can be injected to run the whole flow against a stand-in.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+import httpx
+
+from .config import Settings, settings
+
+logger = logging.getLogger(__name__)
+
+POWERBI_SCOPE = "https://analysis.windows.net/powerbi/api/.default"
+
+
+class PowerBIError(Exception):
+    """Power BI or Azure AD did not return a usable token / report."""
+
+
+def _seconds_until(expiration: str) -> float:
+    # GenerateToken returns e.g. "2025-11-13T09:54:34Z"
+    try:
+        expires = datetime.fromisoformat(expiration.replace("Z", "+00:00"))
+    except (AttributeError, ValueError) as exc:
+        raise PowerBIError(f"unexpected embed token expiration {expiration!r}") from exc
+    if expires.tzinfo is None:
+        expires = expires.replace(tzinfo=timezone.utc)
+    return (expires - datetime.now(timezone.utc)).total_seconds()
+
+
+class PowerBIEmbedCache:
+    def __init__(
+        self,
+        config: Settings = settings,
+        token_provider: Optional[Callable[[], Dict]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.config = config
+        self.margin = config.powerbi_refresh_margin
+        self._token_provider = token_provider
+        self._transport = transport
+        self._msal_app = None
+        self._client: Optional[httpx.AsyncClient] = None
+        # (value, monotonic refresh time) / (value, monotonic refresh time, monotonic expiry)
+        self._aad: Optional[Tuple[str, float]] = None
+        self._embed: Optional[Tuple[Dict[str, str], float, float]] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def configured(self) -> bool:
+        c = self.config
+        return bool(c.powerbi_workspace_id and c.powerbi_report_id and (
+            self._token_provider or (c.powerbi_tenant_id and c.powerbi_client_id and c.powerbi_client_secret)
+        ))
+
+    def _refresh_at(self, now: float, lifetime: float) -> float:
+        # a margin longer than the lifetime would make every entry due at once
+        return now + lifetime - min(self.margin, lifetime / 2)
+
+    # ---------- Azure AD ----------
+
+    def _acquire_with_msal(self) -> Dict:
+        if self._msal_app is None:
+            import msal  # pyright: ignore[reportMissingImports]
+
+            c = self.config
+            self._msal_app = msal.ConfidentialClientApplication(
+                c.powerbi_client_id,
+                authority=f"{c.powerbi_authority_host.rstrip('/')}/{c.powerbi_tenant_id}",
+                client_credential=c.powerbi_client_secret,
+            )
+        return self._msal_app.acquire_token_for_client(scopes=[POWERBI_SCOPE])
+
+    async def _access_token(self) -> str:
+        if self._aad and time.monotonic() < self._aad[1]:
+            return self._aad[0]
+        try:
+            result = await asyncio.to_thread(self._token_provider or self._acquire_with_msal)
+        except Exception as exc:  # MSAL raises requests/ValueError errors of its own
+            raise PowerBIError(f"Azure AD token request failed: {exc}") from exc
+        if "access_token" not in result:
+            raise PowerBIError(result.get("error_description") or result.get("error") or "no access token")
+        lifetime = float(result.get("expires_in", 3600))
+        self._aad = (result["access_token"], self._refresh_at(time.monotonic(), lifetime))
+        return self._aad[0]
+
+    # ---------- Embed config ----------
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(transport=self._transport, timeout=30.0)
+        return self._client
+
+    async def _fetch(self) -> Tuple[Dict[str, str], float, float]:
+        c = self.config
+        headers = {"Authorization": f"Bearer {await self._access_token()}"}
+        report_url = f"{c.powerbi_api_url.rstrip('/')}/groups/{c.powerbi_workspace_id}/reports/{c.powerbi_report_id}"
+        report_res, token_res = await asyncio.gather(
+            self._http().get(report_url, headers=headers),
+            self._http().post(f"{report_url}/GenerateToken", headers=headers, json={"accessLevel": "View"}),
+        )
+        report_res.raise_for_status()
+        token_res.raise_for_status()
+        report, token = report_res.json(), token_res.json()
+        if "embedUrl" not in report or "token" not in token:
+            raise PowerBIError("unexpected Power BI response")
+
+        lifetime = _seconds_until(token["expiration"]) if token.get("expiration") else 3600.0
+        if lifetime <= 0:
+            raise PowerBIError(f"embed token already expired ({token['expiration']})")
+        embed = {
+            "reportId": c.powerbi_report_id,
+            "embedUrl": report["embedUrl"],
+            "embedToken": token["token"],
+        }
+        now = time.monotonic()
+        return embed, self._refresh_at(now, lifetime), now + lifetime
+
+    async def refresh(self) -> Dict[str, str]:
+        """Fetch a new embed config now (concurrent callers share one fetch)."""
+        started = time.monotonic()
+        async with self._lock:
+            if self._embed is None or self._embed[1] <= started:
+                self._embed = await self._fetch()
+            return self._embed[0]
+
+    async def get(self) -> Dict[str, str]:
+        """Embed config for the frontend; only fetched when nothing usable is cached."""
+        embed = self._embed
+        now = time.monotonic()
+        if embed and now < embed[2]:
+            self.hits += 1
+            if now >= embed[1] and not (self._refresh_task and not self._refresh_task.done()):
+                # inside the refresh window without the refresher: serve this one, refresh behind it
+                self._refresh_task = asyncio.create_task(self._refresh_quietly())
+            return embed[0]
+        self.misses += 1
+        return await self.refresh()
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Power BI embed refresh failed")
+
+    async def run_refresher(self) -> None:
+        """Refresh the embed config when it enters its refresh window. Cancel to stop."""
+        while True:
+            try:
+                await self.refresh()
+                delay = self._embed[1] - time.monotonic()
+            except Exception:
+                logger.exception("Power BI embed refresh failed")
+                delay = 30.0
+            await asyncio.sleep(max(delay, 5.0))
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+powerbi_cache = PowerBIEmbedCache()
@@ -0,0 +1,194 @@
+# rollups.py
+"""
+Daily rollup tables for reporting (Power BI): per-account totals, per-symbol
+exposure and per-currency balances, each taken from the latest snapshot of the
+account's day (`period`).
+
+Rollups for the (account, day) pairs touched by a write are recomputed in SQL in
+the same transaction (crud.insert_portfolios, portfolio delete). The whole set can
+be rebuilt from the raw snapshots:
+
+    cd backend
+    python -m app_db.rollups rebuild [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+"""
+import argparse
+from collections import defaultdict
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from .models import (
+    DailyAccountTotal,
+    DailyCurrencyBalance,
+    DailySymbolExposure,
+    Portfolio,
+    Position,
+)
+
+ROLLUP_TABLES = (DailyAccountTotal, DailySymbolExposure, DailyCurrencyBalance)
+
+# (account, day) keys per refresh statement: two bound parameters each, kept under
+# the 999 variables of SQLite builds older than 3.32
+KEY_CHUNK = 400
+
+
+def _scope(
+    account_col,
+    day_col,
+    keys: Optional[Iterable[Tuple[str, date]]],
+    start: Optional[date],
+    end: Optional[date],
+) -> List:
+    conditions = []
+    if keys is not None:
+        conditions.append(tuple_(account_col, day_col).in_(keys))
+    if start:
+        conditions.append(day_col >= start)
+    if end:
+        conditions.append(day_col <= end)
+    return conditions
+
+
+def refresh_rollups(
+    db: Session,
+    keys: Optional[Iterable[Tuple[str, date]]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> int:
+    """
+    Recompute the rollups of the (account, day) `keys` (all of them when None),
+    optionally limited to days in [start, end]. Keys are processed KEY_CHUNK at a
+    time. Returns the number of account-days written; the caller commits.
+    """
+    if keys is None:
+        return _refresh(db, None, start, end)
+    keys = list(dict.fromkeys(keys))
+    return sum(
+        _refresh(db, keys[i:i + KEY_CHUNK], start, end) for i in range(0, len(keys), KEY_CHUNK)
+    )
+
+
+def _refresh(
+    db: Session,
+    keys: Optional[List[Tuple[str, date]]],
+    start: Optional[date],
+    end: Optional[date],
+) -> int:
+    for table in ROLLUP_TABLES:
+        db.execute(delete(table).where(*_scope(table.account, table.day, keys, start, end)))
+
+    ranked = (
+        select(
+            Portfolio.id,
+            func.row_number()
+            .over(
+                partition_by=(Portfolio.account, Portfolio.period),
+                order_by=(Portfolio.generated_at.desc(), Portfolio.id.desc()),
+            )
+            .label("rank"),
+        )
+        .where(*_scope(Portfolio.account, Portfolio.period, keys, start, end))
+        .subquery()
+    )
+    latest = select(ranked.c.id).where(ranked.c.rank == 1).subquery()
+
+    written = db.execute(
+        insert(DailyAccountTotal).from_select(
+            [
+                "account", "day", "portfolio_id", "generated_at", "base_currency",
+                "portfolio_value", "cash", "positions_value", "unrealized_pnl", "position_count",
+            ],
+            select(
+                Portfolio.account,
+                Portfolio.period,
+                Portfolio.id,
+                Portfolio.generated_at,
+                Portfolio.base_currency,
+                Portfolio.portfolio_value,
+                Portfolio.cash,
+                func.coalesce(func.sum(Position.value), 0.0),
+                func.sum(Position.value - Position.quantity * Position.avg_cost),
+                func.count(Position.id),
+            )
+            .join(latest, latest.c.id == Portfolio.id)
+            .outerjoin(Position, Position.portfolio_id == Portfolio.id)
+            .group_by(Portfolio.id),
+        )
+    ).rowcount
+
+    db.execute(
+        insert(DailySymbolExposure).from_select(
+            ["account", "day", "symbol", "currency", "quantity", "value", "weight_pct"],
+            select(
+                Portfolio.account,
+                Portfolio.period,
+                Position.symbol,
+                func.min(Position.currency),
+                func.sum(Position.quantity),
+                func.sum(Position.value),
+                func.sum(Position.weight_pct),
+            )
+            .join(latest, latest.c.id == Portfolio.id)
+            .join(Position, Position.portfolio_id == Portfolio.id)
+            .group_by(Portfolio.account, Portfolio.period, Position.symbol),
+        )
+    )
+
+    # cash is only known in the base currency, position value per quote currency
+    balances = defaultdict(lambda: {"cash": 0.0, "positions_value": 0.0})
+    for account, day, currency, cash in db.execute(
+        select(Portfolio.account, Portfolio.period, Portfolio.base_currency, Portfolio.cash)
+        .join(latest, latest.c.id == Portfolio.id)
+    ):
+        balances[account, day, currency]["cash"] += cash or 0.0
+    for account, day, currency, value in db.execute(
+        select(Portfolio.account, Portfolio.period, Position.currency, func.sum(Position.value))
+        .join(latest, latest.c.id == Portfolio.id)
+        .join(Position, Position.portfolio_id == Portfolio.id)
+        .group_by(Portfolio.account, Portfolio.period, Position.currency)
+    ):
+        balances[account, day, currency]["positions_value"] += value or 0.0
+    if balances:
+        db.execute(
+            insert(DailyCurrencyBalance),
+            [
+                {"account": account, "day": day, "currency": currency, **amounts}
+                for (account, day, currency), amounts in balances.items()
+            ],
+        )
+    return written
+
+
+def rebuild_rollups(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """Recompute every rollup (or those of days in [start, end]) from the raw snapshots."""
+    return refresh_rollups(db, None, start, end)
+
+
+def backfill_rollups(db: Session) -> int:
+    """Build the rollups when they are empty (databases created before the tables existed)."""
+    if db.scalar(select(DailyAccountTotal.account).limit(1)) is not None:
+        return 0
+    return rebuild_rollups(db)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .database import Base, SessionLocal, engine
+
+    parser = argparse.ArgumentParser(prog="python -m app_db.rollups")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild = commands.add_parser("rebuild", help="recompute rollups from the raw snapshots")
+    rebuild.add_argument("--start", type=date.fromisoformat, default=None)
+    rebuild.add_argument("--end", type=date.fromisoformat, default=None)
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        written = rebuild_rollups(db, args.start, args.end)
+        db.commit()
+    print(f"Rebuilt rollups for {written} account-days")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# routers/collector.py
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..collector import collector, next_run_after
+from ..database import get_async_db
+from ..models import CollectorRun
+from ..schemas import CollectorRunRead, CollectorStatus
+
+router = APIRouter(prefix="/collector", tags=["collector"])
+
+
+@router.get("/status", response_model=CollectorStatus)
+async def get_collector_status(
+    limit: int = Query(20, ge=1, le=500, description="Number of recent runs"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    runs = (
+        await db.scalars(
+            select(CollectorRun).order_by(CollectorRun.started_at.desc()).limit(limit)
+        )
+    ).all()
+    enabled = bool(collector.account_ids)
+    return CollectorStatus(
+        enabled=enabled,
+        accounts=collector.account_ids,
+        next_run=next_run_after(datetime.now(timezone.utc)) if enabled else None,
+        running=collector.running,
+        recent_runs=runs,
+    )
+
+
+@router.post("/run", response_model=CollectorRunRead)
+async def run_collector_now():
+    """Collect immediately (skipped if a run is already active)."""
+    return await collector.collect()
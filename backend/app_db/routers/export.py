@@ -0,0 +1,40 @@
+# routers/export.py
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from ..export import EXPORTS, MEDIA_TYPES, encode, negotiate_format, parquet_available
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: Literal["portfolios", "positions", "position_history"],
+    account: Optional[str] = None,
+    start: Optional[date] = Query(default=None, description="First period (inclusive)"),
+    end: Optional[date] = Query(default=None, description="Last period (inclusive)"),
+    requested: Optional[str] = Query(
+        default=None, alias="format", description="csv, ndjson or parquet (overrides Accept)"
+    ),
+    accept: Optional[str] = Header(default=None),
+):
+    """
+    Stream every stored row of `dataset` (oldest first) as CSV, NDJSON or Parquet.
+    Rows are fetched and encoded in batches, so memory does not grow with the row count.
+    A query that fails before its first batch is a 500; later failures cut the stream short.
+    """
+    fmt = negotiate_format(requested, accept)
+    if fmt is None:
+        raise HTTPException(status_code=406, detail=f"Supported formats: {', '.join(MEDIA_TYPES)}")
+    if fmt == "parquet" and not parquet_available():
+        raise HTTPException(status_code=406, detail="Parquet export requires pyarrow")
+
+    stmt = EXPORTS[dataset](account, start, end)
+    return StreamingResponse(
+        await encode(fmt, stmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{fmt}"'},
+    )
@@ -0,0 +1,26 @@
+# routers/history.py
+from datetime import date
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_db
+from ..history import series_statement
+from ..schemas import PositionHistoryPoint
+
+router = APIRouter(prefix="/positions", tags=["positions"])
+
+
+@router.get("/{symbol}/history", response_model=List[PositionHistoryPoint])
+async def get_position_history(
+    symbol: str,
+    account: str,
+    start: Optional[date] = Query(default=None, description="First day (inclusive)"),
+    end: Optional[date] = Query(default=None, description="Last day (inclusive)"),
+    resolution: Literal["raw", "hour", "day", "week", "month"] = "day",
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Quantity, value, weight and PnL of `symbol` in `account`, one point per bucket."""
+    result = await db.execute(series_statement(account, symbol, start, end, resolution))
+    return result.mappings().all()
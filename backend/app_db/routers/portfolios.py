@@ -1,79 +1,165 @@
 # routers/portfolios.py
-from typing import List
+import base64
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from ..database import get_db
-from ..models import Portfolio, Position
-from ..schemas import PortfolioCreate, PortfolioRead
-from ..utils import get_account_header_from_meta_and_ledger
+from ..crud import insert_portfolios
+from ..database import get_async_db, run_write
+from ..gateway import get_client
+from ..live import build_live_portfolio, live_cache
+from ..models import Portfolio, PositionHistory
+from ..rollups import refresh_rollups
+from ..schemas import PortfolioCreate, PortfolioHeaderRead, PortfolioLiveRead, PortfolioRead
+from ..utils import LedgerError
 
 router = APIRouter(prefix="/portfolios", tags=["portfolios"])
 
 
 @router.post("/", response_model=PortfolioRead)
-def create_portfolio(portfolio_in: PortfolioCreate, db: Session = Depends(get_db)):
-    # create Portfolio from all fields except positions
-    data = portfolio_in.model_dump(exclude={"positions"})
-    portfolio = Portfolio(**data)
-
-    for pos_in in portfolio_in.positions:
-        position = Position(
-            symbol=pos_in.symbol,
-            quantity=pos_in.quantity,
-            last_price=pos_in.last_price,
-            avg_cost=pos_in.avg_cost,
-            value=pos_in.value,
-            weight_pct=pos_in.weight_pct,
-            unrealized_pct=pos_in.unrealized_pct,
-            daily_change_pct=pos_in.daily_change_pct,
-            perf_30d_pct=pos_in.perf_30d_pct,
-            perf_60d_pct=pos_in.perf_60d_pct,
-            pt=pos_in.pt,
-            upside_pct=pos_in.upside_pct,
-            currency=pos_in.currency,
-            equity_risk_profile=pos_in.equity_risk_profile,
-            name=pos_in.name,
-            pe_ratio=pos_in.pe_ratio,
-        )
-        portfolio.positions.append(position)
+async def create_portfolio(portfolio_in: PortfolioCreate):
+    return (await run_write(insert_portfolios, [portfolio_in]))[0]
 
-    db.add(portfolio)
-    db.commit()
-    db.refresh(portfolio)
-    return portfolio
+
+@router.post("/batch", response_model=List[PortfolioRead])
+async def create_portfolios(portfolios_in: List[PortfolioCreate]):
+    """Insert many portfolio snapshots in one transaction."""
+    return await run_write(insert_portfolios, portfolios_in)
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(portfolio: Portfolio) -> str:
+    raw = f"{portfolio.generated_at.isoformat()}|{portfolio.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        generated_at, portfolio_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(generated_at), int(portfolio_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _page(
+    db: AsyncSession,
+    response: Response,
+    account: Optional[str],
+    start: Optional[date],
+    end: Optional[date],
+    cursor: Optional[str],
+    limit: int,
+    with_positions: bool,
+) -> List[Portfolio]:
+    """
+    One page of portfolios, newest first, keyed on (generated_at, id). The cursor for
+    the next page is returned in the X-Next-Cursor header (absent on the last page).
+    """
+    stmt = select(Portfolio)
+    if account:
+        stmt = stmt.where(Portfolio.account == account)
+    if start:
+        stmt = stmt.where(Portfolio.generated_at >= datetime.combine(start, time.min))
+    if end:
+        stmt = stmt.where(Portfolio.generated_at < datetime.combine(end + timedelta(days=1), time.min))
+    if cursor:
+        stmt = stmt.where(tuple_(Portfolio.generated_at, Portfolio.id) < decode_cursor(cursor))
+    if with_positions:
+        # one extra IN query per page instead of one lazy load per portfolio
+        stmt = stmt.options(selectinload(Portfolio.positions))
+
+    stmt = stmt.order_by(Portfolio.generated_at.desc(), Portfolio.id.desc()).limit(limit + 1)
+    portfolios = (await db.scalars(stmt)).all()
+
+    if len(portfolios) > limit:
+        portfolios = portfolios[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(portfolios[-1])
+    return portfolios
 
 
 @router.get("/", response_model=List[PortfolioRead])
-def list_portfolios(db: Session = Depends(get_db)):
-    return db.query(Portfolio).all()
+async def list_portfolios(
+    response: Response,
+    account: Optional[str] = None,
+    start: Optional[date] = Query(default=None, description="First day (inclusive) of generated_at"),
+    end: Optional[date] = Query(default=None, description="Last day (inclusive) of generated_at"),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await _page(db, response, account, start, end, cursor, limit, with_positions=True)
+
+
+@router.get("/headers", response_model=List[PortfolioHeaderRead])
+async def list_portfolio_headers(
+    response: Response,
+    account: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Same listing as GET /portfolios/ without the positions."""
+    return await _page(db, response, account, start, end, cursor, limit, with_positions=False)
 
 
 @router.get("/{portfolio_id}", response_model=PortfolioRead)
-def get_portfolio(portfolio_id: int, db: Session = Depends(get_db)):
-    portfolio = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
+async def get_portfolio(portfolio_id: int, db: AsyncSession = Depends(get_async_db)):
+    portfolio = await db.get(Portfolio, portfolio_id, options=[selectinload(Portfolio.positions)])
     if not portfolio:
         raise HTTPException(status_code=404, detail="Portfolio not found")
     return portfolio
 
 
-@router.delete("/{portfolio_id}", status_code=204)
-def delete_portfolio(portfolio_id: int, db: Session = Depends(get_db)):
-    portfolio = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
+def _delete_portfolio(db: Session, portfolio_id: int) -> bool:
+    portfolio = db.get(Portfolio, portfolio_id)
     if not portfolio:
-        raise HTTPException(status_code=404, detail="Portfolio not found")
+        return False
+    db.execute(delete(PositionHistory).where(PositionHistory.portfolio_id == portfolio_id))
     db.delete(portfolio)
-    db.commit()
-    return
+    db.flush()
+    refresh_rollups(db, [(portfolio.account, portfolio.period)])
+    return True
 
-@router.get("/live/{account_id}", response_model=PortfolioRead)
-def get_live_portfolio(account_id: str):
-    portfolio = get_live_portfolio(account_id)
-    if not portfolio:
+
+@router.delete("/{portfolio_id}", status_code=204)
+async def delete_portfolio(portfolio_id: int):
+    if not await run_write(_delete_portfolio, portfolio_id):
         raise HTTPException(status_code=404, detail="Portfolio not found")
-    return portfolio
+    return
 
-def get_live_summary(account_id: str):
-    header = get_account_header_from_meta_and_ledger(account_id)
-    
+@router.get("/live/{account_id}", response_model=PortfolioLiveRead)
+async def get_live_portfolio(
+    account_id: str,
+    response: Response,
+    fresh: bool = Query(default=False, description="Bypass the short-lived cache"),
+):
+    """
+    Current portfolio of `account_id` assembled from the gateway (meta, ledger, summary,
+    all position pages and a snapshot of the held conids, fetched concurrently).
+    Reused for LIVE_PORTFOLIO_TTL seconds; the `Age` header gives the entry age.
+    """
+    try:
+        portfolio, age = await live_cache.get(
+            account_id, lambda: build_live_portfolio(get_client(), account_id), fresh=fresh
+        )
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code in (400, 404):
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+        raise HTTPException(status_code=502, detail=f"Gateway error: {exc.response.status_code}")
+    except httpx.HTTPError as exc:
+        raise HTTPException(status_code=502, detail=f"Gateway unreachable: {exc}")
+    except LedgerError as exc:
+        raise HTTPException(status_code=502, detail=str(exc))
+
+    response.headers["Age"] = str(int(age))
+    return portfolio
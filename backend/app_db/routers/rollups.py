@@ -0,0 +1,73 @@
+# routers/rollups.py
+"""
+Read endpoints over the daily rollup tables, shaped for Power BI incremental refresh:
+each partition calls with its RangeStart/RangeEnd window and gets only those days
+(RangeStart <= day < RangeEnd, days taken at midnight).
+"""
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_db
+from ..models import DailyAccountTotal, DailyCurrencyBalance, DailySymbolExposure
+from ..schemas import DailyAccountTotalRead, DailyCurrencyBalanceRead, DailySymbolExposureRead
+
+router = APIRouter(prefix="/rollups", tags=["rollups"])
+
+
+def _first_day_at_or_after(moment: datetime) -> date:
+    return moment.date() if moment.time() == datetime.min.time() else moment.date() + timedelta(days=1)
+
+
+class RangeParams:
+    """RangeStart / RangeEnd query parameters (names as used by Power BI)."""
+
+    def __init__(
+        self,
+        range_start: Optional[datetime] = Query(default=None, alias="RangeStart"),
+        range_end: Optional[datetime] = Query(default=None, alias="RangeEnd"),
+        account: Optional[str] = None,
+    ):
+        self.range_start = range_start
+        self.range_end = range_end
+        self.account = account
+
+    def apply(self, stmt, table):
+        if self.range_start:
+            stmt = stmt.where(table.day >= _first_day_at_or_after(self.range_start))
+        if self.range_end:
+            stmt = stmt.where(table.day < _first_day_at_or_after(self.range_end))
+        if self.account:
+            stmt = stmt.where(table.account == self.account)
+        return stmt.order_by(table.day, table.account)
+
+
+@router.get("/accounts", response_model=List[DailyAccountTotalRead])
+async def list_account_totals(
+    params: RangeParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return (await db.scalars(params.apply(select(DailyAccountTotal), DailyAccountTotal))).all()
+
+
+@router.get("/symbols", response_model=List[DailySymbolExposureRead])
+async def list_symbol_exposures(
+    params: RangeParams = Depends(),
+    symbol: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = params.apply(select(DailySymbolExposure), DailySymbolExposure)
+    if symbol:
+        stmt = stmt.where(DailySymbolExposure.symbol == symbol)
+    return (await db.scalars(stmt)).all()
+
+
+@router.get("/currencies", response_model=List[DailyCurrencyBalanceRead])
+async def list_currency_balances(
+    params: RangeParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return (await db.scalars(params.apply(select(DailyCurrencyBalance), DailyCurrencyBalance))).all()
@@ -2,7 +2,7 @@
 from datetime import date, datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 
 
 # ---------- Position schemas ----------
@@ -44,6 +44,11 @@ class PositionRead(PositionBase):
 
 # ---------- Portfolio schemas ----------
 
+def _metric(name: str, legacy: str):
+    """Optional metric that also accepts the gateway's unspaced key (e.g. `buyingpower`) on input."""
+    return Field(default=None, validation_alias=AliasChoices(name, legacy))
+
+
 class PortfolioBase(BaseModel):
     # header
     period: date
@@ -59,14 +64,11 @@ class PortfolioBase(BaseModel):
     # metrics
     account_type: Optional[str] = None
 
-    accrued_cash: Optional[float] = None
-    accruedcash: Optional[float] = None
+    accrued_cash: Optional[float] = _metric("accrued_cash", "accruedcash")
 
-    available_funds: Optional[float] = None
-    availablefunds: Optional[float] = None
+    available_funds: Optional[float] = _metric("available_funds", "availablefunds")
 
-    buying_power: Optional[float] = None
-    buyingpower: Optional[float] = None
+    buying_power: Optional[float] = _metric("buying_power", "buyingpower")
 
     currency_exposure: Optional[float] = None
 
@@ -74,45 +76,28 @@ class PortfolioBase(BaseModel):
     dividend_yield: Optional[float] = None
 
     equities: Optional[float] = None
-    equity_with_loan_value: Optional[float] = None
-    equitywithloanvalue: Optional[float] = None
-
-    excess_liquidity: Optional[float] = None
-    excessliquidity: Optional[float] = None
-
-    full_available_funds: Optional[float] = None
-    full_excess_liquidity: Optional[float] = None
-    full_init_margin_req: Optional[float] = None
-    full_maint_margin_req: Optional[float] = None
+    equity_with_loan_value: Optional[float] = _metric("equity_with_loan_value", "equitywithloanvalue")
 
-    fullavailablefunds: Optional[float] = None
-    fullexcessliquidity: Optional[float] = None
-    fullinitmarginreq: Optional[float] = None
-    fullmaintmarginreq: Optional[float] = None
+    excess_liquidity: Optional[float] = _metric("excess_liquidity", "excessliquidity")
 
-    gross_position_value: Optional[float] = None
-    grosspositionvalue: Optional[float] = None
+    full_available_funds: Optional[float] = _metric("full_available_funds", "fullavailablefunds")
+    full_excess_liquidity: Optional[float] = _metric("full_excess_liquidity", "fullexcessliquidity")
+    full_init_margin_req: Optional[float] = _metric("full_init_margin_req", "fullinitmarginreq")
+    full_maint_margin_req: Optional[float] = _metric("full_maint_margin_req", "fullmaintmarginreq")
 
-    init_margin_req: Optional[float] = None
-    initmarginreq: Optional[float] = None
+    gross_position_value: Optional[float] = _metric("gross_position_value", "grosspositionvalue")
 
-    look_ahead_available_funds: Optional[float] = None
-    look_ahead_excess_liquidity: Optional[float] = None
-    look_ahead_init_margin_req: Optional[float] = None
-    look_ahead_maint_margin_req: Optional[float] = None
-    look_ahead_next_change: Optional[float] = None
+    init_margin_req: Optional[float] = _metric("init_margin_req", "initmarginreq")
 
-    lookaheadavailablefunds: Optional[float] = None
-    lookaheadexcessliquidity: Optional[float] = None
-    lookaheadinitmarginreq: Optional[float] = None
-    lookaheadmaintmarginreq: Optional[float] = None
-    lookaheadnextchange: Optional[float] = None
+    look_ahead_available_funds: Optional[float] = _metric("look_ahead_available_funds", "lookaheadavailablefunds")
+    look_ahead_excess_liquidity: Optional[float] = _metric("look_ahead_excess_liquidity", "lookaheadexcessliquidity")
+    look_ahead_init_margin_req: Optional[float] = _metric("look_ahead_init_margin_req", "lookaheadinitmarginreq")
+    look_ahead_maint_margin_req: Optional[float] = _metric("look_ahead_maint_margin_req", "lookaheadmaintmarginreq")
+    look_ahead_next_change: Optional[float] = _metric("look_ahead_next_change", "lookaheadnextchange")
 
-    maint_margin_req: Optional[float] = None
-    maintmarginreq: Optional[float] = None
+    maint_margin_req: Optional[float] = _metric("maint_margin_req", "maintmarginreq")
 
-    net_liquidation: Optional[float] = None
-    netliquidation: Optional[float] = None
+    net_liquidation: Optional[float] = _metric("net_liquidation", "netliquidation")
 
     portfolio_beta: Optional[float] = None
     portfolio_volatility: Optional[float] = None
@@ -124,8 +109,7 @@ class PortfolioBase(BaseModel):
     top_holding_value: Optional[float] = None
 
     total: Optional[float] = None
-    total_cash_value: Optional[float] = None
-    totalcashvalue: Optional[float] = None
+    total_cash_value: Optional[float] = _metric("total_cash_value", "totalcashvalue")
 
     unrealized_pnl: Optional[float] = None
     ytd_return: Optional[float] = None
@@ -135,9 +119,99 @@ class PortfolioCreate(PortfolioBase):
     positions: List[PositionCreate] = []
 
 
-class PortfolioRead(PortfolioBase):
+class PortfolioHeaderRead(PortfolioBase):
     id: int
+
+    class Config:
+        from_attributes = True
+
+
+class PortfolioRead(PortfolioHeaderRead):
     positions: List[PositionRead] = []
 
+
+class PortfolioLiveRead(PortfolioBase):
+    """Portfolio assembled from the gateway on request (not stored, so no ids)."""
+
+    positions: List[PositionBase] = []
+
+
+# ---------- Position history schemas ----------
+
+class PositionHistoryPoint(BaseModel):
+    generated_at: datetime
+    period: date
+    quantity: float
+    last_price: Optional[float] = None
+    value: float
+    weight_pct: Optional[float] = None
+    unrealized_pct: Optional[float] = None
+    unrealized_pnl: Optional[float] = None
+    samples: int = Field(default=1, description="Snapshots in the bucket (values are from the latest)")
+
+    class Config:
+        from_attributes = True
+
+
+# ---------- Rollup schemas ----------
+
+class DailyAccountTotalRead(BaseModel):
+    account: str
+    day: date
+    portfolio_id: int
+    generated_at: datetime
+    base_currency: str
+    portfolio_value: float
+    cash: float
+    positions_value: float
+    unrealized_pnl: Optional[float] = None
+    position_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class DailySymbolExposureRead(BaseModel):
+    account: str
+    day: date
+    symbol: str
+    currency: str
+    quantity: float
+    value: float
+    weight_pct: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+
+class DailyCurrencyBalanceRead(BaseModel):
+    account: str
+    day: date
+    currency: str
+    cash: float
+    positions_value: float
+
     class Config:
         from_attributes = True
+
+
+# ---------- Collector schemas ----------
+
+class CollectorRunRead(BaseModel):
+    started_at: datetime
+    duration_ms: float
+    status: str
+    accounts: str
+    portfolios_written: int
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class CollectorStatus(BaseModel):
+    enabled: bool
+    accounts: List[str] = []
+    next_run: Optional[datetime] = None
+    running: bool = False
+    recent_runs: List[CollectorRunRead] = []
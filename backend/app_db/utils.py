@@ -1,7 +1,13 @@
+import asyncio
 import requests
 from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
 import pytz
 
+from .fetch_data_portfolio import AsyncIBClient
+from .gateway import get_client
+
 BASE_URL = "https://localhost:5000/v1/api"
 TZ_NAME = "America/New_York"  # IBKR statements usually use EST/EDT
 
@@ -9,6 +15,16 @@ session = requests.Session()
 session.verify = False  # because IBKR gateway uses self-signed TLS
 
 
+class LedgerError(Exception):
+    """The /ledger response has no usable BASE (base currency) entry."""
+
+
+@lru_cache(maxsize=None)
+def _timezone(tz_name: str):
+    # pytz.timezone parses the zone file on every call
+    return pytz.timezone(tz_name)
+
+
 def format_period_and_generated_from_ms(ts_ms: int, tz_name: str = TZ_NAME):
     """
     Convert IBKR millisecond timestamp to:
@@ -17,7 +33,7 @@ def format_period_and_generated_from_ms(ts_ms: int, tz_name: str = TZ_NAME):
     using the given timezone.
     """
     ts_sec = ts_ms / 1000.0
-    tz = pytz.timezone(tz_name)
+    tz = _timezone(tz_name)
     dt = datetime.fromtimestamp(ts_sec, tz)
 
     period = dt.strftime("%m/%d/%Y")                # e.g. 11/12/2025
@@ -31,20 +47,46 @@ def get_account_header_from_meta_and_ledger(account_id: str):
     r_meta.raise_for_status()
     meta = r_meta.json()
 
+    # 2) /ledger -> cash, portfolio (net liquidation), timestamp, base currency
+    r_ledger = session.get(f"{BASE_URL}/portfolio/{account_id}/ledger")
+    r_ledger.raise_for_status()
+    ledger = r_ledger.json()
+
+    return header_from_meta_and_ledger(meta, ledger)
+
+
+async def fetch_account_header(account_id: str, client: Optional[AsyncIBClient] = None) -> dict:
+    """
+    Non-blocking get_account_header_from_meta_and_ledger: /meta and /ledger are
+    requested concurrently over `client` (the shared pooled client by default).
+    """
+    client = client or get_client()
+    meta, ledger = await asyncio.gather(client.get_meta(account_id), client.get_ledger(account_id))
+    return header_from_meta_and_ledger(meta, ledger)
+
+
+async def fetch_account_headers(
+    account_ids: Iterable[str], client: Optional[AsyncIBClient] = None
+) -> Dict[str, dict]:
+    """Headers of several accounts in one batch ({account_id: header}); all requests run concurrently."""
+    account_ids = list(dict.fromkeys(account_ids))
+    headers = await asyncio.gather(*(fetch_account_header(a, client) for a in account_ids))
+    return dict(zip(account_ids, headers))
+
+
+def header_from_meta_and_ledger(meta: dict, ledger: dict):
+    """Account header from already fetched /meta and /ledger responses."""
     name = meta.get("accountTitle") or meta.get("displayName")
     account = meta.get("accountId") or meta.get("id")
     customer_type = meta.get("type")                 # e.g. "INDIVIDUAL"
     account_type = meta.get("acctCustType")          # e.g. "IRA-Tax Free Savings Account/Canada"
     base_currency_from_meta = meta.get("currency")   # backup
 
-    # 2) /ledger -> cash, portfolio (net liquidation), timestamp, base currency
-    r_ledger = session.get(f"{BASE_URL}/portfolio/{account_id}/ledger")
-    r_ledger.raise_for_status()
-    ledger = r_ledger.json()
-
-    base = ledger["BASE"]
+    base = (ledger or {}).get("BASE")
+    if not isinstance(base, dict) or base.get("netliquidationvalue") is None:
+        raise LedgerError(f"Ledger of account {account or '?'} has no BASE net liquidation value")
 
-    cash = base["cashbalance"]                       # full cash in base currency
+    cash = base.get("cashbalance") or 0.0           # full cash in base currency
     portfolio = base["netliquidationvalue"]          # total portfolio value in base currency
     base_currency = base.get("currency") or base_currency_from_meta
 
@@ -70,5 +112,6 @@ def get_account_header_from_meta_and_ledger(account_id: str):
 
 
 if __name__ == "__main__":
+    # python -m app_db.utils
     header = get_account_header_from_meta_and_ledger("U10322314")
     print(header)
@@ -0,0 +1,101 @@
+"""
+Per-request overhead of the bearer auth middleware: the previous
+BaseHTTPMiddleware subclass versus the plain ASGI BearerAuthMiddleware.
+
+    cd backend
+    python -m benchmarks.bench_bearer_middleware [requests]
+
+Each variant wraps the same small FastAPI app (an authenticated POST and an open
+GET, plus a bare app for reference) and is driven in-process through
+httpx.ASGITransport, so the figures are middleware + framework cost only.
+Reports requests/s and mean latency per route.
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.core.security import token_store
+from app.middleware.bearer import BearerAuthMiddleware
+
+
+class DispatchBearerAuthMiddleware(BaseHTTPMiddleware):
+    """The middleware before the ASGI rewrite."""
+
+    def __init__(self, app, excluded_paths: set[str] | None = None) -> None:
+        super().__init__(app)
+        self.excluded_paths = excluded_paths or set()
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method.upper() == "POST":
+            if request.url.path not in self.excluded_paths:
+                auth_header = request.headers.get("Authorization")
+                if not auth_header or not auth_header.startswith("Bearer "):
+                    return JSONResponse(
+                        status_code=401,
+                        content={"detail": "Missing or invalid Authorization header"},
+                    )
+                token = auth_header.split(" ", 1)[1].strip()
+                if not token_store.is_valid(token):
+                    return JSONResponse(
+                        status_code=401,
+                        content={"detail": "Invalid or expired token"},
+                    )
+        return await call_next(request)
+
+
+def make_app(middleware=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/open")
+    async def open_route():
+        return {"ok": True}
+
+    @app.post("/orders")
+    async def post_route():
+        return {"ok": True}
+
+    if middleware is not None:
+        app.add_middleware(middleware, excluded_paths={"/auth/login"})
+    return app
+
+
+async def drive(app: FastAPI, method: str, path: str, count: int, headers) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(200):  # warm-up
+            await client.request(method, path, headers=headers)
+        t0 = time.perf_counter()
+        for _ in range(count):
+            resp = await client.request(method, path, headers=headers)
+        elapsed = time.perf_counter() - t0
+    assert resp.status_code == 200, resp.text
+    return elapsed
+
+
+async def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    headers = {"Authorization": f"Bearer {token_store.issue()}"}
+    print(f"{count} sequential requests per route")
+    for name, middleware in (
+        ("none", None),
+        ("base-http", DispatchBearerAuthMiddleware),
+        ("asgi", BearerAuthMiddleware),
+    ):
+        app = make_app(middleware)
+        for method, path in (("GET", "/open"), ("POST", "/orders")):
+            elapsed = await drive(app, method, path, count, headers)
+            print(
+                f"{name:<10}{method:<5}{path:<9}"
+                f"{count / elapsed:>9,.0f} req/s"
+                f"{elapsed / count * 1e6:>8.0f} us/req"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,194 @@
+"""
+Read throughput of the portfolio listing while the collector is writing.
+
+    cd backend
+    python -m benchmarks.bench_concurrent_reads [seconds] [readers] [--headers]
+
+sync:  sync engine, readers on a thread pool (the old `def` handlers) and a writer
+       thread inserting snapshot batches; once with SQLite's default rollback
+       journal, once with the profile from app_db.database (WAL, synchronous=NORMAL,
+       cache/mmap, busy timeout).
+async: async engine with the profile and reader coroutines on one event loop, as
+       GET /portfolios/ runs; once with the writer as a coroutine on the same
+       loop (every statement of a batch waits for a turn of the busy loop), once
+       with the writer on the sync engine in a worker thread (database.run_write,
+       as POST /portfolios/batch and the collector write).
+
+Each run gets a fresh throw-away SQLite file seeded with the same history. Readers
+fetch a page with positions (GET /portfolios/) or, with --headers, without them
+(GET /portfolios/headers). Reports reads/s, read latency p50/p95 and writer batches/s.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/unused.db"
+
+from sqlalchemy import create_engine, event, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import selectinload, sessionmaker  # noqa: E402
+from sqlalchemy.pool import AsyncAdaptedQueuePool  # noqa: E402
+
+from app_db.crud import insert_portfolios  # noqa: E402
+from app_db.database import Base, apply_sqlite_profile  # noqa: E402
+from app_db.models import Portfolio  # noqa: E402
+
+from .bench_portfolio_ingest import make_portfolio  # noqa: E402
+
+SEED_PORTFOLIOS = 200
+POSITIONS = 50
+PAGE = 20
+WRITE_BATCH = 5
+
+
+HEADERS_ONLY = "--headers" in sys.argv
+
+
+def page_query():
+    stmt = select(Portfolio).order_by(Portfolio.generated_at.desc(), Portfolio.id.desc()).limit(PAGE)
+    return stmt if HEADERS_ONLY else stmt.options(selectinload(Portfolio.positions))
+
+
+def seed(path: str, profile: bool) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    if profile:
+        event.listen(engine, "connect", apply_sqlite_profile)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        insert_portfolios(db, [make_portfolio(POSITIONS, i) for i in range(SEED_PORTFOLIOS)])
+        db.commit()
+    engine.dispose()
+
+
+def run_threads(path: str, seconds: float, readers: int, profile: bool) -> dict:
+    engine = create_engine(f"sqlite:///{path}", pool_size=readers + 1)
+    if profile:
+        event.listen(engine, "connect", apply_sqlite_profile)
+    Session = sessionmaker(bind=engine)
+    stop = threading.Event()
+    counts = {"latencies": [], "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def reader() -> None:
+        while not stop.is_set():
+            try:
+                t0 = time.perf_counter()
+                with Session() as db:
+                    db.scalars(page_query()).all()
+                with lock:
+                    counts["latencies"].append(time.perf_counter() - t0)
+            except OperationalError:
+                with lock:
+                    counts["errors"] += 1
+
+    def writer() -> None:
+        seq = 0
+        while not stop.is_set():
+            try:
+                with Session() as db:
+                    insert_portfolios(db, [make_portfolio(POSITIONS, seq + i) for i in range(WRITE_BATCH)])
+                    db.commit()
+                counts["writes"] += 1
+            except OperationalError:
+                with lock:
+                    counts["errors"] += 1
+            seq += WRITE_BATCH
+
+    with ThreadPoolExecutor(readers + 1) as pool:
+        pool.submit(writer)
+        for _ in range(readers):
+            pool.submit(reader)
+        time.sleep(seconds)
+        stop.set()
+    engine.dispose()
+    return counts
+
+
+async def run_async(path: str, seconds: float, readers: int, threaded_writer: bool) -> dict:
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}", poolclass=AsyncAdaptedQueuePool, pool_size=readers + 1
+    )
+    event.listen(engine.sync_engine, "connect", apply_sqlite_profile)
+    Session = async_sessionmaker(bind=engine, expire_on_commit=False)
+    counts = {"latencies": [], "writes": 0, "errors": 0}
+    deadline = time.perf_counter() + seconds
+
+    async def reader() -> None:
+        while time.perf_counter() < deadline:
+            try:
+                t0 = time.perf_counter()
+                async with Session() as db:
+                    (await db.scalars(page_query())).all()
+                counts["latencies"].append(time.perf_counter() - t0)
+            except OperationalError:
+                counts["errors"] += 1
+
+    sync_engine = create_engine(f"sqlite:///{path}")
+    event.listen(sync_engine, "connect", apply_sqlite_profile)
+    SyncSession = sessionmaker(bind=sync_engine)
+
+    def write_batch(batch) -> None:
+        with SyncSession() as db:
+            insert_portfolios(db, batch)
+            db.commit()
+
+    async def writer() -> None:
+        seq = 0
+        while time.perf_counter() < deadline:
+            try:
+                batch = [make_portfolio(POSITIONS, seq + i) for i in range(WRITE_BATCH)]
+                if threaded_writer:
+                    await asyncio.to_thread(write_batch, batch)
+                else:
+                    async with Session() as db:
+                        await db.run_sync(insert_portfolios, batch)
+                        await db.commit()
+                counts["writes"] += 1
+            except OperationalError:
+                counts["errors"] += 1
+            seq += WRITE_BATCH
+
+    await asyncio.gather(writer(), *(reader() for _ in range(readers)))
+    await engine.dispose()
+    sync_engine.dispose()
+    return counts
+
+
+def main() -> None:
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    seconds = float(args[0]) if args else 5.0
+    readers = int(args[1]) if len(args) > 1 else 8
+
+    paths = [os.path.join(_tmp, f"run{i}.db") for i in range(4)]
+    for path, profile in zip(paths, (False, True, True, True)):
+        seed(path, profile)
+
+    results = {
+        "sync, rollback journal": run_threads(paths[0], seconds, readers, profile=False),
+        "sync, WAL profile": run_threads(paths[1], seconds, readers, profile=True),
+        "async, loop writer": asyncio.run(run_async(paths[2], seconds, readers, threaded_writer=False)),
+        "async, thread writer": asyncio.run(run_async(paths[3], seconds, readers, threaded_writer=True)),
+    }
+
+    page = "headers" if HEADERS_ONLY else f"x {POSITIONS} positions"
+    print(f"{readers} readers of a {PAGE}-portfolio page ({page}), "
+          f"writer inserting {WRITE_BATCH} snapshots per batch, {seconds:.0f} s")
+    for name, counts in results.items():
+        latencies = sorted(counts["latencies"]) or [0.0]
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        print(
+            f"{name:<24}{len(counts['latencies']) / seconds:>8,.0f} reads/s"
+            f"  p50 {statistics.median(latencies) * 1000:>6.1f} ms  p95 {p95 * 1000:>6.1f} ms"
+            f"{counts['writes'] / seconds:>7,.1f} batches/s{counts['errors']:>4} errors"
+        )
+
+
+if __name__ == "__main__":
+    main()
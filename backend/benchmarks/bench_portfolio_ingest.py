@@ -0,0 +1,96 @@
+"""
+Portfolio ingestion throughput: per-object ORM path (previous POST /portfolios/)
+versus the Core bulk path in app_db.crud.insert_portfolios.
+
+    cd backend
+    python -m benchmarks.bench_portfolio_ingest [positions_per_portfolio] [portfolios]
+
+Runs against a throw-away SQLite file; the configured database is not touched.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/bench.db"
+
+from app_db.crud import POSITION_FIELDS, insert_portfolios  # noqa: E402
+from app_db.database import Base, SessionLocal, engine  # noqa: E402
+from app_db.models import Portfolio, Position  # noqa: E402
+from app_db.schemas import PortfolioCreate, PositionCreate  # noqa: E402
+
+
+def make_portfolio(n_positions: int, seq: int) -> PortfolioCreate:
+    return PortfolioCreate(
+        period=date(2025, 1, 2),
+        generated_at=datetime(2025, 1, 2, 16, 0, seq % 60),
+        owner_name="Bench",
+        account=f"U{seq % 10}",
+        customer_type="INDIVIDUAL",
+        base_currency="USD",
+        cash=1000.0,
+        portfolio_value=100000.0,
+        positions=[
+            PositionCreate(
+                symbol=f"S{i}",
+                quantity=10.0 + i,
+                last_price=100.0,
+                avg_cost=90.0,
+                value=1000.0 + i,
+                weight_pct=0.01,
+                currency="USD",
+                name=f"Company {i}",
+            )
+            for i in range(n_positions)
+        ],
+    )
+
+
+def orm_insert(db, portfolio_in: PortfolioCreate) -> None:
+    """The previous create_portfolio body: ORM objects appended one by one, then refresh."""
+    portfolio = Portfolio(**portfolio_in.model_dump(exclude={"positions"}))
+    for pos_in in portfolio_in.positions:
+        portfolio.positions.append(Position(**pos_in.model_dump(include=set(POSITION_FIELDS))))
+    db.add(portfolio)
+    db.commit()
+    db.refresh(portfolio)
+
+
+def bench(label: str, fn, payloads) -> None:
+    rows = sum(len(p.positions) + 1 for p in payloads)
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        fn(db, payloads)
+        elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  {rows / elapsed:12,.0f} rows/s")
+
+
+def main() -> None:
+    n_positions = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_portfolios = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    Base.metadata.create_all(bind=engine)
+    payloads = [make_portfolio(n_positions, i) for i in range(n_portfolios)]
+    print(f"{n_portfolios} portfolios x {n_positions} positions")
+
+    def orm(db, items):
+        for item in items:
+            orm_insert(db, item)
+
+    def bulk_each(db, items):
+        for item in items:
+            insert_portfolios(db, [item])
+            db.commit()
+
+    def bulk_batch(db, items):
+        insert_portfolios(db, items)
+        db.commit()
+
+    bench("ORM, one request each", orm, payloads)
+    bench("bulk, one request each", bulk_each, payloads)
+    bench("bulk, one batch request", bulk_batch, payloads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Portfolio header storage: the previous table with duplicated metric columns
+(`buying_power` + `buyingpower`, ...) versus the canonical column set.
+
+    cd backend
+    python -m benchmarks.bench_portfolio_metrics [snapshots]
+
+Both tables get the same snapshots with every metric filled (the legacy table in
+both spellings, as when a summary is copied in wholesale). Reports bytes per
+snapshot after VACUUM and Core executemany insert throughput.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/unused.db"
+
+from sqlalchemy import Column, Float, MetaData, Table, create_engine, insert, text  # noqa: E402
+
+from app_db.models import LEGACY_METRIC_COLUMNS, Portfolio  # noqa: E402
+
+
+def _columns():
+    return [
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+        for column in Portfolio.__table__.columns
+    ]
+
+
+def legacy_table(metadata: MetaData) -> Table:
+    columns = _columns() + [Column(name, Float, nullable=True) for name in LEGACY_METRIC_COLUMNS]
+    return Table("portfolios", metadata, *columns)
+
+
+def canonical_table(metadata: MetaData) -> Table:
+    return Table("portfolios", metadata, *_columns())
+
+
+def make_rows(table: Table, count: int):
+    rows = []
+    for seq in range(count):
+        row = {
+            "period": date(2025, 1, 2),
+            "generated_at": datetime(2025, 1, 2, 16, 0, seq % 60),
+            "owner_name": "Bench",
+            "account": f"U{seq % 10}",
+            "customer_type": "INDIVIDUAL",
+            "base_currency": "USD",
+            "account_type": "INDIVIDUAL",
+            "top_holding_symbol": "AAPL",
+        }
+        for column in table.columns:
+            if isinstance(column.type, Float):
+                row[column.name] = 1000.25 + seq * 0.37 + len(column.name)
+        rows.append(row)
+    return rows
+
+
+def measure(name: str, build, count: int) -> None:
+    path = os.path.join(_tmp, f"{name}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    metadata = MetaData()
+    table = build(metadata)
+    metadata.create_all(engine)
+    rows = make_rows(table, count)
+
+    t0 = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(table), rows)
+    elapsed = time.perf_counter() - t0
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM"))
+        pages = conn.execute(text("PRAGMA page_count")).scalar()
+        page_size = conn.execute(text("PRAGMA page_size")).scalar()
+    engine.dispose()
+
+    print(
+        f"{name:<12}{len(table.columns):>4} columns"
+        f"{pages * page_size / count:>9,.0f} bytes/snapshot"
+        f"{count / elapsed:>12,.0f} snapshots/s"
+    )
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"{count} portfolio headers")
+    measure("legacy", legacy_table, count)
+    measure("canonical", canonical_table, count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Bearer token validation with many live sessions: the previous TokenStore (full
+expiry scan under a global lock on every issue/is_valid) versus the heap-based
+memory store in app.core.security, with the shared SQLite and stateless HMAC
+backends for comparison.
+
+    cd backend
+    python -m benchmarks.bench_token_store [tokens] [threads]
+
+Every store is filled with the same number of live tokens, then validated from
+`threads` threads at once (as the bearer middleware does under concurrent POSTs).
+Reports validations/s and issue() calls/s at that size.
+"""
+import os
+import secrets
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Dict
+
+from app.core.security import HMACTokenStore, MemoryTokenStore, SQLiteTokenStore
+
+
+class ScanningTokenStore:
+    """The store before the heap: every call scans all tokens under the lock."""
+
+    def __init__(self, ttl_seconds: int = 60 * 60) -> None:
+        self.ttl = ttl_seconds
+        self._tokens: Dict[str, float] = {}
+        self._lock = Lock()
+
+    def _cleanup(self) -> None:
+        now = time.time()
+        expired = [token for token, expiry in self._tokens.items() if expiry <= now]
+        for token in expired:
+            self._tokens.pop(token, None)
+
+    def issue(self) -> str:
+        token = secrets.token_urlsafe(32)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._cleanup()
+            self._tokens[token] = expires_at
+        return token
+
+    def is_valid(self, token: str) -> bool:
+        with self._lock:
+            self._cleanup()
+            expiry = self._tokens.get(token)
+            if expiry is None:
+                return False
+            if expiry <= time.time():
+                self._tokens.pop(token, None)
+                return False
+            return True
+
+    def seed(self, count: int):
+        # filling through issue() would be quadratic here
+        expires_at = time.time() + self.ttl
+        tokens = [secrets.token_urlsafe(32) for _ in range(count)]
+        self._tokens.update(dict.fromkeys(tokens, expires_at))
+        return tokens
+
+
+def fill(store, count: int):
+    if isinstance(store, ScanningTokenStore):
+        return store.seed(count)
+    return [store.issue() for _ in range(count)]
+
+
+def measure(name: str, store, count: int, threads: int, seconds: float = 2.0) -> None:
+    tokens = fill(store, count)
+
+    t0 = time.perf_counter()
+    issued = 0
+    while time.perf_counter() - t0 < seconds / 4:
+        store.issue()
+        issued += 1
+    issue_rate = issued / (time.perf_counter() - t0)
+
+    def validate(offset: int) -> int:
+        done = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            for i in range(100):
+                store.is_valid(tokens[(offset + done + i) % count])
+            done += 100
+        return done
+
+    with ThreadPoolExecutor(threads) as pool:
+        t0 = time.perf_counter()
+        checks = sum(pool.map(validate, range(0, count, max(1, count // threads))[:threads]))
+        elapsed = time.perf_counter() - t0
+
+    print(
+        f"{name:<10}{checks / elapsed:>14,.0f} validations/s"
+        f"{issue_rate:>12,.0f} issues/s"
+    )
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"{count:,} live tokens, {threads} validating threads")
+    measure("scan", ScanningTokenStore(), count, threads)
+    measure("heap", MemoryTokenStore(), count, threads)
+    with tempfile.TemporaryDirectory() as tmp:
+        measure("sqlite", SQLiteTokenStore(os.path.join(tmp, "tokens.db")), count, threads)
+    measure("hmac", HMACTokenStore(secrets.token_urlsafe(32)), count, threads)
+
+
+if __name__ == "__main__":
+    main()
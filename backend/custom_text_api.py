@@ -1,31 +1,53 @@
+import asyncio
+import contextlib
+
+import httpx
 from fastapi import FastAPI, HTTPException
-import requests
+
+from app.services.session import GatewaySession
 
 app = FastAPI(title="Custom API")
 IBKR_BASE_URL = "https://localhost:5000/v1/api"
 VERIFY_SSL = False
 
+# Keeps the gateway session alive and serves /ibkr/status from memory
+gateway_session = GatewaySession(IBKR_BASE_URL, tickle_interval=60.0, verify_ssl=VERIFY_SSL)
+_keepalive: asyncio.Task | None = None
+
+
+@app.on_event("startup")
+async def startup_event():
+    global _keepalive
+    _keepalive = asyncio.create_task(gateway_session.run())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if _keepalive is not None:
+        _keepalive.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _keepalive
+    await gateway_session.aclose()
+
+
 @app.get("/")
 def root():
     return {"message": "IBKR custom API is running"}
     
 @app.get("/ibkr/status")
-def get_auth_status():
-    """Check if IBKR gateway session is active"""
+async def get_auth_status():
+    """Check if IBKR gateway session is active (cached by the keepalive)"""
     try:
-        response = requests.get(f"{IBKR_BASE_URL}/iserver/auth/status", verify=VERIFY_SSL)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=500, delattr=str(e))
+        return await gateway_session.status()
+    except (httpx.HTTPError, ValueError) as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/ibkr/account")
-def get_account_summary():
+async def get_account_summary():
     """Fetch account summary"""
     try:
-        response = requests.get(f"{IBKR_BASE_URL}/iserver/account", verify=VERIFY_SSL)
+        response = await gateway_session.client.get(f"{IBKR_BASE_URL}/iserver/account")
         response.raise_for_status()
         return response.json()
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=str(e))
-        
\ No newline at end of file
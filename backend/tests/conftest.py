@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# app_db binds its engines to DATABASE_URL at import: point it at a throw-away file
+# before any test module imports app_db, so the suite never touches portfolio.db
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
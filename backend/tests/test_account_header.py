@@ -0,0 +1,17 @@
+import pytest
+
+from app_db.utils import LedgerError, header_from_meta_and_ledger
+
+META = {"accountId": "U1", "accountTitle": "Owner", "type": "INDIVIDUAL", "currency": "USD"}
+
+
+def test_header_from_base_ledger():
+    ledger = {"BASE": {"cashbalance": 10.0, "netliquidationvalue": 110.0, "currency": "BASE"}}
+    header = header_from_meta_and_ledger(META, ledger)
+    assert (header["account"], header["cash"], header["portfolio"]) == ("U1", 10.0, 110.0)
+
+
+@pytest.mark.parametrize("ledger", [{}, {"USD": {"netliquidationvalue": 1.0}}, {"BASE": {}}, None])
+def test_ledger_without_base_raises_ledger_error(ledger):
+    with pytest.raises(LedgerError):
+        header_from_meta_and_ledger(META, ledger)
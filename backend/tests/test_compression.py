@@ -0,0 +1,103 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware, ETagMiddleware
+
+PAYLOAD = {"rows": [{"symbol": f"SYM{i}", "value": i} for i in range(200)]}
+
+
+@pytest.fixture
+def client():
+    api = FastAPI()
+
+    @api.get("/data")
+    async def data():
+        return PAYLOAD
+
+    @api.get("/stream")
+    async def stream():
+        async def rows():
+            for i in range(50):
+                yield f'{{"row": {i}, "padding": "{"x" * 64}"}}\n'
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    @api.get("/events")
+    async def events():
+        async def ticks():
+            for i in range(50):
+                yield f"data: {'x' * 64} {i}\n\n"
+        return StreamingResponse(ticks(), media_type="text/event-stream")
+
+    api.add_middleware(ETagMiddleware)
+    api.add_middleware(CompressionMiddleware, minimum_size=256)
+    return TestClient(api)
+
+
+def asgi_get(api, path, headers):
+    """Every message the app sends for one GET (TestClient joins streamed bodies)."""
+    messages = []
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "path": path,
+        "raw_path": path.encode(), "root_path": "", "query_string": b"", "server": ("test", 80),
+        "client": ("test", 1), "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()  # never disconnects; the response cancels this wait
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(api(scope, receive, send))
+    return messages
+
+
+def test_streamed_body_is_gzipped_incrementally(client):
+    start, *bodies = asgi_get(client.app, "/stream", {"Accept-Encoding": "gzip"})
+    headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+
+    chunks = [message["body"] for message in bodies if message["body"]]
+    assert len(chunks) > 1
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # each chunk is sync-flushed, so the first one already decodes to a whole row
+    assert decoder.decompress(chunks[0]).startswith(b'{"row": 0')
+    body = gzip.decompress(b"".join(chunks)).decode()
+    assert body.count("\n") == 50
+
+
+def test_if_none_match_answers_304(client):
+    first = client.get("/data", headers={"Accept-Encoding": "gzip"})
+    etag = first.headers["etag"]
+    assert first.headers["content-encoding"] == "gzip"
+    assert etag.endswith('-gzip"')
+
+    again = client.get("/data", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert "accept-encoding" in again.headers["vary"].lower()
+
+    plain = client.get("/data", headers={"Accept-Encoding": "identity"})
+    assert plain.headers["etag"] == etag.replace("-gzip", "")
+    revalidated = client.get("/data", headers={"Accept-Encoding": "identity", "If-None-Match": plain.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+def test_server_sent_events_pass_through(client):
+    with client.stream("GET", "/events", headers={"Accept-Encoding": "gzip"}) as response:
+        assert "content-encoding" not in response.headers
+        assert "etag" not in response.headers
+        body = b"".join(response.iter_raw()).decode()
+    assert body.count("data: ") == 50
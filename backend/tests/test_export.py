@@ -0,0 +1,53 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import column, select, table
+
+from app_db import export
+from app_db.database import async_engine
+from app_db.main import app
+
+
+def asgi_get(path, query_string):
+    """Messages the app sends for one GET; TestClient turns an error mid-stream into a 500."""
+    messages = []
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "path": path,
+        "raw_path": path.encode(), "root_path": "", "query_string": query_string, "server": ("test", 80),
+        "client": ("test", 1), "headers": [],
+    }
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    async def run():
+        try:
+            await app(scope, receive, send)
+        except Exception:
+            pass
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(run())
+    return messages
+
+
+def test_empty_export_is_a_header_only_csv():
+    response = TestClient(app).get("/export/portfolios", params={"format": "csv"})
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert len(lines) == 1 and lines[0].startswith("id,")
+
+
+def test_failing_query_is_a_500_not_a_200_stream(monkeypatch):
+    broken = select(column("missing")).select_from(table("no_such_table"))
+    monkeypatch.setitem(export.EXPORTS, "positions", lambda account, start, end: broken)
+    start = asgi_get("/export/positions", b"format=ndjson")[0]
+    assert start["type"] == "http.response.start"
+    assert start["status"] == 500
@@ -0,0 +1,35 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.exposure import ExposureIndex
+
+
+def test_concurrent_first_loads_share_one_refresh():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(0.01)
+        if request.url.path.endswith("/portfolio/subaccounts2"):
+            return httpx.Response(200, json=[{"accountId": "U1"}])
+        return httpx.Response(200, json=[])
+
+    async def scenario():
+        index = ExposureIndex()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await asyncio.gather(*(index.ensure_loaded(client) for _ in range(20)))
+            await index.ensure_loaded(client)
+        return index
+
+    index = asyncio.run(scenario())
+    assert index.loaded_at is not None
+    assert (index.hits, index.misses) == (1, 20)
+    assert sum(path.endswith("/subaccounts2") for path in calls) == 1
+
+
+def test_non_numeric_conid_is_rejected():
+    response = TestClient(app).get("/portfolio/exposure", params={"conids": "265598,abc"})
+    assert response.status_code == 422
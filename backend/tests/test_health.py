@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core.gateway import LatencyTracker
+from app.main import app
+from app.routers import health
+
+
+def _readiness(monkeypatch, samples):
+    tracker = LatencyTracker()
+    for seconds, ok in samples:
+        tracker.record(seconds, ok, 1)
+    monkeypatch.setattr(health, "gateway_latency", tracker)
+    monkeypatch.setattr(settings, "gateway_tickle_interval", 0)
+    monkeypatch.setattr(settings, "health_min_calls", 20)
+    return TestClient(app).get("/health/ready")
+
+
+def test_single_slow_or_failed_call_does_not_drain(monkeypatch):
+    response = _readiness(monkeypatch, [(10.0, False)])
+    assert response.status_code == 200
+
+
+def test_thresholds_apply_once_window_holds_min_calls(monkeypatch):
+    response = _readiness(monkeypatch, [(10.0, False)] * 20)
+    assert response.status_code == 503
+    reasons = response.json()["reasons"]
+    assert any(r.startswith("gateway p95") for r in reasons)
+    assert any(r.startswith("gateway error ratio") for r in reasons)
+
+
+def test_deep_health_reports_every_cache():
+    caches = TestClient(app).get("/health/deep").json()["caches"]
+    assert set(caches) == {"portfolio", "exposureIndex", "gatewayAuthStatus"}
+    assert set(caches["exposureIndex"]) == {"hits", "misses", "hitRatio"}
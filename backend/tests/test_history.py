@@ -0,0 +1,41 @@
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app_db.crud import insert_portfolios
+from app_db.database import Base
+from app_db.history import series_statement
+from app_db.schemas import PortfolioCreate, PositionCreate
+
+
+def snapshot(day: date) -> PortfolioCreate:
+    return PortfolioCreate(
+        period=day,
+        generated_at=datetime.combine(day, datetime.min.time()).replace(hour=10),
+        owner_name="Owner",
+        account="U1",
+        customer_type="INDIVIDUAL",
+        base_currency="USD",
+        cash=0.0,
+        portfolio_value=100.0,
+        positions=[PositionCreate(symbol="AAPL", quantity=1, value=100.0, currency="USD", name="Apple")],
+    )
+
+
+def test_week_bucket_spans_the_new_year():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    # Mon 2025-12-29 .. Sun 2026-01-04 is one week; 2025-12-28 and 2026-01-05 are not in it
+    days = [date(2025, 12, 28), date(2025, 12, 29), date(2025, 12, 31), date(2026, 1, 1),
+            date(2026, 1, 4), date(2026, 1, 5)]
+    with Session(engine) as db:
+        insert_portfolios(db, [snapshot(day) for day in days])
+        db.commit()
+        rows = db.execute(series_statement("U1", "AAPL", resolution="week")).mappings().all()
+
+    assert [(row["period"], row["samples"]) for row in rows] == [
+        (date(2025, 12, 28), 1),
+        (date(2026, 1, 4), 4),
+        (date(2026, 1, 5), 1),
+    ]
@@ -0,0 +1,36 @@
+import asyncio
+
+from app_db.live import LivePortfolioCache
+
+
+def test_concurrent_misses_share_one_build_and_release_the_lock():
+    builds = []
+
+    async def build():
+        builds.append(1)
+        await asyncio.sleep(0.01)
+        return "portfolio"
+
+    async def scenario():
+        cache = LivePortfolioCache(ttl=60)
+        results = await asyncio.gather(*(cache.get("U1", build) for _ in range(10)))
+        return cache, results
+
+    cache, results = asyncio.run(scenario())
+    assert len(builds) == 1
+    assert [value for value, _ in results] == ["portfolio"] * 10
+    assert cache._locks == {}
+
+
+def test_expired_entries_are_evicted():
+    async def scenario():
+        cache = LivePortfolioCache(ttl=0.01)
+        for account_id in ("U1", "U2", "U3"):
+            await cache.get(account_id, lambda: asyncio.sleep(0, result=account_id))
+        await asyncio.sleep(0.02)
+        await cache.get("U4", lambda: asyncio.sleep(0, result="U4"))
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert list(cache._entries) == ["U4"]
+    assert cache._locks == {}
@@ -0,0 +1,50 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect, text
+
+from app_db.database import engine
+from app_db.main import app
+from app_db.migrations import migrate
+from app_db.powerbi import PowerBIEmbedCache
+
+
+def make_legacy_schema():
+    """Shape of a pre-migration portfolio.db: no positions.description, an unspaced metric column."""
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE positions DROP COLUMN description"))
+        conn.execute(text("ALTER TABLE portfolios ADD COLUMN accruedcash FLOAT"))
+        portfolio_id = conn.execute(text(
+            "INSERT INTO portfolios (period, generated_at, cash, portfolio_value, owner_name, account,"
+            " customer_type, base_currency, accruedcash) VALUES ('2025-11-12', '2025-11-12 16:00:00',"
+            " 10.0, 110.0, 'Owner', 'ULEGACY', 'INDIVIDUAL', 'USD', 1.5) RETURNING id"
+        )).scalar_one()
+        conn.execute(text(
+            "INSERT INTO positions (portfolio_id, symbol, quantity, value, currency, name)"
+            " VALUES (:id, 'AAPL', 1, 100.0, 'USD', 'Apple')"
+        ), {"id": portfolio_id})
+    return portfolio_id
+
+
+def test_legacy_database_is_readable_after_startup(monkeypatch):
+    # startup runs the lifespan: keep the Power BI refresher (configured by .env) off the network
+    monkeypatch.setattr(PowerBIEmbedCache, "configured", property(lambda self: False))
+    portfolio_id = make_legacy_schema()
+    try:
+        with TestClient(app) as client:
+            listed = client.get("/portfolios/", params={"account": "ULEGACY"})
+            assert listed.status_code == 200
+            assert [p["id"] for p in listed.json()] == [portfolio_id]
+            assert listed.json()[0]["positions"][0]["description"] is None
+            assert client.get(f"/portfolios/{portfolio_id}").status_code == 200
+            exported = client.get("/export/positions", params={"format": "ndjson", "account": "ULEGACY"})
+            assert exported.status_code == 200 and '"symbol": "AAPL"' in exported.text
+
+        # the destructive fold only runs on request (CLI / RUN_MIGRATIONS)
+        assert "accruedcash" in {c["name"] for c in inspect(engine).get_columns("portfolios")}
+        migrate(engine)
+        assert "accruedcash" not in {c["name"] for c in inspect(engine).get_columns("portfolios")}
+        with TestClient(app) as client:
+            assert client.get(f"/portfolios/{portfolio_id}").json()["accrued_cash"] == 1.5
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM positions WHERE portfolio_id = :id"), {"id": portfolio_id})
+            conn.execute(text("DELETE FROM portfolios WHERE id = :id"), {"id": portfolio_id})
@@ -0,0 +1,42 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.pnl_stream import PnLStore, PnLStreamConsumer, pnl_consumer
+
+
+def test_spl_update_maps_realized_pnl():
+    store = PnLStore()
+    store.apply({"U1.Core": {"rpl": 12.5, "upl": -3.0}})
+    store.apply({"U1.Core": {"dpl": 1.0}})
+
+    (record,) = store.get("U1")
+    assert (record.RealizedPnL, record.UnrealizedPnL, record.DailyPnL) == (12.5, -3.0, 1.0)
+
+
+def test_pnl_routes_answer_503_without_the_consumer():
+    assert not pnl_consumer.running
+    client = TestClient(app)
+    for path in ("/portfolio/pnl", "/portfolio/U1/pnl", "/portfolio/pnl/stream"):
+        response = client.get(path)
+        assert response.status_code == 503
+        assert response.json()["detail"] == "PnL stream disabled"
+
+
+def test_consumer_is_running_until_cancelled():
+    async def scenario():
+        consumer = PnLStreamConsumer(PnLStore(), "ws://127.0.0.1:9/v1/api/ws")
+
+        async def fail():
+            raise OSError("refused")
+
+        consumer._consume = fail
+        task = asyncio.create_task(consumer.run())
+        await asyncio.sleep(0.01)
+        running = consumer.running
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return running, consumer.running
+
+    assert asyncio.run(scenario()) == (True, False)
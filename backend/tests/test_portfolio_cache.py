@@ -0,0 +1,41 @@
+import asyncio
+
+from app.services.portfolio_cache import PortfolioCache
+
+
+def test_invalidate_discards_fetch_in_flight():
+    async def scenario():
+        cache = PortfolioCache({"positions": 60})
+        release = asyncio.Event()
+        values = iter(["stale", "fresh"])
+
+        async def fetch():
+            value = next(values)
+            if value == "stale":
+                await release.wait()
+            return value
+
+        pending = asyncio.create_task(cache.get("U1", "positions", fetch))
+        await asyncio.sleep(0)
+        cache.invalidate("U1")
+        release.set()
+        stale, _ = await pending
+        fresh, _ = await cache.get("U1", "positions", fetch)
+        return stale, fresh
+
+    assert asyncio.run(scenario()) == ("stale", "fresh")
+
+
+def test_refresh_prunes_cold_accounts():
+    async def scenario():
+        cache = PortfolioCache({"positions": 60}, hot_seconds=0.0)
+
+        async def fetch():
+            return 1
+
+        await cache.get("U1", "positions", fetch)
+        cache.invalidate("U1")
+        await cache.refresh_once()
+        return cache._last_read, cache._generations
+
+    assert asyncio.run(scenario()) == ({}, {})
@@ -0,0 +1,53 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from app_db.config import Settings
+from app_db.powerbi import PowerBIEmbedCache, PowerBIError
+
+CONFIG = Settings(powerbi_workspace_id="ws", powerbi_report_id="rep", powerbi_refresh_margin=300)
+
+
+def make_cache(expiration):
+    def handler(request):
+        if request.url.path.endswith("/GenerateToken"):
+            return httpx.Response(200, json={"token": "embed", "expiration": expiration})
+        return httpx.Response(200, json={"embedUrl": "https://embed"})
+
+    return PowerBIEmbedCache(
+        CONFIG,
+        token_provider=lambda: {"access_token": "aad", "expires_in": 3600},
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def test_malformed_expiration_is_a_powerbi_error():
+    async def scenario():
+        cache = make_cache("not a date")
+        try:
+            await cache.get()
+        finally:
+            await cache.aclose()
+
+    with pytest.raises(PowerBIError):
+        asyncio.run(scenario())
+
+
+def test_margin_is_clamped_to_half_a_short_lifetime():
+    expiration = (datetime.now(timezone.utc) + timedelta(seconds=60)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    async def scenario():
+        cache = make_cache(expiration)
+        try:
+            await cache.get()
+            return cache._embed
+        finally:
+            await cache.aclose()
+
+    _, refresh_at, expires_at = asyncio.run(scenario())
+    now = time.monotonic()
+    assert 25 < refresh_at - now <= 30
+    assert 55 < expires_at - now <= 60
@@ -0,0 +1,34 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app_db.crud import insert_portfolios
+from app_db.database import Base
+from app_db.models import DailyAccountTotal
+from app_db.schemas import PortfolioCreate, PositionCreate
+
+
+def snapshot(day: date) -> PortfolioCreate:
+    return PortfolioCreate(
+        period=day,
+        generated_at=datetime.combine(day, datetime.min.time()).replace(hour=16),
+        owner_name="Owner",
+        account="U1",
+        customer_type="INDIVIDUAL",
+        base_currency="USD",
+        cash=10.0,
+        portfolio_value=110.0,
+        positions=[PositionCreate(symbol="AAPL", quantity=1, value=100.0, currency="USD", name="Apple")],
+    )
+
+
+def test_batch_of_more_than_a_thousand_days():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    first = date(2020, 1, 1)
+    with Session(engine) as db:
+        insert_portfolios(db, [snapshot(first + timedelta(days=i)) for i in range(1200)])
+        db.commit()
+        assert db.scalar(select(func.count()).select_from(DailyAccountTotal)) == 1200
+        assert db.scalar(select(func.sum(DailyAccountTotal.positions_value))) == 1200 * 100.0
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.middleware.bearer as bearer
+from app.core.security import HMACTokenStore, MemoryTokenStore, SQLiteTokenStore, TokenStore
+
+
+def test_purge_expired_drops_expired_tokens(tmp_path):
+    memory = MemoryTokenStore(ttl_seconds=0.05)
+    sqlite = SQLiteTokenStore(str(tmp_path / "tokens.db"), ttl_seconds=0.05)
+    for store in (memory, sqlite):
+        for _ in range(3):
+            store.issue()
+    time.sleep(0.1)
+    assert memory.purge_expired() == 3 and len(memory) == 0
+    assert sqlite.purge_expired() == 3
+
+
+def test_run_purger_purges_periodically():
+    store = MemoryTokenStore(ttl_seconds=0)
+    store.issue()
+
+    async def scenario():
+        task = asyncio.create_task(store.run_purger(interval=0.01))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert len(store) == 0
+
+
+def test_hmac_purge_forgets_expired_revocations():
+    store = HMACTokenStore("secret", ttl_seconds=1)
+    store.revoke(store.issue())
+    assert store.purge_expired() == 0
+    store._revoked = {token: 0 for token in store._revoked}
+    assert store.purge_expired() == 1
+
+
+def test_token_store_is_abstract():
+    with pytest.raises(TypeError):
+        TokenStore()
+
+
+def test_blocking_store_is_checked_off_the_event_loop(tmp_path):
+    store = SQLiteTokenStore(str(tmp_path / "tokens.db"))
+    token = store.issue()
+    threads = []
+    is_valid = store.is_valid
+
+    def recording_is_valid(value):
+        threads.append(threading.get_ident())
+        return is_valid(value)
+
+    store.is_valid = recording_is_valid
+
+    async def scenario():
+        return await store.is_valid_async(token), threading.get_ident()
+
+    valid, loop_thread = asyncio.run(scenario())
+    assert valid
+    assert threads and threads[0] != loop_thread
+
+
+@pytest.mark.parametrize("token", ["1.a.é", "9999999999.n.éé", "².n.sig", "1.\ud800.x"])
+def test_hmac_rejects_non_ascii_tokens(token):
+    store = HMACTokenStore("secret")
+    assert store.is_valid(token) is False
+    store.revoke(token)
+    assert store._revoked == {}
+
+
+def test_non_ascii_bearer_token_is_a_401(monkeypatch):
+    monkeypatch.setattr(bearer, "token_store", HMACTokenStore("secret"))
+    api = FastAPI()
+
+    @api.post("/orders")
+    async def orders():
+        return {"ok": True}
+
+    api.add_middleware(bearer.BearerAuthMiddleware)
+    response = TestClient(api).post("/orders", headers={"Authorization": "Bearer 1.a.é".encode("latin-1")})
+    assert response.status_code == 401
+
+
+def test_hmac_revocations_survive_concurrent_purges():
+    store = HMACTokenStore("secret", ttl_seconds=60)
+    tokens = [store.issue() for _ in range(2000)]
+    purger = threading.Thread(target=lambda: [store.purge_expired() for _ in range(2000)])
+    purger.start()
+    for token in tokens:
+        store.revoke(token)
+    purger.join()
+    assert not any(store.is_valid(token) for token in tokens)